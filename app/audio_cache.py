@@ -0,0 +1,193 @@
+"""
+Pre-rendered audio cache for fixed prompts (streaming voice path)
+
+Greetings and acknowledgments are the same on every call, so we
+synthesize them once into 8kHz μ-law files on disk, keyed by
+(text, voice, language). Workers memory-map the files read-only: the OS
+page cache holds one copy shared by every gunicorn worker, and a hit is
+streamed to Twilio with zero TTS latency and zero TTS cost.
+
+Populate at build/startup with:  python prerender_audio.py
+"""
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+
+from app.config import Config
+from app.tts_pipeline import OPENAI_TTS_VOICES
+from app.logger import get_logger
+
+log = get_logger(__name__)
+
+INDEX_FILE = 'index.json'
+
+
+def prompt_key(text, voice, language):
+    """Stable file name for a (text, voice, language) triple"""
+    raw = f"{language}\x1f{voice}\x1f{text.strip()}".encode('utf-8')
+    return hashlib.sha256(raw).hexdigest()[:32]
+
+
+class PromptAudioCache:
+    """
+    Disk-backed, memory-mapped μ-law cache
+
+    get() returns a read-only memoryview (no copy) or None on a miss.
+    put() writes atomically (temp file + rename) so several workers can
+    populate the same directory at startup without tearing files.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or Config.AUDIO_CACHE_DIR
+        self._maps = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, text, voice, language):
+        return os.path.join(self.directory, prompt_key(text, voice, language) + '.ulaw')
+
+    def get(self, text, voice, language):
+        key = prompt_key(text, voice, language)
+        view = self._maps.get(key)
+        if view is not None:
+            self.hits += 1
+            return view
+
+        path = os.path.join(self.directory, key + '.ulaw')
+        try:
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    raise FileNotFoundError(path)
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        view = memoryview(mapped)
+        with self._lock:
+            view = self._maps.setdefault(key, view)
+        self.hits += 1
+        return view
+
+    def contains(self, text, voice, language):
+        return os.path.exists(self.path_for(text, voice, language))
+
+    def put(self, text, voice, language, ulaw_bytes):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(text, voice, language)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(ulaw_bytes)
+        os.replace(tmp_path, path)
+        self._update_index(prompt_key(text, voice, language), text, voice, language, len(ulaw_bytes))
+        return path
+
+    def _update_index(self, key, text, voice, language, size):
+        """Human-readable manifest, only used for inspection"""
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        with self._lock:
+            try:
+                with open(index_path, encoding='utf-8') as f:
+                    index = json.load(f)
+            except (FileNotFoundError, ValueError):
+                index = {}
+            index[key] = {"text": text, "voice": voice, "language": language, "bytes": size}
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, index_path)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "mapped": len(self._maps)}
+
+
+def fixed_prompts():
+    """
+    Every (text, voice, language) we speak verbatim on the streaming path
+    """
+    # Imported here: voice_handler pulls in Flask/Twilio, the cache should not
+    from app.voice_handler import (
+        ACKNOWLEDGMENTS,
+        FALLBACK_GREETINGS,
+        NEW_CUSTOMER_GREETING,
+        NEW_CUSTOMER_GREETING_LANGUAGE,
+        fallback_greeting
+    )
+
+    # Each prompt only in its own language (and that language's voice)
+    prompts = [(text, OPENAI_TTS_VOICES.get(language, 'alloy'), language)
+               for language, text in ACKNOWLEDGMENTS.items()]
+    prompts += [(fallback_greeting(language), OPENAI_TTS_VOICES.get(language, 'alloy'), language)
+                for language in FALLBACK_GREETINGS]
+    prompts.append((NEW_CUSTOMER_GREETING,
+                    OPENAI_TTS_VOICES.get(NEW_CUSTOMER_GREETING_LANGUAGE, 'alloy'),
+                    NEW_CUSTOMER_GREETING_LANGUAGE))
+    return prompts
+
+
+async def prerender(cache, synthesize, prompts=None, concurrency=4):
+    """
+    Synthesize every missing prompt; returns (rendered, already_cached)
+
+    synthesize(text, language) -> μ-law bytes (same signature as TTSPipeline)
+    """
+    prompts = prompts if prompts is not None else fixed_prompts()
+    missing = [p for p in prompts if not cache.contains(*p)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def render(text, voice, language):
+        async with semaphore:
+            audio = await synthesize(text, language)
+            cache.put(text, voice, language, audio)
+            log.debug("   🎵 Cached", language=language, voice=voice, text=text[:50], seconds=round(len(audio) / 8000, 1))
+
+    await asyncio.gather(*(render(*p) for p in missing))
+    return len(missing), len(prompts) - len(missing)
+
+
+def cached_synthesizer(cache, synthesize, voices=OPENAI_TTS_VOICES):
+    """
+    Wrap a TTS function so sentences that match a pre-rendered prompt are
+    served straight from the memory map
+    """
+    async def _synthesize(sentence, language):
+        audio = cache.get(sentence, voices.get(language, 'alloy'), language)
+        if audio is not None:
+            return audio
+        return await synthesize(sentence, language)
+    return _synthesize
+
+
+def warm_prompt_cache_in_background():
+    """Render any missing prompts at web-process startup without delaying boot"""
+    if not Config.OPENAI_API_KEY:
+        return None
+
+    def _run():
+        from openai import AsyncOpenAI
+        from app.tts_pipeline import openai_tts_ulaw
+
+        async def _render():
+            client = AsyncOpenAI(api_key=Config.OPENAI_API_KEY)
+            return await prerender(prompt_cache, lambda text, lang: openai_tts_ulaw(client, text, lang))
+
+        try:
+            rendered, cached = asyncio.run(_render())
+            log.info("🎵 Prompt audio cache ready", rendered=rendered, cached=cached)
+        except Exception as e:
+            log.warning("⚠️  Prompt audio pre-render failed", error=str(e))
+
+    thread = threading.Thread(target=_run, name='prompt-cache-warmup', daemon=True)
+    thread.start()
+    return thread
+
+
+# Process-wide instance (mmaps are shared by every call in this worker)
+prompt_cache = PromptAudioCache()
@@ -0,0 +1,86 @@
+"""
+G.711 μ-law helpers for Twilio Media Streams
+
+Twilio sends and expects 8kHz mono μ-law, base64 encoded, in 20ms frames
+(160 bytes). Everything here is vectorized with numpy lookup tables so a
+frame costs a single array index instead of a Python loop per sample.
+"""
+import numpy as np
+
+SAMPLE_RATE = 8000
+FRAME_MS = 20
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000  # 160 samples = 160 μ-law bytes
+
+_BIAS = 0x84
+_ENCODE_BIAS = 0x21
+_ENCODE_CLIP = 8159
+
+
+def _build_decode_table():
+    """Standard G.711 μ-law → 16-bit linear PCM table (256 entries)"""
+    codes = ~np.arange(256, dtype=np.int32) & 0xFF
+    sign = codes & 0x80
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = (((mantissa << 3) + _BIAS) << exponent) - _BIAS
+    return np.where(sign != 0, -magnitude, magnitude).astype(np.int16)
+
+
+def _build_encode_table():
+    """Segment lookup for the 8 μ-law segments, indexed by (14-bit magnitude >> 6)"""
+    return np.array([int(i).bit_length() for i in range(129)], dtype=np.int32)
+
+
+ULAW_DECODE_TABLE = _build_decode_table()
+_SEGMENT_TABLE = _build_encode_table()
+
+
+def ulaw_to_pcm(data):
+    """
+    Decode μ-law bytes (bytes, bytearray or memoryview) to int16 PCM samples
+    """
+    codes = np.frombuffer(data, dtype=np.uint8)
+    return ULAW_DECODE_TABLE[codes]
+
+
+def pcm_to_ulaw(samples):
+    """
+    Encode int16 PCM samples to μ-law bytes
+    """
+    # Same 14-bit arithmetic as the CCITT reference encoder (and audioop)
+    pcm = np.asarray(samples, dtype=np.int32) >> 2
+    mask = np.where(pcm < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(pcm), _ENCODE_CLIP) + _ENCODE_BIAS
+    segment = _SEGMENT_TABLE[magnitude >> 6]
+    code = (segment << 4) | ((magnitude >> (segment + 1)) & 0x0F)
+    code = np.where(segment > 7, 0x7F, code)  # Clipped peaks land past the last segment
+    return (code ^ mask).astype(np.uint8).tobytes()
+
+
+def _lowpass_taps(ratio, n_taps=31):
+    """Windowed-sinc anti-aliasing filter for integer decimation"""
+    n = np.arange(n_taps) - (n_taps - 1) / 2
+    taps = np.sinc(n / ratio) * np.hamming(n_taps)
+    return (taps / taps.sum()).astype(np.float32)
+
+
+_DECIMATION_TAPS = {}
+
+
+def downsample_pcm(samples, from_rate, to_rate=SAMPLE_RATE):
+    """
+    Downsample int16 PCM by an integer factor (e.g. OpenAI TTS 24kHz → 8kHz)
+    """
+    if from_rate == to_rate:
+        return np.asarray(samples, dtype=np.int16)
+    if from_rate % to_rate:
+        raise ValueError(f"Unsupported resample {from_rate} → {to_rate}")
+
+    ratio = from_rate // to_rate
+    taps = _DECIMATION_TAPS.get(ratio)
+    if taps is None:
+        taps = _DECIMATION_TAPS[ratio] = _lowpass_taps(ratio)
+
+    x = np.asarray(samples, dtype=np.float32)
+    filtered = np.convolve(x, taps, mode='same')[::ratio]
+    return np.clip(filtered, -32768, 32767).astype(np.int16)
@@ -0,0 +1,382 @@
+"""
+Record / replay cassettes of real conversations
+
+With CASSETTE_MODE=record, every Twilio-facing request (WhatsApp message,
+voice turn) and everything it triggers is written to one JSON cassette per
+conversation (keyed by the caller's number) in CASSETTE_DIR:
+
+- the inbound form post (route + Twilio fields) and when it arrived
+- each LLM request/response (OpenAIProvider, both MCPProvider rounds)
+- each MCP tool call and its output
+- each backend HTTP exchange (app/database.py)
+
+with how long each took. Phone numbers are replaced by stable pseudonyms
+and names/passports by placeholders before anything touches disk (names
+also inside prompts and answers); API keys and headers are never recorded.
+
+benchmarks/replay.py loads cassettes and switches this module to replay:
+the same call sites then return the recorded responses (optionally
+sleeping the original durations, scaled) instead of calling out, so two
+versions of IntelligenceClient / MCPProvider / the tools can be compared
+on identical traffic.
+
+Call sites wrap the real call:
+
+    result = exchange('http', key, request_dict, lambda: _send_request(...))
+
+With CASSETTE_MODE=off (default) that is a single attribute check.
+
+The cassette is found through the correlation id contextvar. Work handed
+to a thread pool must carry it: submit with contextvars.copy_context().run
+(app/database.py, app/prefetch.py) or set_correlation_id() in the worker
+(deferred voice turns); otherwise its exchanges are neither recorded nor
+replayed.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from datetime import datetime
+
+from app.config import Config
+from app.logger import PHONE_PATTERN, get_correlation_id
+
+OFF = 'off'
+RECORD = 'record'
+REPLAY = 'replay'
+
+# Inbound routes that start / continue a conversation
+TWILIO_ROUTES = ('/webhook', '/voice/incoming', '/voice/process', '/voice/result', '/voice/streaming')
+
+# Values of these keys are replaced wholesale (names, documents, free-form PII)
+REDACT_KEYS = {'full_name', 'name', 'passport', 'passport_number', 'email', 'address', 'iccid'}
+NAME_KEYS = {'full_name', 'name'}
+# 'name' is also a tool / function / message field: those dicts keep it
+TOOL_KEYS = {'role', 'arguments', 'parameters', 'description'}
+# Placeholder names that are not PII
+NOT_NAMES = {'Visitor', 'Unknown', 'None'}
+
+
+class CassetteMiss(RuntimeError):
+    """Replay asked for an exchange the cassette doesn't have"""
+
+
+# ---------- Redaction ----------
+
+def pseudonym_phone(raw):
+    """Same number -> same fake number (keeps country code, length and any '+')"""
+    digits = ''.join(c for c in raw if c.isdigit())
+    hashed = int(hashlib.sha256(digits.encode()).hexdigest(), 16)
+    fake = digits[:2] + f"{hashed % 10 ** (len(digits) - 2):0{len(digits) - 2}d}"
+    return ('+' if raw.startswith('+') else '') + fake
+
+
+def _placeholder(key, value):
+    return f"<{key}:{hashlib.sha256(value.encode()).hexdigest()[:8]}>"
+
+
+def _is_tool(value):
+    return isinstance(value, dict) and not TOOL_KEYS.isdisjoint(value)
+
+
+def known_names(value, found=None):
+    """Customer names under NAME_KEYS anywhere in `value` (to redact them in free text too)"""
+    found = set() if found is None else found
+    if isinstance(value, dict):
+        for k, v in value.items():
+            if k in NAME_KEYS and isinstance(v, str) and v.strip() not in NOT_NAMES and not _is_tool(value):
+                found.add(v.strip())
+            else:
+                known_names(v, found)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            known_names(v, found)
+    return found
+
+
+def name_pattern(names):
+    """One regex for the full names and their parts ("Hello Ayşe"), longest first"""
+    parts = set(names)
+    for name in names:
+        parts.update(part for part in name.split() if len(part) >= 3)
+    # As they appear inside ASCII-escaped JSON ("Ay\\u015fe") as well
+    parts |= {json.dumps(part)[1:-1] for part in parts}
+    parts = [part for part in parts if part]
+    if not parts:
+        return None
+    alternatives = '|'.join(re.escape(part) for part in sorted(parts, key=len, reverse=True))
+    return re.compile(rf"(?<!\w)({alternatives})(?!\w)")
+
+
+def _unescape(text):
+    """A name as matched inside escaped JSON -> the name (same placeholder either way)"""
+    try:
+        return json.loads(f'"{text}"')
+    except ValueError:
+        return text
+
+
+def redact(value, key=None, names=None):
+    """
+    Recursively pseudonymize phone numbers and blank out PII fields
+
+    `names` (a name_pattern()) are also replaced wherever they appear in
+    text: system prompts, the JSON customer context, model answers.
+    """
+    if isinstance(value, dict):
+        tool = _is_tool(value)
+        return {k: redact(v, None if tool and k == 'name' else k, names) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(v, names=names) for v in value]
+    if isinstance(value, str):
+        if key in REDACT_KEYS and value and value not in NOT_NAMES:
+            return _placeholder(key, value)
+        if names is not None:
+            value = names.sub(lambda m: _placeholder('name', _unescape(m.group(1))), value)
+        return PHONE_PATTERN.sub(lambda m: pseudonym_phone(m.group(1)), value)
+    return value
+
+
+def estimate_tokens(value):
+    """~4 characters per token; good enough to compare prompt sizes between runs"""
+    text = value if isinstance(value, str) else json.dumps(value, default=str, ensure_ascii=False)
+    return (len(text) + 3) // 4
+
+
+# ---------- Cassette ----------
+
+class Cassette:
+    """One conversation: its inbound turns and every exchange they caused"""
+
+    def __init__(self, conversation_id, turns=None, recorded_at=None):
+        self.conversation_id = conversation_id
+        self.turns = turns or []
+        self.recorded_at = recorded_at or datetime.now().isoformat(timespec='seconds')
+        self._started = time.time()
+        self._lock = threading.Lock()
+        self._queues = None
+
+    # --- recording ---
+
+    def add_turn(self, route, form):
+        with self._lock:
+            turn = {
+                'route': route,
+                'form': dict(form),
+                'offset_s': round(time.time() - self._started, 3),
+                'exchanges': [],
+            }
+            self.turns.append(turn)
+            return turn
+
+    def add_exchange(self, kind, key, request, response, duration, error=None):
+        with self._lock:
+            if not self.turns:
+                return
+            self.turns[-1]['exchanges'].append({
+                'kind': kind,
+                'key': key,
+                'request': request,
+                'response': response,
+                'duration_s': round(duration, 4),
+                'error': error,
+            })
+
+    def to_dict(self):
+        with self._lock:
+            data = {
+                'conversation_id': self.conversation_id,
+                'recorded_at': self.recorded_at,
+                'turns': self.turns,
+            }
+            return redact(data, names=name_pattern(known_names(self.turns)))
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        data = self.to_dict()
+        path = os.path.join(directory, f"{data['conversation_id'].lstrip('+')}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1, default=str)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['conversation_id'], data['turns'], data.get('recorded_at'))
+
+    # --- replay ---
+
+    def take(self, kind, key):
+        """Next recorded exchange for (kind, key); LLM calls match by order alone"""
+        with self._lock:
+            if self._queues is None:
+                self._queues = defaultdict(deque)
+                for turn in self.turns:
+                    for ex in turn['exchanges']:
+                        self._queues[(ex['kind'], None if ex['kind'] == 'llm' else ex['key'])].append(ex)
+            queue = self._queues.get((kind, None if kind == 'llm' else key))
+            return queue.popleft() if queue else None
+
+
+# ---------- Recorder / replayer ----------
+
+class CassetteDeck:
+    """Routes exchanges of the current request to its conversation's cassette"""
+
+    def __init__(self, mode=OFF, directory=None):
+        self.mode = mode
+        self.directory = directory or Config.CASSETTE_DIR
+        self.speed = 1.0
+        self.stats = Counter()
+        self._by_conversation = {}
+        self._by_correlation = {}
+        self._lock = threading.Lock()
+
+    # --- inbound turns ---
+
+    def begin_turn(self, route, form):
+        """Flask before_request hook for the Twilio routes"""
+        if self.mode != RECORD or route not in TWILIO_ROUTES:
+            return
+        caller = (form.get('From') or 'unknown').replace('whatsapp:', '').replace('client:', '').strip()
+        correlation = form.get('CallSid') or form.get('MessageSid')
+        with self._lock:
+            cassette = self._by_conversation.get(caller)
+            if cassette is None:
+                cassette = self._by_conversation[caller] = Cassette(caller)
+            if correlation:
+                self._by_correlation[correlation] = cassette
+        cassette.add_turn(route, form)
+
+    def end_turn(self, route, form):
+        """Flask after_request hook: flush the conversation to disk"""
+        if self.mode != RECORD or route not in TWILIO_ROUTES:
+            return
+        cassette = self._current(form.get('CallSid') or form.get('MessageSid'))
+        if cassette is not None:
+            cassette.save(self.directory)
+
+    def flush(self):
+        with self._lock:
+            cassettes = list(self._by_conversation.values())
+        for cassette in cassettes:
+            cassette.save(self.directory)
+
+    # --- replay setup ---
+
+    def start_replay(self, speed=1.0):
+        self.mode = REPLAY
+        self.speed = speed
+
+    def load(self, cassette):
+        """Make a cassette answer for every CallSid / MessageSid in its turns"""
+        with self._lock:
+            for turn in cassette.turns:
+                correlation = turn['form'].get('CallSid') or turn['form'].get('MessageSid')
+                if correlation:
+                    self._by_correlation[correlation] = cassette
+
+    def _current(self, correlation=None):
+        """Cassette of the current turn (None in threads that didn't inherit its context)"""
+        correlation = correlation or get_correlation_id()
+        if correlation is None:
+            return None
+        return self._by_correlation.get(correlation)
+
+    # --- exchanges ---
+
+    def exchange(self, kind, key, request, call, encode=None, decode=None):
+        """Run `call` (recording it), or answer it from the cassette when replaying"""
+        if self.mode == OFF:
+            return call()
+        cassette = self._current()
+        if cassette is None:
+            return call()
+        if self.mode == REPLAY:
+            recorded = self._replay(cassette, kind, key, request)
+            if self.speed:
+                time.sleep(recorded['duration_s'] * self.speed)
+            return self._result(recorded, decode)
+
+        started = time.perf_counter()
+        try:
+            result = call()
+        except Exception as e:
+            cassette.add_exchange(kind, key, request, None, time.perf_counter() - started, repr(e))
+            raise
+        cassette.add_exchange(kind, key, request, encode(result) if encode else result,
+                              time.perf_counter() - started)
+        return result
+
+    async def exchange_async(self, kind, key, request, call, encode=None, decode=None):
+        """exchange() for coroutines; `call` returns an awaitable"""
+        if self.mode == OFF:
+            return await call()
+        cassette = self._current()
+        if cassette is None:
+            return await call()
+        if self.mode == REPLAY:
+            recorded = self._replay(cassette, kind, key, request)
+            if self.speed:
+                await asyncio.sleep(recorded['duration_s'] * self.speed)
+            return self._result(recorded, decode)
+
+        started = time.perf_counter()
+        try:
+            result = await call()
+        except Exception as e:
+            cassette.add_exchange(kind, key, request, None, time.perf_counter() - started, repr(e))
+            raise
+        cassette.add_exchange(kind, key, request, encode(result) if encode else result,
+                              time.perf_counter() - started)
+        return result
+
+    def _replay(self, cassette, kind, key, request):
+        recorded = cassette.take(kind, key)
+        with self._lock:
+            self.stats[f'{kind}_calls'] += 1
+            if recorded is None:
+                self.stats[f'{kind}_misses'] += 1
+            elif kind == 'llm':
+                usage = (recorded['response'] or {}).get('usage') or {}
+                self.stats['llm_prompt_tokens'] += estimate_tokens(request)
+                self.stats['llm_recorded_prompt_tokens'] += estimate_tokens(recorded['request'])
+                self.stats['llm_completion_tokens'] += usage.get('completion_tokens', 0)
+        if recorded is None:
+            raise CassetteMiss(f"No recorded {kind} exchange for {key}")
+        return recorded
+
+    @staticmethod
+    def _result(recorded, decode):
+        if recorded['error']:
+            raise RuntimeError(f"Recorded failure: {recorded['error']}")
+        return decode(recorded['response']) if decode else recorded['response']
+
+
+deck = CassetteDeck(Config.CASSETTE_MODE)
+exchange = deck.exchange
+exchange_async = deck.exchange_async
+
+
+def llm_request(**kwargs):
+    """What we keep of a chat.completions.create() call (no client, no keys)"""
+    request = {k: v for k, v in kwargs.items() if k in ('model', 'tools', 'tool_choice', 'temperature', 'max_tokens')}
+    request['messages'] = [m.model_dump(exclude_none=True) if hasattr(m, 'model_dump') else m
+                           for m in kwargs.get('messages', [])]
+    return request
+
+
+def encode_completion(completion):
+    return completion.model_dump(exclude_none=True)
+
+
+def decode_completion(data):
+    from openai.types.chat import ChatCompletion
+    return ChatCompletion.model_validate(data)
@@ -10,4 +10,80 @@ class Config:
     TWILIO_WHATSAPP_NUMBER = os.getenv('TWILIO_WHATSAPP_NUMBER')
     DATABASE_URL =os.getenv('DATABASE_URL') 
     DATABASE_URL_DIRECT = os.getenv('DATABASE_URL_DIRECT')
-    MCP_SERVER_PATH = os.getenv('MCP_SERVER_PATH')
\ No newline at end of file
+    MCP_SERVER_PATH = os.getenv('MCP_SERVER_PATH')
+    # Shared tool server (mcpsc with MCP_TRANSPORT=streamable-http, e.g. http://127.0.0.1:8765/mcp;
+    # an URL ending in /sse uses the SSE transport). Unset = spawn mcpsc over stdio per turn.
+    MCP_SERVER_URL = os.getenv('MCP_SERVER_URL')
+    MCP_POOL_SIZE = int(os.getenv('MCP_POOL_SIZE', '2'))
+    # Trim MCP tool results to the fields the model needs before the second LLM round
+    TOOL_PROJECTION_ENABLED = os.getenv('TOOL_PROJECTION_ENABLED', 'true').lower() == 'true'
+    # Per-call LLM routing (intelligence/model_router.py): the fast model below the
+    # complexity threshold of each call type, the strong one above it (or when disabled)
+    MODEL_ROUTING_ENABLED = os.getenv('MODEL_ROUTING_ENABLED', 'true').lower() == 'true'
+    MODEL_FAST = os.getenv('MODEL_FAST', 'gpt-4o-mini')
+    MODEL_STRONG = os.getenv('MODEL_STRONG', 'gpt-4o')
+    MODEL_LATENCY_TARGET_VOICE_MS = float(os.getenv('MODEL_LATENCY_TARGET_VOICE_MS', '1200'))
+    MODEL_LATENCY_TARGET_CHAT_MS = float(os.getenv('MODEL_LATENCY_TARGET_CHAT_MS', '3000'))
+    MODEL_THRESHOLD_TOOL_SELECTION = float(os.getenv('MODEL_THRESHOLD_TOOL_SELECTION', '0.25'))
+    MODEL_THRESHOLD_FINAL = float(os.getenv('MODEL_THRESHOLD_FINAL', '0.6'))
+    MODEL_THRESHOLD_CHAT = float(os.getenv('MODEL_THRESHOLD_CHAT', '0.4'))
+    AUDIO_CACHE_DIR = os.getenv('AUDIO_CACHE_DIR', 'audio_cache')
+    PRERENDER_AUDIO_ON_STARTUP = os.getenv('PRERENDER_AUDIO_ON_STARTUP', 'true').lower() == 'true'
+    # Streaming VAD end-of-turn silence per language, overriding app/vad.py's
+    # defaults (e.g. "TR=900,AR=1000"); unset = built-in table
+    VAD_ENDPOINT_SILENCE_MS = os.getenv('VAD_ENDPOINT_SILENCE_MS', '')
+    # Voice turns: answer /voice/process with the acknowledgment immediately
+    # and let Twilio poll /voice/result for the AI reply. Pending turns live in
+    # the worker process: needs one web worker (gunicorn --threads) or sticky routing
+    VOICE_DEFERRED_TURNS = os.getenv('VOICE_DEFERRED_TURNS', 'false').lower() == 'true'
+    DEFERRED_TURN_WORKERS = int(os.getenv('DEFERRED_TURN_WORKERS', '8'))
+    DEFERRED_POLL_WAIT = float(os.getenv('DEFERRED_POLL_WAIT', '1.0'))
+    # Minimum language-ID confidence (0-1) to switch a call away from the
+    # caller's language: unknown callers (country code) / known customers
+    LANGUAGE_SWITCH_CONFIDENCE = float(os.getenv('LANGUAGE_SWITCH_CONFIDENCE', '0.75'))
+    LANGUAGE_SWITCH_CONFIDENCE_KNOWN = float(os.getenv('LANGUAGE_SWITCH_CONFIDENCE_KNOWN', '0.9'))
+    # Deterministic intent fast path (intelligence/intent_router.py): answer obvious
+    # turns from a tool or template when confidence >= threshold (0-1)
+    INTENT_ROUTER_ENABLED = os.getenv('INTENT_ROUTER_ENABLED', 'true').lower() == 'true'
+    INTENT_ROUTER_THRESHOLD = float(os.getenv('INTENT_ROUTER_THRESHOLD', '0.75'))
+    # Arrival-time customer snapshot prefetch (customer, balance, subscriptions, device)
+    PREFETCH_ENABLED = os.getenv('PREFETCH_ENABLED', 'true').lower() == 'true'
+    PREFETCH_MAX_AGE = float(os.getenv('PREFETCH_MAX_AGE', '60'))
+    PREFETCH_WORKERS = int(os.getenv('PREFETCH_WORKERS', '16'))
+    # Backend API: per-endpoint timeout = p99 * multiplier + margin (clamped),
+    # GET retries limited to BACKEND_RETRY_BUDGET of traffic
+    BACKEND_TIMEOUT_DEFAULT = float(os.getenv('BACKEND_TIMEOUT_DEFAULT', '3'))
+    BACKEND_TIMEOUT_MIN = float(os.getenv('BACKEND_TIMEOUT_MIN', '0.5'))
+    BACKEND_TIMEOUT_MAX = float(os.getenv('BACKEND_TIMEOUT_MAX', '15'))
+    BACKEND_TIMEOUT_MULTIPLIER = float(os.getenv('BACKEND_TIMEOUT_MULTIPLIER', '1.5'))
+    BACKEND_TIMEOUT_MARGIN = float(os.getenv('BACKEND_TIMEOUT_MARGIN', '0.25'))
+    BACKEND_LATENCY_WINDOW = int(os.getenv('BACKEND_LATENCY_WINDOW', '200'))
+    BACKEND_LATENCY_MIN_SAMPLES = int(os.getenv('BACKEND_LATENCY_MIN_SAMPLES', '20'))
+    BACKEND_MAX_RETRIES = int(os.getenv('BACKEND_MAX_RETRIES', '2'))
+    BACKEND_RETRY_BUDGET = float(os.getenv('BACKEND_RETRY_BUDGET', '0.1'))
+    BACKEND_BACKOFF_BASE = float(os.getenv('BACKEND_BACKOFF_BASE', '0.1'))
+    BACKEND_BACKOFF_MAX = float(os.getenv('BACKEND_BACKOFF_MAX', '1.0'))
+    # Background warm-up pings (skipped while real traffic keeps the backend warm)
+    WARMUP_ENABLED = os.getenv('WARMUP_ENABLED', 'true').lower() == 'true'
+    WARMUP_INTERVAL = float(os.getenv('WARMUP_INTERVAL', '240'))
+    WARMUP_MIN_INTERVAL = float(os.getenv('WARMUP_MIN_INTERVAL', '60'))
+    WARMUP_MAX_INTERVAL = float(os.getenv('WARMUP_MAX_INTERVAL', '600'))
+    WARMUP_COLD_SECONDS = float(os.getenv('WARMUP_COLD_SECONDS', '2.0'))
+    WARMUP_COLD_FACTOR = float(os.getenv('WARMUP_COLD_FACTOR', '4'))
+    # Per-turn span tracing + /metrics histograms (false = no-op spans)
+    TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'true').lower() == 'true'
+    TRACE_SLOW_TURN_SECONDS = float(os.getenv('TRACE_SLOW_TURN_SECONDS', '5'))
+    # Structured logging: DEBUG < VERBOSE (payloads, sampled) < INFO; text or json
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+    LOG_VERBOSE_SAMPLE_RATE = float(os.getenv('LOG_VERBOSE_SAMPLE_RATE', '0.1'))
+    LOG_REDACT_PHONES = os.getenv('LOG_REDACT_PHONES', 'true').lower() == 'true'
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    # Conversation cassettes: off | record (replay is driven by benchmarks/replay.py)
+    CASSETTE_MODE = os.getenv('CASSETTE_MODE', 'off').lower()
+    CASSETTE_DIR = os.getenv('CASSETTE_DIR', 'cassettes')
+    # Hot reads (customer/balance/subscriptions by phone): api | postgres (direct, pooled)
+    DATA_BACKEND = os.getenv('DATA_BACKEND', 'api').lower()
+    PG_POOL_MIN = int(os.getenv('PG_POOL_MIN', '1'))
+    PG_POOL_MAX = int(os.getenv('PG_POOL_MAX', '10'))
+    PG_STATEMENT_TIMEOUT_MS = int(os.getenv('PG_STATEMENT_TIMEOUT_MS', '2000'))
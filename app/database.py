@@ -1,16 +1,62 @@
+import contextvars
 import requests
 import os
+import time
 from dotenv import load_dotenv
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import Config
+from app.latency import backend_latency, endpoint_key
+from app.singleflight import SingleFlight
+from app.cassette import exchange
+from app.logger import get_logger
+from app.pg_backend import PostgresError, pg_backend
+from app.tracing import span
 
 load_dotenv()
 
+log = get_logger(__name__)
+
 # API Configuration
 API_BASE_URL = os.getenv('API_BASE_URL', 'https://turkcellaiapi.onrender.com')
 API_KEY = os.getenv('API_KEY')
 
+# Identical GETs in flight at the same moment share one upstream call
+backend_flight = SingleFlight('backend')
+
+
 def _make_request(method, endpoint, data=None, params=None):
-    """Helper function to make API requests with X-API-Key authentication"""
+    """
+    Helper function to make API requests with X-API-Key authentication
+
+    GETs are idempotent, so concurrent identical ones are coalesced.
+    """
+    with span(f"http {method.upper()} {endpoint_key(endpoint)}"):
+        if method.upper() == 'GET':
+            key = (endpoint, tuple(sorted((k, str(v)) for k, v in (params or {}).items())))
+            return backend_flight.do(key, _recorded_request, method, endpoint, data, params)
+        return _recorded_request(method, endpoint, data, params)
+
+
+def _recorded_request(method, endpoint, data=None, params=None):
+    """_send_request, captured to / answered from a cassette when one is active (app/cassette.py)"""
+    query = '&'.join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+    return exchange(
+        'http', f"{method.upper()} {endpoint}?{query}",
+        {'method': method.upper(), 'endpoint': endpoint, 'params': params, 'data': data},
+        lambda: _send_request(method, endpoint, data, params),
+    )
+
+
+def _send_request(method, endpoint, data=None, params=None):
+    """
+    HTTP round trip(s); returns parsed JSON or None on any failure
+
+    The timeout comes from this endpoint's observed latency (app/latency.py).
+    Idempotent GETs retry timeouts, connection errors, 429 and 5xx with
+    jittered backoff, as long as the global retry budget allows.
+    """
     url = f"{API_BASE_URL}{endpoint}"
     headers = {
         'Content-Type': 'application/json'
@@ -19,34 +65,92 @@ def _make_request(method, endpoint, data=None, params=None):
     if API_KEY:
         headers['X-API-Key'] = API_KEY
     
-    # Increase timeout for slow API (Render free tier can be slow)
-    TIMEOUT = 3
+    method = method.upper()
+    retryable = method == 'GET'
+    backend_latency.budget.deposit()
     
-    try:
-        if method.upper() == 'GET':
-            response = requests.get(url, params=params, headers=headers, timeout=TIMEOUT)
-        elif method.upper() == 'POST':
-            response = requests.post(url, json=data, headers=headers, timeout=TIMEOUT)
-        elif method.upper() == 'PATCH':
-            response = requests.patch(url, json=data, headers=headers, timeout=TIMEOUT)
-        elif method.upper() == 'DELETE':
-            response = requests.delete(url, headers=headers, timeout=TIMEOUT)
-        else:
-            raise ValueError(f"Unsupported HTTP method: {method}")
-        
-        print(f"   Response status: {response.status_code} ({response.elapsed.total_seconds():.2f}s)")
+    for attempt in range(Config.BACKEND_MAX_RETRIES + 1):
+        timeout = backend_latency.timeout_for(endpoint)
+        started = time.perf_counter()
         
-        response.raise_for_status()
-        return response.json()
-        
-    except requests.exceptions.Timeout:
-        print(f"⚠️  API timeout: {endpoint} (>{TIMEOUT}s)")
-        return None
-    except requests.exceptions.RequestException as e:
-        print(f"❌ API error ({endpoint}): {e}")
-        if hasattr(e, 'response') and hasattr(e.response, 'text'):
-            print(f"   Response: {e.response.text[:300]}")
-        return None
+        try:
+            if method == 'GET':
+                response = requests.get(url, params=params, headers=headers, timeout=timeout)
+            elif method == 'POST':
+                response = requests.post(url, json=data, headers=headers, timeout=timeout)
+            elif method == 'PATCH':
+                response = requests.patch(url, json=data, headers=headers, timeout=timeout)
+            elif method == 'DELETE':
+                response = requests.delete(url, headers=headers, timeout=timeout)
+            else:
+                raise ValueError(f"Unsupported HTTP method: {method}")
+            
+            backend_latency.record(endpoint, time.perf_counter() - started)
+            log.debug("   Response status", endpoint=endpoint, status=response.status_code,
+                      elapsed_ms=round(response.elapsed.total_seconds() * 1000))
+            
+            if retryable and (response.status_code == 429 or response.status_code >= 500):
+                backend_latency.record_error(endpoint)
+                if _retry(endpoint, attempt, f"HTTP {response.status_code}"):
+                    continue
+            
+            response.raise_for_status()
+            return response.json()
+            
+        except requests.exceptions.Timeout:
+            backend_latency.record_timeout(endpoint, timeout)
+            log.warning("⚠️  API timeout", endpoint=endpoint, timeout_s=round(timeout, 2))
+            if retryable and _retry(endpoint, attempt, "timeout"):
+                continue
+            return None
+        except requests.exceptions.ConnectionError as e:
+            backend_latency.record_error(endpoint)
+            log.error("❌ API connection error", endpoint=endpoint, error=str(e))
+            if retryable and _retry(endpoint, attempt, "connection error"):
+                continue
+            return None
+        except requests.exceptions.RequestException as e:
+            log.error("❌ API error", endpoint=endpoint, error=str(e))
+            if hasattr(e, 'response') and hasattr(e.response, 'text'):
+                log.verbose("   Response", body=e.response.text[:300])
+            return None
+    
+    return None
+
+
+def _direct_read(name, *args):
+    """
+    DATA_BACKEND=postgres: answer a hot read from app/pg_backend.py
+
+    Returns (True, result), or (False, None) when the API should be asked
+    instead (backend off or the query failed).
+    """
+    if pg_backend is None:
+        return False, None
+    try:
+        with span(f"pg {name}"):
+            return True, backend_flight.do(
+                ('pg', name) + args, exchange,
+                'db', f"{name} {' '.join(map(str, args))}", {'query': name, 'args': list(args)},
+                lambda: getattr(pg_backend, name)(*args),
+            )
+    except PostgresError:
+        log.info("↩️  Falling back to the API", query=name)
+        return False, None
+
+
+def _retry(endpoint, attempt, reason):
+    """Sleep and return True if another attempt is allowed"""
+    if attempt >= Config.BACKEND_MAX_RETRIES:
+        return False
+    if not backend_latency.budget.withdraw():
+        log.warning("⚠️  Retry budget exhausted - not retrying", endpoint=endpoint, reason=reason)
+        return False
+    delay = backend_latency.backoff(attempt)
+    log.info("🔁 Retrying", endpoint=endpoint, delay_s=round(delay, 2), reason=reason,
+             attempt=f"{attempt + 2}/{Config.BACKEND_MAX_RETRIES + 1}")
+    time.sleep(delay)
+    return True
 
 
 # ==================== CUSTOMERS ====================
@@ -59,15 +163,17 @@ def get_customer_by_phone(phone_number):
     """
     phone = phone_number.replace('whatsapp:', '').replace(' ', '').strip()
     
-    print(f"🔍 API: Looking up customer by phone: {phone}")
+    log.debug("🔍 API: Looking up customer by phone", phone=phone)
     
-    result = _make_request('GET', '/api/v1/customers/lookup', params={'phone': phone})
+    found, result = _direct_read('customer_by_phone', phone)
+    if not found:
+        result = _make_request('GET', '/api/v1/customers/lookup', params={'phone': phone})
     
     if result:
-        print(f"✅ API: Customer found")
+        log.debug("✅ API: Customer found")
         return result
     
-    print(f"⚠️  API: Customer not found")
+    log.info("⚠️  API: Customer not found")
     return None
 
 
@@ -77,7 +183,7 @@ def get_customer_by_id(customer_id):
     
     Endpoint: GET /api/v1/customers/{customer_id}
     """
-    print(f"🔍 API: Looking up customer by ID: {customer_id}")
+    log.debug("🔍 API: Looking up customer by ID", customer_id=customer_id)
     
     result = _make_request('GET', f'/api/v1/customers/{customer_id}')
     return result
@@ -89,12 +195,12 @@ def create_customer(customer_data):
     
     Endpoint: POST /api/v1/customers
     """
-    print(f"📝 API: Creating customer - {customer_data.get('full_name')}")
+    log.debug("📝 API: Creating customer")
     
     result = _make_request('POST', '/api/v1/customers', data=customer_data)
     
     if result:
-        print(f"✅ API: Customer created")
+        log.debug("✅ API: Customer created")
     return result
 
 
@@ -104,7 +210,7 @@ def update_customer(customer_id, update_data):
     
     Endpoint: PATCH /api/v1/customers/{customer_id}
     """
-    print(f"📝 API: Updating customer: {customer_id}")
+    log.debug("📝 API: Updating customer", customer_id=customer_id)
     
     result = _make_request('PATCH', f'/api/v1/customers/{customer_id}', data=update_data)
     return result
@@ -116,7 +222,7 @@ def delete_customer(customer_id):
     
     Endpoint: DELETE /api/v1/customers/{customer_id}
     """
-    print(f"🗑️  API: Deleting customer: {customer_id}")
+    log.debug("🗑️  API: Deleting customer", customer_id=customer_id)
     
     result = _make_request('DELETE', f'/api/v1/customers/{customer_id}')
     return result
@@ -128,9 +234,11 @@ def get_customer_subscriptions(customer_id):
     
     Endpoint: GET /api/v1/customers/{customer_id}/subscriptions
     """
-    print(f"📱 API: Getting subscriptions for customer: {customer_id}")
+    log.debug("📱 API: Getting subscriptions for customer", customer_id=customer_id)
     
-    result = _make_request('GET', f'/api/v1/customers/{customer_id}/subscriptions')
+    found, result = _direct_read('subscriptions_by_customer', customer_id)
+    if not found:
+        result = _make_request('GET', f'/api/v1/customers/{customer_id}/subscriptions')
     return result
 
 
@@ -144,10 +252,10 @@ def get_packages(package_type=None):
     Endpoint: GET /api/v1/packages/type/{package_type}
     """
     if package_type:
-        print(f"📦 API: Getting packages of type: {package_type}")
+        log.debug("📦 API: Getting packages of type", package_type=package_type)
         result = _make_request('GET', f'/api/v1/packages/type/{package_type}')
     else:
-        print(f"📦 API: Getting all packages")
+        log.debug("📦 API: Getting all packages")
         result = _make_request('GET', '/api/v1/packages')
     
     return result if result else []
@@ -169,7 +277,7 @@ def recommend_package(usage_data):
     
     Endpoint: GET /api/v1/packages/search/recommend
     """
-    print(f"💡 API: Getting package recommendation")
+    log.debug("💡 API: Getting package recommendation")
     
     result = _make_request('GET', '/api/v1/packages/search/recommend', params=usage_data)
     return result
@@ -181,7 +289,7 @@ def compare_packages(package_ids):
     
     Endpoint: GET /api/v1/packages/compare/packages
     """
-    print(f"📊 API: Comparing packages")
+    log.debug("📊 API: Comparing packages")
     
     params = {'package_ids': ','.join(package_ids) if isinstance(package_ids, list) else package_ids}
     result = _make_request('GET', '/api/v1/packages/compare/packages', params=params)
@@ -196,7 +304,7 @@ def get_balance_by_subscription(subscription_id):
     
     Endpoint: GET /api/v1/balances/subscription/{subscription_id}
     """
-    print(f"💰 API: Getting balance for subscription: {subscription_id}")
+    log.debug("💰 API: Getting balance for subscription", subscription_id=subscription_id)
     
     result = _make_request('GET', f'/api/v1/balances/subscription/{subscription_id}')
     return result
@@ -210,9 +318,11 @@ def get_balance_by_phone(phone_number):
     """
     phone = phone_number.replace('whatsapp:', '').replace(' ', '').replace('+', '').strip()
     
-    print(f"💰 API: Getting balance for phone: {phone}")
+    log.debug("💰 API: Getting balance for phone", phone=phone)
     
-    result = _make_request('GET', f'/api/v1/balances/phone/{phone}')
+    found, result = _direct_read('balance_by_phone', phone)
+    if not found:
+        result = _make_request('GET', f'/api/v1/balances/phone/{phone}')
     return result
 
 
@@ -222,7 +332,7 @@ def update_balance(balance_id, balance_data):
     
     Endpoint: PATCH /api/v1/balances/{balance_id}
     """
-    print(f"📊 API: Updating balance: {balance_id}")
+    log.debug("📊 API: Updating balance", balance_id=balance_id)
     
     result = _make_request('PATCH', f'/api/v1/balances/{balance_id}', data=balance_data)
     return result
@@ -234,7 +344,7 @@ def recharge_balance(balance_id, recharge_data):
     
     Endpoint: POST /api/v1/balances/{balance_id}/recharge
     """
-    print(f"💳 API: Recharging balance: {balance_id}")
+    log.debug("💳 API: Recharging balance", balance_id=balance_id)
     
     result = _make_request('POST', f'/api/v1/balances/{balance_id}/recharge', data=recharge_data)
     return result
@@ -246,7 +356,7 @@ def get_usage_history(subscription_id, days=30):
     
     Endpoint: GET /api/v1/balances/subscription/{subscription_id}/usage-history
     """
-    print(f"📈 API: Getting usage history for subscription: {subscription_id}")
+    log.debug("📈 API: Getting usage history for subscription", subscription_id=subscription_id)
     
     params = {'days': days}
     result = _make_request('GET', f'/api/v1/balances/subscription/{subscription_id}/usage-history', params=params)
@@ -271,7 +381,7 @@ def get_device_context(subscription_id):
     
     Endpoint: GET /api/v1/troubleshooting/device/{subscription_id}
     """
-    print(f"📱 API: Getting device context: {subscription_id}")
+    log.debug("📱 API: Getting device context", subscription_id=subscription_id)
     
     result = _make_request('GET', f'/api/v1/troubleshooting/device/{subscription_id}')
     return result
@@ -283,7 +393,7 @@ def update_device_context(subscription_id, device_data):
     
     Endpoint: POST /api/v1/troubleshooting/device/{subscription_id}
     """
-    print(f"📱 API: Updating device context: {subscription_id}")
+    log.debug("📱 API: Updating device context", subscription_id=subscription_id)
     
     result = _make_request('POST', f'/api/v1/troubleshooting/device/{subscription_id}', data=device_data)
     return result
@@ -297,7 +407,7 @@ def get_network_status():
     
     Returns: dict with 'issues' key containing list of network issues
     """
-    print(f"🌐 API: Getting network status")
+    log.debug("🌐 API: Getting network status")
     
     result = _make_request('GET', '/api/v1/troubleshooting/network-status')
     
@@ -314,7 +424,7 @@ def get_network_status_by_region(region):
     
     Endpoint: GET /api/v1/troubleshooting/network-status/region/{region}
     """
-    print(f"🌐 API: Getting network status for region: {region}")
+    log.debug("🌐 API: Getting network status for region", region=region)
     
     result = _make_request('GET', f'/api/v1/troubleshooting/network-status/region/{region}')
     
@@ -333,7 +443,7 @@ def search_knowledge_base(query, language='EN', limit=3):
     
     NOTE: Query parameters go in URL, but it's still a POST request
     """
-    print(f"📚 API: Searching knowledge base - '{query}' (Language: {language})")
+    log.debug("📚 API: Searching knowledge base", query=query, language=language)
     
     # Build URL with query parameters
     url = f"{API_BASE_URL}/api/v1/troubleshooting/knowledge-base/search"
@@ -353,7 +463,7 @@ def search_knowledge_base(query, language='EN', limit=3):
     try:
         # POST request with query parameters in URL
         response = requests.post(url, params=params, headers=headers, timeout=10)
-        print(f"   Response status: {response.status_code}")
+        log.debug("   Response status", status=response.status_code)
         
         response.raise_for_status()
         result = response.json()
@@ -366,15 +476,15 @@ def search_knowledge_base(query, language='EN', limit=3):
                 results = result if isinstance(result, list) else []
             
             if results:
-                print(f"✅ API: Found {len(results)} knowledge base results")
+                log.debug("✅ API: Found knowledge base results", count=len(results))
                 return results
         
     except requests.exceptions.RequestException as e:
-        print(f"❌ API error: {e}")
+        log.error("❌ API error", error=str(e))
         if hasattr(e, 'response') and hasattr(e.response, 'text'):
-            print(f"   Response: {e.response.text[:300]}")
+            log.verbose("   Response", body=e.response.text[:300])
     
-    print(f"⚠️  API: No knowledge base results found")
+    log.debug("⚠️  API: No knowledge base results found")
     return []
 
 
@@ -384,7 +494,7 @@ def smart_diagnose(subscription_id):
     
     Endpoint: GET /api/v1/troubleshooting/diagnose/{subscription_id}
     """
-    print(f"🔍 API: Running smart diagnosis: {subscription_id}")
+    log.debug("🔍 API: Running smart diagnosis", subscription_id=subscription_id)
     
     result = _make_request('GET', f'/api/v1/troubleshooting/diagnose/{subscription_id}')
     return result
@@ -396,7 +506,7 @@ def find_nearby_stores(latitude, longitude, radius_km=5):
     
     Endpoint: GET /api/v1/troubleshooting/stores/nearby
     """
-    print(f"🏪 API: Finding stores near ({latitude}, {longitude})")
+    log.debug("🏪 API: Finding stores near", latitude=latitude, longitude=longitude)
     
     params = {
         'latitude': latitude,
@@ -422,7 +532,7 @@ def log_interaction(customer_id, channel, user_message, ai_response, intent=None
     Note: This endpoint may not exist in your API
     """
     if not customer_id:
-        print("⚠️  API: No customer_id, skipping interaction log")
+        log.info("⚠️  API: No customer_id, skipping interaction log")
         return None
     
     interaction_data = {
@@ -434,38 +544,53 @@ def log_interaction(customer_id, channel, user_message, ai_response, intent=None
         "session_id": session_id
     }
     
-    print(f"💾 API: Attempting to log {channel} interaction")
+    log.debug("💾 API: Attempting to log interaction", channel=channel)
     
     result = _make_request('POST', '/api/v1/interactions', data=interaction_data)
     
     if result:
-        print(f"✅ API: Interaction logged")
+        log.debug("✅ API: Interaction logged")
         return result
     else:
-        print(f"ℹ️  API: Interaction logging not available (skipping)")
+        log.info("ℹ️  API: Interaction logging not available (skipping)")
         return None
 
 
 # ==================== CONVENIENCE FUNCTIONS ====================
 
+# Balance lookups running alongside get_full_customer_profile's customer lookup
+profile_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='profile')
+
+
 def get_full_customer_profile(phone_number):
     """
     Get complete customer profile with all related data
+
+    Customer and balance are fetched concurrently; subscriptions follow
+    as soon as the customer_id is known. With DATA_BACKEND=postgres it is
+    a single query instead.
     """
-    print(f"👤 API: Building full customer profile for: {phone_number}")
+    log.debug("👤 API: Building full customer profile", phone=phone_number)
+    
+    found, profile = _direct_read('full_profile', phone_number.replace('whatsapp:', '').replace(' ', '').strip())
+    if found:
+        return profile
+    
+    # Copied context: the balance call keeps the turn's trace, correlation id and cassette
+    balance_future = profile_executor.submit(contextvars.copy_context().run, get_balance_by_phone, phone_number)
     
     # Get customer
     customer = get_customer_by_phone(phone_number)
     if not customer:
+        balance_future.cancel()     # no waiting for a balance nobody will read
         return None
     
-    # Get subscriptions
+    # Get subscriptions (while the balance request is still in flight)
     subscriptions = None
     if customer.get('customer_id'):
         subscriptions = get_customer_subscriptions(customer['customer_id'])
     
-    # Get balance by phone
-    balance = get_balance_by_phone(phone_number)
+    balance = balance_future.result()
     
     # Combine into single profile
     profile = {
@@ -474,7 +599,7 @@ def get_full_customer_profile(phone_number):
         'balance': balance
     }
     
-    print(f"✅ API: Full profile built for {customer.get('full_name', 'Unknown')}")
+    log.debug("✅ API: Full profile built", customer_id=customer.get('customer_id'))
     return profile
 
 
@@ -505,15 +630,15 @@ def create_support_ticket(ticket_data):
             "ai_attempted_resolution": "Previous conversation..."
         }
     """
-    print(f"🎫 API: Creating support ticket - {ticket_data.get('issue_type')}")
+    log.debug("🎫 API: Creating support ticket", issue_type=ticket_data.get('issue_type'))
     
     # Try to create ticket - if endpoint doesn't exist, fail gracefully
     result = _make_request('POST', '/api/v1/support-tickets', data=ticket_data)
     
     if result:
         ticket_id = (result.get('data') or result).get('ticket_id')
-        print(f"✅ API: Ticket created with ID: {ticket_id}")
+        log.info("✅ API: Ticket created", ticket_id=ticket_id)
         return result.get('data') or result
     
-    print(f"ℹ️  API: Support ticket endpoint not available (skipping)")
+    log.info("ℹ️  API: Support ticket endpoint not available (skipping)")
     return None
\ No newline at end of file
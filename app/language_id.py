@@ -0,0 +1,257 @@
+"""
+Language identification for customer utterances (TR / EN / DE / RU / AR)
+
+Two stages, both cheap enough to run on every turn:
+1. Unicode script: Arabic and Cyrillic letters settle AR / RU outright.
+2. Latin text is scored against character 1-3 gram profiles (naive Bayes,
+   log probabilities precompiled into one dict lookup per n-gram, and
+   per-word scores cached since callers reuse a small vocabulary).
+
+Unlike substring keyword matching, "ne" no longer fires inside "internet"
+and a word shared by several languages ("internet", "paket") only
+contributes the evidence its spelling actually carries.
+
+Add a language with register_language(code, script, training_text).
+"""
+import math
+import re
+import unicodedata
+from collections import Counter
+
+DEFAULT_LANGUAGE = 'EN'
+
+LATIN = 'LATIN'
+CYRILLIC = 'CYRILLIC'
+ARABIC = 'ARABIC'
+
+# Small domain-flavoured corpora: telecom support phrasing plus everyday words.
+# Profiles only need a few KB of text per language to separate EN/TR/DE well.
+TRAINING_TEXT = {
+    'EN': """
+        hello hi good morning I need help with my phone. my internet is not working since this morning.
+        how much data do I have left on my package? what is my balance? can you check my account please.
+        I bought a tourist sim card at the airport and it does not connect to the network.
+        the signal is very weak in my hotel room. is there an outage in my area right now?
+        which package is best for two weeks? I want more gigabytes and unlimited calls.
+        thank you very much, that's all for today. goodbye and have a nice day.
+        my phone says no service. should I restart the device or enable data roaming?
+        I was charged too much for this card, is that normal? the price was very high.
+        where is the nearest store? can I talk to a human agent? please call me back later.
+        the messages are not being delivered and I cannot make any calls at all.
+        could you tell me when my plan expires and how I can top up the balance?
+        it worked yesterday but today everything is slow and the pages will not load.
+        yes please. no thanks. okay, sure. of course. what? why? that's right. I don't know.
+    """,
+    'TR': """
+        merhaba iyi günler yardıma ihtiyacım var. internetim bu sabahtan beri çalışmıyor.
+        paketimde ne kadar internet kaldı? bakiyemi öğrenmek istiyorum. hesabımı kontrol eder misiniz lütfen.
+        havalimanında turist hattı aldım ama şebekeye bağlanmıyor. otel odamda çekim çok zayıf.
+        bölgemde şu anda bir arıza var mı? iki hafta için hangi paket daha uygun?
+        daha fazla gigabayt ve sınırsız konuşma istiyorum. çok teşekkür ederim, bugünlük bu kadar.
+        hoşça kalın, iyi günler dilerim. telefonum servis yok diyor. cihazı yeniden başlatmalı mıyım?
+        veri dolaşımını açmam gerekiyor mu? bu hat için çok fazla para ödedim, bu normal mi?
+        en yakın mağaza nerede? bir müşteri temsilcisiyle görüşebilir miyim? beni daha sonra arayın.
+        mesajlarım gitmiyor ve hiç arama yapamıyorum. tarifem ne zaman bitiyor ve nasıl yükleme yapabilirim?
+        dün çalışıyordu ama bugün her şey çok yavaş ve sayfalar açılmıyor. neden böyle oluyor acaba?
+        benim numaram bu, faturamı görmek istiyorum. şifremi unuttum, yeni bir kart lazım.
+        evet lütfen. hayır teşekkürler. tamam, olur. tabii ki. efendim? neden? doğru. bilmiyorum.
+    """,
+    'DE': """
+        hallo guten tag ich brauche hilfe mit meinem handy. mein internet funktioniert seit heute morgen nicht.
+        wie viel datenvolumen habe ich noch in meinem paket? wie hoch ist mein guthaben? bitte prüfen sie mein konto.
+        ich habe am flughafen eine touristen sim karte gekauft und sie verbindet sich nicht mit dem netz.
+        der empfang in meinem hotelzimmer ist sehr schwach. gibt es gerade eine störung in meiner region?
+        welches paket ist für zwei wochen am besten? ich möchte mehr gigabyte und unbegrenzte anrufe.
+        vielen dank, das ist alles für heute. auf wiedersehen und einen schönen tag noch.
+        mein telefon zeigt kein netz an. soll ich das gerät neu starten oder datenroaming einschalten?
+        ich habe zu viel für diese karte bezahlt, ist das normal? der preis war sehr hoch.
+        wo ist der nächste laden? kann ich mit einem mitarbeiter sprechen? bitte rufen sie mich später zurück.
+        die nachrichten werden nicht zugestellt und ich kann überhaupt nicht telefonieren.
+        können sie mir sagen, wann mein tarif abläuft und wie ich das guthaben aufladen kann?
+        gestern hat es noch funktioniert, aber heute ist alles langsam und die seiten laden nicht.
+        ja bitte. nein danke. okay, gut. natürlich. wie bitte? warum? genau. ich weiß es nicht.
+    """,
+    'RU': """
+        здравствуйте добрый день мне нужна помощь с телефоном. мой интернет не работает с утра.
+        сколько трафика осталось в моем пакете? какой у меня баланс? проверьте мой счет пожалуйста.
+        я купил туристическую сим карту в аэропорту и она не подключается к сети.
+        в моем номере в отеле очень слабый сигнал. есть ли сейчас авария в моем районе?
+        какой пакет лучше всего на две недели? спасибо большое, это все на сегодня. до свидания.
+    """,
+    'AR': """
+        مرحبا صباح الخير أحتاج إلى مساعدة في هاتفي. الإنترنت لا يعمل منذ الصباح.
+        كم بقي من البيانات في باقتي؟ ما هو رصيدي؟ من فضلك تحقق من حسابي.
+        اشتريت شريحة سياحية في المطار ولا تتصل بالشبكة. الإشارة ضعيفة جدا في غرفتي في الفندق.
+        هل يوجد عطل في منطقتي الآن؟ ما هي أفضل باقة لمدة أسبوعين؟ شكرا جزيلا وداعا.
+    """,
+}
+
+# Which languages each script can mean (extend when adding e.g. Ukrainian or Persian)
+SCRIPT_LANGUAGES = {
+    LATIN: ['EN', 'TR', 'DE'],
+    CYRILLIC: ['RU'],
+    ARABIC: ['AR'],
+}
+
+_WORD_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+_NGRAM_ORDERS = (1, 2, 3)
+_SMOOTHING = 0.5
+_TEMPERATURE = 0.25
+_WORD_CACHE_SIZE = 50000
+
+
+# Letters per script (counted with findall, i.e. in C rather than per character)
+_SCRIPT_PATTERNS = {
+    LATIN: re.compile(r'[a-zA-Z\u00C0-\u024F]'),
+    CYRILLIC: re.compile(r'[\u0400-\u052F]'),
+    ARABIC: re.compile(r'[\u0620-\u064A\u066E-\u06D3\u0750-\u077F\uFB50-\uFDFF\uFE70-\uFEFF]'),
+}
+
+
+def _normalize(text):
+    # Turkish dotted capital İ lowercases to "i̇" (i + combining dot) - fold it
+    text = text.replace('İ', 'i')
+    return unicodedata.normalize('NFC', text.lower())
+
+
+def _word_ngrams(word):
+    """Character n-grams of one space-padded word"""
+    padded = f" {word} "
+    for n in _NGRAM_ORDERS:
+        for i in range(len(padded) - n + 1):
+            gram = padded[i:i + n]
+            if gram != ' ':
+                yield gram
+
+
+def _ngrams(text):
+    """Character n-grams over every word of a text"""
+    for word in _WORD_RE.findall(text):
+        yield from _word_ngrams(word)
+
+
+class LanguageIdentifier:
+    """
+    Script detection + character n-gram naive Bayes
+
+    identify(text)         -> (language, confidence 0..1)
+    identify_batch(texts)  -> [(language, confidence), ...]
+    """
+
+    def __init__(self, training_text=None, script_languages=None):
+        self.training_text = dict(training_text or TRAINING_TEXT)
+        self.script_languages = {k: list(v) for k, v in (script_languages or SCRIPT_LANGUAGES).items()}
+        self._compile()
+
+    def register_language(self, code, script, training_text):
+        """Add (or retrain) a language profile at runtime"""
+        self.training_text[code] = training_text
+        languages = self.script_languages.setdefault(script, [])
+        if code not in languages:
+            languages.append(code)
+        self._compile()
+
+    def _compile(self):
+        """Turn every training corpus into {ngram: log P(ngram | language)}"""
+        counts = {lang: Counter(_ngrams(_normalize(text))) for lang, text in self.training_text.items()}
+        vocabulary = set().union(*counts.values()) if counts else set()
+
+        self.profiles = {}
+        self.unseen = {}
+        for lang, counter in counts.items():
+            total = sum(counter.values()) + _SMOOTHING * (len(vocabulary) + 1)
+            self.profiles[lang] = {g: math.log((c + _SMOOTHING) / total) for g, c in counter.items()}
+            self.unseen[lang] = math.log(_SMOOTHING / total)
+
+        # Per script: one {ngram: (logp_lang1, logp_lang2, ...)} table, so
+        # scoring is a single dict lookup per n-gram whatever the language count
+        self._tables = {}
+        for script, languages in self.script_languages.items():
+            languages = tuple(lang for lang in languages if lang in self.profiles)
+            if not languages:
+                continue
+            unseen = tuple(self.unseen[lang] for lang in languages)
+            grams = set().union(*(self.profiles[lang] for lang in languages))
+            table = {
+                g: tuple(self.profiles[lang].get(g, self.unseen[lang]) for lang in languages)
+                for g in grams
+            }
+            self._tables[script] = (languages, table, unseen)
+        self._word_scores = {script: {} for script in self._tables}
+
+    def _score_word(self, script, word):
+        """Summed n-gram log-likelihoods of one word, cached (speech reuses words a lot)"""
+        cache = self._word_scores[script]
+        scores = cache.get(word)
+        if scores is None:
+            _, table, unseen = self._tables[script]
+            rows = [table.get(g, unseen) for g in _word_ngrams(word)]
+            scores = (tuple(map(sum, zip(*rows))), len(rows))
+            if len(cache) >= _WORD_CACHE_SIZE:
+                cache.clear()
+            cache[word] = scores
+        return scores
+
+    def identify(self, text):
+        """Return (language, confidence) for one utterance"""
+        if not text or not text.strip():
+            return DEFAULT_LANGUAGE, 0.0
+
+        normalized = _normalize(text)
+
+        # 1. Script vote over letters only
+        scripts = {script: len(pattern.findall(normalized)) for script, pattern in _SCRIPT_PATTERNS.items()}
+        letters = sum(scripts.values())
+        if not letters:
+            return DEFAULT_LANGUAGE, 0.0
+
+        script = max(scripts, key=scripts.get)
+        script_share = scripts[script] / letters
+        if script not in self._tables:
+            return DEFAULT_LANGUAGE, 0.0
+
+        languages, _, _ = self._tables[script]
+        if len(languages) == 1:
+            return languages[0], round(script_share, 3)
+
+        # 2. N-gram log-likelihood among languages sharing the script
+        scores = [0.0] * len(languages)
+        n_grams = 0
+        for word in _WORD_RE.findall(normalized):
+            word_scores, n = self._score_word(script, word)
+            n_grams += n
+            for i, value in enumerate(word_scores):
+                scores[i] += value
+
+        if not n_grams:
+            return DEFAULT_LANGUAGE, 0.0
+
+        top = max(scores)
+        best = languages[scores.index(top)]
+        # Tempered posterior: naive Bayes is overconfident because n-grams overlap
+        total = sum(math.exp((value - top) * _TEMPERATURE) for value in scores)
+        return best, round(script_share / total, 3)
+
+    def identify_batch(self, texts):
+        """Identify many transcripts (analytics); repeated texts are scored once"""
+        seen = {}
+        results = []
+        for text in texts:
+            if text not in seen:
+                seen[text] = self.identify(text)
+            results.append(seen[text])
+        return results
+
+
+# Shared instance: profiles are compiled once per process
+language_identifier = LanguageIdentifier()
+
+
+def identify_language(text):
+    """(language, confidence) for a single utterance"""
+    return language_identifier.identify(text)
+
+
+def identify_languages(texts):
+    """Batch API for analytics over stored transcripts"""
+    return language_identifier.identify_batch(texts)
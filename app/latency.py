@@ -0,0 +1,176 @@
+"""
+Adaptive backend timeouts and a global retry budget
+
+A fixed 3s timeout is wrong in both directions: a customer lookup that
+normally answers in 150ms should give up long before 3s, while
+/troubleshooting/diagnose on a cold Render instance needs more. So every
+endpoint gets a rolling latency window, and its timeout is
+
+    p99 * BACKEND_TIMEOUT_MULTIPLIER + BACKEND_TIMEOUT_MARGIN
+
+clamped to [BACKEND_TIMEOUT_MIN, BACKEND_TIMEOUT_MAX]. A request that
+times out is recorded at its timeout, so a slowing backend pushes its own
+timeout up instead of failing forever.
+
+Retries (idempotent GETs only) are paid from a token bucket that every
+request tops up by BACKEND_RETRY_BUDGET (0.1 = retries may add at most
+~10% load), with full-jitter exponential backoff. When the backend is
+struggling and everything fails, the bucket drains and we stop retrying
+instead of multiplying its load.
+"""
+import random
+import re
+import threading
+import time
+from collections import deque
+
+from app.config import Config
+
+# Cold-start friendly defaults until an endpoint has enough samples
+INITIAL_TIMEOUTS = {
+    '/api/v1/troubleshooting/diagnose': 10.0,
+}
+
+# Numbers, UUIDs and long tokens containing digits are ids; "v1" is not
+_ID_SEGMENT = re.compile(r'^\+?\d+$|^[0-9a-fA-F]{8}-[0-9a-fA-F-]{27}$|^(?=.*\d)[\w-]{12,}$')
+_NAMED_SEGMENTS = ('region', 'phone')  # Segment after these is a value, not a path
+
+
+def endpoint_key(endpoint):
+    """/api/v1/balances/phone/90555... -> /api/v1/balances/phone/{id}"""
+    parts = endpoint.split('?', 1)[0].split('/')
+    for i, part in enumerate(parts):
+        if part and (_ID_SEGMENT.search(part) or (i and parts[i - 1] in _NAMED_SEGMENTS)):
+            parts[i] = '{id}'
+    return '/'.join(parts)
+
+
+class LatencyWindow:
+    """Last N latencies of one endpoint (seconds), with percentiles"""
+
+    def __init__(self, size=None):
+        self.samples = deque(maxlen=size or Config.BACKEND_LATENCY_WINDOW)
+        self.count = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, p):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class RetryBudget:
+    """
+    Token bucket shared by all endpoints
+
+    Each request deposits `ratio` tokens; each retry withdraws one. A small
+    reserve lets a quiet process still retry an occasional blip.
+    """
+
+    def __init__(self, ratio=None, reserve=10):
+        self.ratio = Config.BACKEND_RETRY_BUDGET if ratio is None else ratio
+        self.reserve = reserve
+        self.tokens = float(reserve)
+        self.granted = 0
+        self.denied = 0
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.reserve, self.tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self.granted += 1
+                return True
+            self.denied += 1
+            return False
+
+
+class LatencyTracker:
+    """Per-endpoint windows + the shared retry budget"""
+
+    def __init__(self):
+        self.windows = {}
+        self.budget = RetryBudget()
+        self.last_activity = None   # time.time() of the last real backend response
+        self._lock = threading.Lock()
+
+    def window(self, endpoint):
+        key = endpoint_key(endpoint)
+        window = self.windows.get(key)
+        if window is None:
+            with self._lock:
+                window = self.windows.setdefault(key, LatencyWindow())
+        return window
+
+    def timeout_for(self, endpoint):
+        """Seconds to wait for this endpoint right now"""
+        window = self.window(endpoint)
+        if len(window.samples) < Config.BACKEND_LATENCY_MIN_SAMPLES:
+            key = endpoint_key(endpoint)
+            for prefix, seconds in INITIAL_TIMEOUTS.items():
+                if key.startswith(prefix):
+                    return seconds
+            return Config.BACKEND_TIMEOUT_DEFAULT
+
+        timeout = window.percentile(99) * Config.BACKEND_TIMEOUT_MULTIPLIER + Config.BACKEND_TIMEOUT_MARGIN
+        return max(Config.BACKEND_TIMEOUT_MIN, min(Config.BACKEND_TIMEOUT_MAX, timeout))
+
+    def record(self, endpoint, seconds):
+        self.window(endpoint).record(seconds)
+        self.last_activity = time.time()
+
+    def record_timeout(self, endpoint, timeout):
+        """Censored sample: it took at least `timeout`, so count it at that"""
+        window = self.window(endpoint)
+        window.timeouts += 1
+        window.record(timeout)
+
+    def record_error(self, endpoint):
+        self.window(endpoint).errors += 1
+
+    @staticmethod
+    def backoff(attempt):
+        """Full jitter: uniform(0, base * 2^attempt), capped"""
+        ceiling = min(Config.BACKEND_BACKOFF_MAX, Config.BACKEND_BACKOFF_BASE * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def stats(self):
+        with self._lock:
+            windows = dict(self.windows)
+        endpoints = {}
+        for key, window in sorted(windows.items()):
+            if not window.count:
+                continue
+            endpoints[key] = {
+                'requests': window.count,
+                'timeouts': window.timeouts,
+                'errors': window.errors,
+                'p50_ms': round(window.percentile(50) * 1000),
+                'p95_ms': round(window.percentile(95) * 1000),
+                'p99_ms': round(window.percentile(99) * 1000),
+                'timeout_s': round(self.timeout_for(key), 2),
+            }
+        return {
+            'endpoints': endpoints,
+            'retry_budget': {
+                'tokens': round(self.budget.tokens, 2),
+                'ratio': self.budget.ratio,
+                'granted': self.budget.granted,
+                'denied': self.budget.denied,
+            },
+        }
+
+
+# Process-wide tracker used by app/database.py
+backend_latency = LatencyTracker()
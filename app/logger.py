@@ -0,0 +1,189 @@
+"""
+Queue-backed structured logging for the hot paths
+
+print() from a dozen places per request meant synchronous, lock-contended
+stdout writes on every webhook thread, full tool outputs and AI replies in
+the logs, and caller phone numbers everywhere. Instead:
+
+    from app.logger import get_logger
+    log = get_logger(__name__)
+
+    log.info("✅ Customer found", customer_id=cid, elapsed_ms=120)
+    log.verbose("✅ Tool result", tool=name, output=text)   # sampled
+
+- Request threads only enqueue the record; one listener thread formats,
+  redacts and writes it. When the queue is full, records are dropped
+  (and counted) instead of blocking a caller.
+- Keyword arguments become structured fields.
+- Every record carries the correlation id of its call (Twilio CallSid or
+  MessageSid, set per request in main.py), falling back to the trace id.
+- VERBOSE records (payloads, transcripts) are opt-in (LOG_LEVEL=VERBOSE;
+  the default is INFO) and then kept at LOG_VERBOSE_SAMPLE_RATE.
+- Only our own logger tree is configured; process-wide logging module
+  flags are left alone.
+- Phone numbers are masked to their last 4 digits (LOG_REDACT_PHONES).
+- LOG_FORMAT=json prints one JSON object per line; text is the default.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+import threading
+from datetime import datetime
+
+from app.config import Config
+from app.tracing import current_trace_id
+
+VERBOSE = 15
+logging.addLevelName(VERBOSE, 'VERBOSE')
+
+ROOT_LOGGER = 'turkcell'
+
+# +<country code> with optional spaces/dashes, or 10-15 bare digits
+PHONE_PATTERN = re.compile(r'(?<![\w\-])(\+\d[\d \-]{8,17}\d|\d{10,15})(?![\w\-])')
+
+_correlation_id = contextvars.ContextVar('correlation_id', default=None)
+
+
+def set_correlation_id(value):
+    """Tag every log record of the current request / task with this id"""
+    return _correlation_id.set(value or None)
+
+
+def get_correlation_id():
+    return _correlation_id.get() or current_trace_id()
+
+
+def redact(text):
+    """+905551234567 -> +90*******4567 (keeps country code and last 4 digits)"""
+    def mask(match):
+        raw = match.group(1)
+        digits = re.sub(r'\D', '', raw)
+        if not 10 <= len(digits) <= 15:
+            return raw
+        prefix = '+' + digits[:2] if raw.startswith('+') else ''
+        hidden = len(digits) - 4 - (2 if prefix else 0)
+        return f"{prefix}{'*' * hidden}{digits[-4:]}"
+    return PHONE_PATTERN.sub(mask, text)
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """log.info(msg, **fields) on top of a stdlib logger, plus log.verbose()"""
+
+    def process(self, msg, kwargs):
+        fields = {k: kwargs.pop(k) for k in list(kwargs) if k not in ('exc_info', 'stack_info', 'stacklevel', 'extra')}
+        extra = kwargs.setdefault('extra', {})
+        extra['fields'] = fields
+        return msg, kwargs
+
+    def verbose(self, msg, *args, **kwargs):
+        self.log(VERBOSE, msg, *args, **kwargs)
+
+
+class _ContextFilter(logging.Filter):
+    """Runs on the caller's thread: stamps the correlation id, samples VERBOSE"""
+
+    def filter(self, record):
+        if record.levelno == VERBOSE and random.random() >= Config.LOG_VERBOSE_SAMPLE_RATE:
+            return False
+        record.correlation_id = get_correlation_id()
+        if not hasattr(record, 'fields'):
+            record.fields = {}
+        return True
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never block a request thread on logging: drop when the queue is full"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # In-process queue: hand the record over as is; the listener does
+        # the formatting (including exc_info) off the request thread
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Formatter(logging.Formatter):
+    """Runs on the listener thread, so redaction and JSON cost nothing to callers"""
+
+    def __init__(self, fmt):
+        super().__init__()
+        self.json = fmt == 'json'
+
+    def format(self, record):
+        message = record.getMessage()
+        fields = getattr(record, 'fields', {})
+        if record.exc_info:
+            fields = {**fields, 'error': self.formatException(record.exc_info)}
+
+        if self.json:
+            entry = {
+                'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+                'level': record.levelname,
+                'logger': record.name,
+                'msg': message,
+                'correlation_id': getattr(record, 'correlation_id', None),
+                **fields,
+            }
+            line = json.dumps(entry, ensure_ascii=False, default=str)
+        else:
+            correlation = getattr(record, 'correlation_id', None)
+            tag = f" [{correlation[-8:]}]" if correlation else ""
+            extras = ''.join(f" {k}={v}" for k, v in fields.items())
+            line = f"{datetime.fromtimestamp(record.created):%H:%M:%S} {record.levelname:<7}{tag} {message}{extras}"
+
+        return redact(line) if Config.LOG_REDACT_PHONES else line
+
+
+_listener = None
+_handler = None
+_lock = threading.Lock()
+
+
+def configure_logging():
+    """Install the queue handler + listener thread once per process"""
+    global _listener, _handler
+    with _lock:
+        if _listener is not None:
+            return
+        log_queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+        _handler = _DroppingQueueHandler(log_queue)
+        _handler.addFilter(_ContextFilter())
+
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(_Formatter(Config.LOG_FORMAT))
+        _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=False)
+        _listener.start()
+        atexit.register(_listener.stop)   # flush what's queued on shutdown
+
+        root = logging.getLogger(ROOT_LOGGER)
+        level = logging.getLevelName(Config.LOG_LEVEL.upper())     # knows VERBOSE too
+        root.setLevel(level if isinstance(level, int) else logging.INFO)
+        root.addHandler(_handler)
+        root.propagate = False
+
+
+def get_logger(name):
+    """Structured logger under the 'turkcell' hierarchy (configures logging on first use)"""
+    configure_logging()
+    return StructuredLogger(logging.getLogger(f"{ROOT_LOGGER}.{name}"), {})
+
+
+def logging_stats():
+    return {
+        'queued': _handler.queue.qsize() if _handler else 0,
+        'dropped': _handler.dropped if _handler else 0,
+    }
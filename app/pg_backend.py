@@ -0,0 +1,269 @@
+"""
+Direct PostgreSQL reads for the hottest lookups (DATA_BACKEND=postgres)
+
+Every turn starts with customer-by-phone, balance-by-phone and the
+customer's subscriptions. Through the REST API each of those is an HTTP
+hop to Render (plus its cold start); the data lives in the same Postgres
+that seed_database.py writes to. With DATA_BACKEND=postgres,
+app/database.py answers these reads here instead:
+
+- ThreadedConnectionPool, autocommit, with a server-side
+  statement_timeout; callers wait for a free connection rather than
+  failing when the pool is busy. PG_POOL_MIN connections are opened up
+  front, more on demand up to PG_POOL_MAX, and every one is kept open
+  once made (psycopg2 would otherwise close each connection returned
+  beyond PG_POOL_MIN, and its prepared statements with it).
+- Each query is PREPAREd once per connection and EXECUTEd after that:
+  no parse/plan per lookup. Prepared connections are tracked in a
+  WeakSet, so a closed and collected connection is never mistaken for
+  a new one.
+- full_profile() is one statement: customer + subscriptions + balance.
+- Customer rows carry the current package_name and balance_try, like
+  the API's customer response (callers build the turn context from them).
+- Rows come back as JSON (row_to_json), so ids and timestamps are
+  serialized the same way the API serializes them.
+
+On any database error the connection is discarded and PostgresError is
+raised; app/database.py then falls back to the HTTP API for that call,
+and, if the database is unreachable, for the next RETRY_AFTER seconds
+(one connect timeout per outage, not one per lookup).
+
+Uses DATABASE_URL_DIRECT when set: Supabase's transaction pooler
+(DATABASE_URL) does not keep prepared statements between transactions.
+"""
+import threading
+import time
+import weakref
+from collections import Counter
+
+from app.config import Config
+from app.logger import get_logger
+
+log = get_logger(__name__)
+
+RETRY_AFTER = 30
+
+# The customer's current subscription (active first, newest first): its
+# package name and balance. balance_try is read through to_jsonb() so the
+# statement still prepares where balances has no such column.
+CURRENT_PLAN = """
+    LEFT JOIN LATERAL (
+        SELECT p.package_name, to_jsonb(b) -> 'balance_try' AS balance_try
+        FROM subscriptions s
+        LEFT JOIN packages p ON p.package_id = s.package_id
+        LEFT JOIN balances b ON b.subscription_id = s.subscription_id
+        WHERE s.customer_id = c.customer_id
+        ORDER BY s.status IS DISTINCT FROM 'ACTIVE', s.activation_date DESC NULLS LAST,
+                 b.updated_at DESC NULLS LAST
+        LIMIT 1
+    ) plan ON true
+"""
+
+# name -> (parameter types, query). $1 is the lookup key.
+STATEMENTS = {
+    'customer_by_phone': ('text', f"""
+        SELECT row_to_json(x) FROM (
+            SELECT c.*, plan.package_name, plan.balance_try
+            FROM customers c
+            {CURRENT_PLAN}
+            WHERE c.whatsapp_number = $1
+            LIMIT 1
+        ) x
+    """),
+    'balance_by_phone': ('text', """
+        SELECT row_to_json(x) FROM (
+            SELECT b.*, s.msisdn, s.customer_id, s.package_id, s.status AS subscription_status,
+                   b.data_total_mb - b.data_used_mb AS data_remaining_mb,
+                   b.voice_total_min - b.voice_used_min AS voice_remaining_min,
+                   b.sms_total - b.sms_used AS sms_remaining
+            FROM subscriptions s
+            JOIN balances b ON b.subscription_id = s.subscription_id
+            WHERE s.msisdn IN ($1, '+' || $1)
+            ORDER BY s.activation_date DESC
+            LIMIT 1
+        ) x
+    """),
+    'subscriptions_by_customer': ('uuid', """
+        SELECT coalesce(json_agg(row_to_json(x) ORDER BY x.activation_date DESC), '[]'::json) FROM (
+            SELECT s.*, p.package_name, p.package_type, p.validity_days
+            FROM subscriptions s
+            LEFT JOIN packages p ON p.package_id = s.package_id
+            WHERE s.customer_id = $1
+        ) x
+    """),
+    'full_profile': ('text', f"""
+        SELECT json_build_object(
+            'customer', (SELECT row_to_json(x) FROM (SELECT c.*, plan.package_name, plan.balance_try) x),
+            'subscriptions', (
+                SELECT coalesce(json_agg(row_to_json(x) ORDER BY x.activation_date DESC), '[]'::json) FROM (
+                    SELECT s.*, p.package_name, p.package_type, p.validity_days
+                    FROM subscriptions s
+                    LEFT JOIN packages p ON p.package_id = s.package_id
+                    WHERE s.customer_id = c.customer_id
+                ) x
+            ),
+            'balance', (
+                SELECT row_to_json(y) FROM (
+                    SELECT b.*, s.msisdn, s.customer_id, s.package_id, s.status AS subscription_status,
+                           b.data_total_mb - b.data_used_mb AS data_remaining_mb,
+                           b.voice_total_min - b.voice_used_min AS voice_remaining_min,
+                           b.sms_total - b.sms_used AS sms_remaining
+                    FROM subscriptions s
+                    JOIN balances b ON b.subscription_id = s.subscription_id
+                    WHERE s.msisdn IN (c.whatsapp_number, ltrim(c.whatsapp_number, '+'))
+                    ORDER BY s.activation_date DESC
+                    LIMIT 1
+                ) y
+            )
+        )
+        FROM customers c
+        {CURRENT_PLAN}
+        WHERE c.whatsapp_number = $1
+        LIMIT 1
+    """),
+}
+
+
+class PostgresError(RuntimeError):
+    """The direct read failed; use the API instead"""
+
+
+class PostgresBackend:
+    """Pooled, prepared read-only queries against the Turkcell database"""
+
+    def __init__(self, dsn, min_connections=1, max_connections=10, statement_timeout_ms=2000,
+                 acquire_timeout=2.0):
+        self.dsn = dsn
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.statement_timeout_ms = statement_timeout_ms
+        self.acquire_timeout = acquire_timeout
+        self._pool = None
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._prepared = weakref.WeakSet()  # connections that have STATEMENTS prepared
+        self._lock = threading.Lock()
+        self._stats = Counter()
+        self._query_seconds = 0.0
+        self._down_until = 0.0
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    from psycopg2.pool import ThreadedConnectionPool
+                    self._pool = ThreadedConnectionPool(
+                        self.min_connections, self.max_connections, self.dsn,
+                        connect_timeout=5,
+                        options=f"-c statement_timeout={self.statement_timeout_ms}",
+                        application_name='turkcell-agent',
+                    )
+                    # putconn() closes connections beyond minconn: keep every one we open
+                    self._pool.minconn = self.max_connections
+                    log.info("🐘 Postgres pool ready", min=self.min_connections, max=self.max_connections)
+        return self._pool
+
+    def _prepare(self, conn):
+        with conn.cursor() as cursor:
+            for name, (types, query) in STATEMENTS.items():
+                cursor.execute(f"PREPARE {name}({types}) AS {query}")
+        self._prepared.add(conn)
+
+    def _execute(self, name, key):
+        """EXECUTE a prepared statement on a pooled connection; returns its single JSON value"""
+        import psycopg2
+
+        if time.time() < self._down_until:
+            self._stats['skipped'] += 1
+            raise PostgresError("Postgres marked down")
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            self._stats['pool_timeouts'] += 1
+            raise PostgresError("No free Postgres connection")
+        conn = None
+        broken = False
+        started = time.perf_counter()
+        try:
+            pool = self._get_pool()
+            conn = pool.getconn()
+            if conn.closed:
+                # Dropped while idle in the pool: replace it
+                pool.putconn(conn, close=True)
+                conn = pool.getconn()
+            if conn.autocommit is False:
+                conn.autocommit = True
+            if conn not in self._prepared:
+                self._prepare(conn)
+            with conn.cursor() as cursor:
+                cursor.execute(f"EXECUTE {name}(%s)", (key,))
+                row = cursor.fetchone()
+            self._stats['queries'] += 1
+            return row[0] if row else None
+        except psycopg2.Error as e:
+            broken = True
+            if isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+                self._down_until = time.time() + RETRY_AFTER
+            self._stats['errors'] += 1
+            log.warning("⚠️  Postgres read failed", query=name, error=str(e).strip())
+            raise PostgresError(str(e)) from e
+        finally:
+            self._query_seconds += time.perf_counter() - started
+            if conn is not None:
+                if broken:
+                    self._prepared.discard(conn)
+                self._pool.putconn(conn, close=broken)
+            self._slots.release()
+
+    # --- lookups (same shapes as the API responses) ---
+
+    def customer_by_phone(self, phone):
+        return self._execute('customer_by_phone', phone)
+
+    def balance_by_phone(self, msisdn):
+        return self._execute('balance_by_phone', msisdn.lstrip('+'))
+
+    def subscriptions_by_customer(self, customer_id):
+        return self._execute('subscriptions_by_customer', str(customer_id))
+
+    def full_profile(self, phone):
+        """Customer, subscriptions and balance in one round trip (None if unknown)"""
+        result = self._execute('full_profile', phone)
+        if not result:
+            return None
+        return {**result['customer'], 'subscriptions': result['subscriptions'], 'balance': result['balance']}
+
+    def stats(self):
+        queries = self._stats['queries']
+        return {
+            'backend': 'postgres',
+            'pool': f"{self.min_connections}-{self.max_connections}",
+            'queries': queries,
+            'errors': self._stats['errors'],
+            'pool_timeouts': self._stats['pool_timeouts'],
+            'skipped': self._stats['skipped'],
+            'up': time.time() >= self._down_until,
+            'avg_ms': round(self._query_seconds / queries * 1000, 1) if queries else None,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+                self._prepared.clear()
+
+
+def _create_backend():
+    if Config.DATA_BACKEND != 'postgres':
+        return None
+    dsn = Config.DATABASE_URL_DIRECT or Config.DATABASE_URL
+    if not dsn:
+        log.warning("⚠️  DATA_BACKEND=postgres but no DATABASE_URL(_DIRECT) - using the API")
+        return None
+    return PostgresBackend(dsn, Config.PG_POOL_MIN, Config.PG_POOL_MAX, Config.PG_STATEMENT_TIMEOUT_MS)
+
+
+# None unless DATA_BACKEND=postgres
+pg_backend = _create_backend()
+
+
+def data_backend_stats():
+    return pg_backend.stats() if pg_backend else {'backend': 'api'}
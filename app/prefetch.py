@@ -0,0 +1,264 @@
+"""
+Speculative customer snapshot prefetch at call / message arrival
+
+The caller's phone number is known the moment Twilio hits /voice/incoming,
+/voice/streaming or /webhook. Instead of waiting for the LLM to ask for
+the balance one tool round later, we start every backend lookup right
+away, concurrently:
+
+    customer ──> subscriptions ──> device context
+    balance
+
+Each part lands on a CustomerSnapshot with a timestamp. Context building
+and tools read a part only while it is fresh (PREFETCH_MAX_AGE seconds)
+and otherwise fetch it themselves. The cost is explicit: some prefetched
+parts are never used, and prefetch_stats() reports how many.
+"""
+import contextvars
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import Config
+from app.database import (
+    get_balance_by_phone,
+    get_customer_by_phone,
+    get_customer_subscriptions,
+    get_device_context
+)
+from app.logger import get_logger
+
+log = get_logger(__name__)
+
+CUSTOMER = 'customer'
+BALANCE = 'balance'
+SUBSCRIPTIONS = 'subscriptions'
+DEVICE = 'device'
+
+PARTS = (CUSTOMER, BALANCE, SUBSCRIPTIONS, DEVICE)
+
+prefetch_executor = ThreadPoolExecutor(max_workers=Config.PREFETCH_WORKERS, thread_name_prefix='prefetch')
+
+_snapshots = {}                 # clean phone -> CustomerSnapshot
+_snapshots_lock = threading.Lock()
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _count(key, n=1):
+    with _stats_lock:
+        _stats[key] += n
+
+
+def clean_phone(phone_number):
+    return (phone_number or '').replace('whatsapp:', '').replace('client:', '').replace(' ', '').strip()
+
+
+class CustomerSnapshot:
+    """
+    Everything we prefetched for one phone number, with fetch timestamps
+
+    get(part, wait=0) returns the value only if it is fresh; wait lets a
+    caller block briefly for a part that is still in flight.
+    """
+
+    def __init__(self, phone, max_age=None):
+        self.phone = phone
+        self.max_age = max_age if max_age is not None else Config.PREFETCH_MAX_AGE
+        self.started_at = time.time()
+        self.values = {}
+        self.fetched_at = {}
+        self.errors = {}
+        self.used = set()
+        self._events = {part: threading.Event() for part in PARTS}
+
+    # ---------- Writing (prefetch threads) ----------
+
+    def _store(self, part, fetch, *args):
+        try:
+            value = fetch(*args)
+            self.values[part] = value
+            self.fetched_at[part] = time.time()
+            _count('parts_fetched')
+            return value
+        except Exception as e:
+            self.errors[part] = str(e)
+            _count('parts_failed')
+            return None
+        finally:
+            self._events[part].set()
+
+    def _skip(self, *parts):
+        """A dependency is missing (unknown customer, no subscription)"""
+        for part in parts:
+            self._events[part].set()
+
+    # ---------- Reading ----------
+
+    def age(self, part):
+        fetched = self.fetched_at.get(part)
+        return None if fetched is None else time.time() - fetched
+
+    def is_fresh(self, part):
+        age = self.age(part)
+        return age is not None and age <= self.max_age
+
+    def get(self, part, wait=0):
+        """Fresh value of `part`, or None (missing, failed, stale or still loading)"""
+        if wait and not self._events[part].is_set():
+            self._events[part].wait(wait)
+
+        if not self.is_fresh(part):
+            _count('stale' if part in self.fetched_at else 'misses')
+            return None
+
+        value = self.values.get(part)
+        if value is not None and part not in self.used:
+            self.used.add(part)
+            _count('parts_used')
+        _count('hits')
+        return value
+
+    def wait(self, timeout=None):
+        """Block until every part has settled (or timeout); True if all did"""
+        deadline = None if timeout is None else time.time() + timeout
+        for event in self._events.values():
+            remaining = None if deadline is None else max(0, deadline - time.time())
+            if not event.wait(remaining):
+                return False
+        return True
+
+    def as_context(self):
+        """
+        Fresh parts as compact LLM context (with their age), so the model
+        can answer from them without a tool round
+        """
+        context = {}
+        for part in (BALANCE, SUBSCRIPTIONS, DEVICE):
+            value = self.get(part)
+            if value:
+                context[f"prefetched_{part}"] = value
+                context[f"prefetched_{part}_age_s"] = round(self.age(part), 1)
+        return context
+
+    def summary(self):
+        return {
+            part: ('fresh' if self.is_fresh(part) else 'error' if part in self.errors
+                   else 'stale' if part in self.fetched_at else 'pending' if not self._events[part].is_set()
+                   else 'skipped')
+            for part in PARTS
+        }
+
+
+def _first_subscription_id(subscriptions):
+    if isinstance(subscriptions, dict):
+        subscriptions = subscriptions.get('data') or subscriptions.get('subscriptions') or [subscriptions]
+    for subscription in subscriptions or []:
+        if isinstance(subscription, dict) and subscription.get('subscription_id'):
+            return subscription['subscription_id']
+    return None
+
+
+def _run(snapshot):
+    """Kick off both fetch chains on the prefetch pool"""
+    phone = snapshot.phone
+
+    def customer_chain():
+        customer = snapshot._store(CUSTOMER, get_customer_by_phone, phone)
+        if not customer or not customer.get('customer_id'):
+            snapshot._skip(SUBSCRIPTIONS, DEVICE)
+            return
+        subscriptions = snapshot._store(SUBSCRIPTIONS, get_customer_subscriptions, customer['customer_id'])
+        subscription_id = _first_subscription_id(subscriptions)
+        if not subscription_id:
+            snapshot._skip(DEVICE)
+            return
+        snapshot._store(DEVICE, get_device_context, subscription_id)
+
+    # Carry the caller's trace into the pool so backend spans land in its turn
+    prefetch_executor.submit(contextvars.copy_context().run, customer_chain)
+    prefetch_executor.submit(contextvars.copy_context().run, snapshot._store, BALANCE, get_balance_by_phone, phone)
+
+
+def start_prefetch(phone_number):
+    """
+    Start (or reuse) the snapshot for this caller; returns immediately
+
+    A snapshot younger than PREFETCH_MAX_AGE is reused, so a WhatsApp
+    conversation doesn't refetch everything on every message.
+    """
+    phone = clean_phone(phone_number)
+    if not Config.PREFETCH_ENABLED or not phone or phone == 'unknown':
+        return None
+
+    with _snapshots_lock:
+        snapshot = _snapshots.get(phone)
+        if snapshot and time.time() - snapshot.started_at <= snapshot.max_age:
+            _count('reused')
+            return snapshot
+
+        snapshot = CustomerSnapshot(phone)
+        _snapshots[phone] = snapshot
+        _evict_expired()
+
+    log.debug("⚡ Prefetching customer snapshot", phone=phone)
+    _count('snapshots')
+    _run(snapshot)
+    return snapshot
+
+
+def get_snapshot(phone_number):
+    """The current snapshot for this caller, if any (never starts a fetch)"""
+    with _snapshots_lock:
+        return _snapshots.get(clean_phone(phone_number))
+
+
+def lookup_customer(phone_number, wait=4.0):
+    """
+    Customer record via the snapshot (starting the prefetch if needed)
+
+    Waits up to `wait` seconds for the in-flight lookup (the API timeout is
+    3s) and falls back to a direct call if the prefetch failed.
+    """
+    snapshot = start_prefetch(phone_number)
+    if snapshot is None:
+        return get_customer_by_phone(clean_phone(phone_number))
+
+    customer = snapshot.get(CUSTOMER, wait=wait)
+    if customer is None and not snapshot.is_fresh(CUSTOMER):
+        customer = get_customer_by_phone(snapshot.phone)
+    return customer
+
+
+def prefetched(part, phone_number, fetch, *args, wait=0):
+    """
+    Fresh prefetched value if we have one, else call fetch(*args)
+
+    Lets tools (e.g. the intent router's balance lookup) transparently use
+    the arrival-time snapshot.
+    """
+    snapshot = get_snapshot(phone_number)
+    if snapshot:
+        value = snapshot.get(part, wait=wait)
+        if value is not None:
+            return value
+    return fetch(*args)
+
+
+def _evict_expired():
+    """Drop snapshots well past their freshness window (caller holds the lock)"""
+    now = time.time()
+    for phone in [p for p, s in _snapshots.items() if now - s.started_at > 2 * s.max_age]:
+        del _snapshots[phone]
+
+
+def prefetch_stats():
+    """Hit / waste counters: parts_fetched - parts_used is the extra backend cost"""
+    with _stats_lock:
+        stats = dict(_stats)
+    fetched = stats.get('parts_fetched', 0)
+    stats['used_ratio'] = round(stats.get('parts_used', 0) / fetched, 3) if fetched else 0.0
+    with _snapshots_lock:
+        stats['live_snapshots'] = len(_snapshots)
+    return stats
@@ -0,0 +1,189 @@
+"""
+Fixed-capacity ring buffer for inbound call audio
+
+One preallocated int16 array per call replaces `audio_buffer += chunk`
+(quadratic copying, unbounded growth). μ-law frames are decoded straight
+into the ring, and readers (VAD, transcription) get memoryview slices of
+it instead of copies.
+
+Positions are absolute sample indexes since the start of the call, so the
+VAD's frame numbers map directly onto the buffer.
+"""
+import threading
+import numpy as np
+
+from app.audio_codec import SAMPLE_RATE, ULAW_DECODE_TABLE
+
+# What to do when a write would overwrite pinned (still needed) audio
+OVERFLOW_DROP_OLDEST = 'drop_oldest'   # Overwrite anyway; the pinned region loses its head
+OVERFLOW_DROP_NEWEST = 'drop_newest'   # Discard the incoming samples instead
+OVERFLOW_RAISE = 'raise'               # Raise BufferOverflowError
+
+_OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST, OVERFLOW_RAISE)
+
+
+class BufferOverflowError(Exception):
+    pass
+
+
+# ---------- Process-wide memory accounting ----------
+
+_accounting_lock = threading.Lock()
+_allocated_bytes = 0
+_live_buffers = 0
+
+
+def memory_stats():
+    """Bytes currently held by all live ring buffers in this process"""
+    with _accounting_lock:
+        return {"buffers": _live_buffers, "bytes": _allocated_bytes}
+
+
+def _account(delta_bytes, delta_buffers):
+    global _allocated_bytes, _live_buffers
+    with _accounting_lock:
+        _allocated_bytes += delta_bytes
+        _live_buffers += delta_buffers
+
+
+class AudioRingBuffer:
+    """
+    Preallocated int16 ring buffer with absolute positions
+
+    write_ulaw()/write_pcm() append; view(start, end) returns one or two
+    memoryview segments covering [start, end) without copying. Audio that
+    has been overwritten is simply no longer available (view() clamps).
+    """
+
+    def __init__(self, seconds=32, sample_rate=SAMPLE_RATE, overflow=OVERFLOW_DROP_OLDEST):
+        if overflow not in _OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+
+        self.capacity = int(seconds * sample_rate)
+        self.overflow = overflow
+        self._samples = np.zeros(self.capacity, dtype=np.int16)
+        self._view = memoryview(self._samples)
+        self.write_pos = 0          # Absolute index of the next sample to write
+        self.pinned_from = None     # Absolute index that must not be overwritten
+        self.overflows = 0          # Writes that hit the pinned region
+        self.dropped_samples = 0
+        self._closed = False
+        _account(self._samples.nbytes, 1)
+
+    # ---------- Accounting ----------
+
+    @property
+    def nbytes(self):
+        return 0 if self._closed else self._samples.nbytes
+
+    def close(self):
+        """Release this buffer from the memory accounting (call on hang-up)"""
+        if not self._closed:
+            self._closed = True
+            _account(-self._samples.nbytes, -1)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    # ---------- Positions ----------
+
+    @property
+    def oldest_pos(self):
+        """Absolute index of the oldest sample still in the buffer"""
+        return max(0, self.write_pos - self.capacity)
+
+    def pin(self, position):
+        """Protect audio from `position` on (e.g. the current utterance)"""
+        self.pinned_from = max(position, self.oldest_pos)
+
+    def unpin(self):
+        self.pinned_from = None
+
+    # ---------- Writing ----------
+
+    def write_ulaw(self, payload):
+        """
+        Decode μ-law bytes directly into the ring (no intermediate array)
+
+        Returns a memoryview of the decoded samples (contiguous when the
+        write did not wrap, which is always true for 20ms frames and a
+        capacity that is a multiple of the frame size).
+        """
+        codes = np.frombuffer(payload, dtype=np.uint8)
+        return self._write(codes.size, lambda dst, lo, hi: np.take(ULAW_DECODE_TABLE, codes[lo:hi], out=dst))
+
+    def write_pcm(self, samples):
+        """Copy int16 PCM samples into the ring"""
+        src = np.frombuffer(samples, dtype=np.int16) if not isinstance(samples, np.ndarray) else samples
+        return self._write(src.size, lambda dst, lo, hi: np.copyto(dst, src[lo:hi]))
+
+    def _write(self, n, fill):
+        if n == 0:
+            return self._view[0:0]
+
+        if not self._make_room(n):
+            return self._view[0:0]
+
+        start = self.write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        fill(self._samples[start:start + first], 0, first)
+        if first < n:
+            fill(self._samples[0:n - first], first, n)
+
+        begin = self.write_pos
+        self.write_pos += n
+
+        segments = self.view(begin, self.write_pos)
+        return segments[0] if len(segments) == 1 else memoryview(np.concatenate(segments))
+
+    def _make_room(self, n):
+        """Apply the overflow policy; False means the write must be skipped"""
+        if n > self.capacity:
+            raise BufferOverflowError(f"Write of {n} samples exceeds capacity {self.capacity}")
+
+        if self.pinned_from is None:
+            return True
+
+        overwrite_until = self.write_pos + n - self.capacity
+        if overwrite_until <= self.pinned_from:
+            return True
+
+        self.overflows += 1
+        if self.overflow == OVERFLOW_DROP_NEWEST:
+            self.dropped_samples += n
+            return False
+        if self.overflow == OVERFLOW_RAISE:
+            raise BufferOverflowError(
+                f"Pinned audio from {self.pinned_from} would be overwritten (write_pos={self.write_pos})"
+            )
+
+        # drop_oldest: the pinned region loses its oldest samples
+        self.dropped_samples += overwrite_until - self.pinned_from
+        self.pinned_from = overwrite_until
+        return True
+
+    # ---------- Reading ----------
+
+    def view(self, start, end=None):
+        """
+        Zero-copy memoryview segments for absolute range [start, end)
+
+        Returns a list of 1 or 2 memoryviews (2 when the range wraps).
+        The range is clamped to what the buffer still holds.
+        """
+        end = self.write_pos if end is None else min(end, self.write_pos)
+        start = max(start, self.oldest_pos)
+        if end <= start:
+            return []
+
+        lo = start % self.capacity
+        hi = lo + (end - start)
+        if hi <= self.capacity:
+            return [self._view[lo:hi]]
+        return [self._view[lo:self.capacity], self._view[0:hi - self.capacity]]
+
+    def __len__(self):
+        return self.write_pos - self.oldest_pos
@@ -0,0 +1,91 @@
+"""
+Singleflight: collapse identical in-flight calls into one
+
+During a regional outage hundreds of conversations ask for the same
+region's network status at once; webhook retries look up the same phone
+twice. With a SingleFlight group, the first caller for a key runs the
+call, every caller arriving while it is in flight waits for that result,
+and the upstream sees one request.
+
+Only use it for idempotent reads: waiters share the leader's result (or
+its exception). Nothing is cached once the call returns.
+"""
+import copy
+import threading
+from collections import Counter
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Thread-based request coalescing
+
+    do(key, fn, *args) -> fn(*args), run at most once per key at a time.
+    The result is snapshotted (deep copy) before any follower is released
+    and each follower gets its own copy of the snapshot, so nobody can
+    mutate another caller's data - the leader included.
+    """
+
+    def __init__(self, name='singleflight'):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            self._stats['calls'] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._stats['shared'] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._stats['executions'] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        result = None
+        try:
+            result = fn(*args, **kwargs)
+            return result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+                waiters = call.waiters
+                if waiters:
+                    self._stats['collapsed_bursts'] += 1
+            try:
+                if waiters and call.error is None:
+                    # No new followers can join now; copy while the leader
+                    # has not yet seen (or mutated) the result
+                    call.result = copy.deepcopy(result)
+            finally:
+                call.done.set()
+
+    def stats(self):
+        """calls / executions is the collapse ratio (1.0 = nothing shared)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._calls)
+        executions = stats.get('executions', 0)
+        stats['collapse_ratio'] = round(stats.get('calls', 0) / executions, 3) if executions else 1.0
+        return stats
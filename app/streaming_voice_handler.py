@@ -292,26 +292,453 @@
 
 
 """
-Simple streaming voice handler with acknowledgment
-Uses standard Twilio without complex WebSocket streaming
+Streaming voice handler (Twilio Media Streams)
+
+Reads the caller's 20ms μ-law frames from the WebSocket and runs our own
+Voice Activity Detection on them, so we know when the caller starts and
+stops talking without waiting for <Gather speech_timeout='auto'>.
+
+Each finished utterance is transcribed and answered through the
+sentence-pipelined TTS (app/tts_pipeline.py): sentence N+1 is synthesized
+while sentence N is already playing to the caller.
 """
 import asyncio
+import base64
+import io
+import json
+import time
+import uuid
+import wave
+from datetime import datetime
+from openai import AsyncOpenAI
 from app.database import get_customer_by_phone, log_interaction
-from app.voice_handler import detect_language_from_speech, get_polly_voice
+from app.prefetch import get_snapshot
+from app.voice_handler import (
+    detect_language_from_speech,
+    resolve_language,
+    get_customer_info,
+    ACKNOWLEDGMENTS,
+    FALLBACK_GREETINGS,
+    NEW_CUSTOMER_GREETING,
+    NEW_CUSTOMER_GREETING_LANGUAGE,
+    fallback_greeting
+)
+from app.audio_codec import SAMPLE_RATE, FRAME_MS, FRAME_SAMPLES
+from app.ring_buffer import AudioRingBuffer, memory_stats
+from app.vad import VoiceActivityDetector, UTTERANCE_START, UTTERANCE_END
+from app.tts_pipeline import TTSPipeline, openai_tts_ulaw, OPENAI_TTS_VOICES
+from app.audio_cache import prompt_cache, cached_synthesizer
 from intelligence.intelligence_client import IntelligenceClient
+from intelligence.model_router import model_router, routing
 from app.config import Config
-import uuid
+from app.tracing import trace, span, observe
+from app.logger import get_logger
+
+log = get_logger(__name__)
+
+openai_client = AsyncOpenAI(api_key=Config.OPENAI_API_KEY)
+
+# TTS that serves pre-rendered prompts from the shared audio cache first
+synthesize = cached_synthesizer(
+    prompt_cache,
+    lambda sentence, lang: openai_tts_ulaw(openai_client, sentence, lang)
+)
+
+# Session storage (stream_sid -> StreamingSession)
+active_sessions = {}
+
+# Audio kept from before the VAD confirmed speech, so the first syllable isn't clipped
+PREROLL_MS = 300
+PREROLL_SAMPLES = SAMPLE_RATE * PREROLL_MS // 1000
+
+# Per-call audio ring: longest utterance the VAD allows (30s) plus pre-roll.
+# 32s of 16-bit 8kHz = 512KB per call, allocated once at stream start.
+RING_SECONDS = 32
+
+# Twilio plays whatever we queue; smaller messages make a barge-in "clear" more precise
+SEND_CHUNK_BYTES = SAMPLE_RATE // 2  # 0.5s of μ-law per media message
+
+
+class StreamingSession:
+    """Manages a streaming voice call session"""
+
+    def __init__(self, stream_sid, caller_number, call_sid=None):
+        self.stream_sid = stream_sid
+        self.caller_number = caller_number
+        self.call_sid = call_sid
+        self.customer = None
+        self.conversation_history = []
+        self.detected_language = None
+        self.session_id = str(uuid.uuid4())
+        self.vad = VoiceActivityDetector()
+        self.audio = AudioRingBuffer(seconds=RING_SECONDS)  # Decoded caller audio
+        self.is_speaking = False          # True while our TTS audio is playing
+        self.pending_marks = 0
+        self.response_task = None
+        self.send_lock = asyncio.Lock()
+        self.utterance_start_ms = None
+        self.utterance_start_sample = None
+        self.turn_metrics = []
+        self.vad_seconds = 0.0            # CPU spent in VAD, for the end-of-call summary
+        self.frames = 0
+
+    def set_language(self, language):
+        self.vad.set_language(language)
+
+    def add_message(self, role, content):
+        """Add message to conversation history"""
+        self.conversation_history.append({
+            "role": role,
+            "content": content,
+            "timestamp": datetime.now()
+        })
+
+        # Keep only last 10 messages
+        if len(self.conversation_history) > 10:
+            self.conversation_history = self.conversation_history[-10:]
+
+    async def send(self, ws, payload):
+        """Serialize writes: the TTS sender and barge-in both talk to the socket"""
+        async with self.send_lock:
+            await asyncio.to_thread(ws.send, json.dumps(payload))
+
 
 async def handle_media_stream(ws):
     """
-    Placeholder for media stream handling
-    
-    For now, this just logs that streaming was attempted.
-    Full implementation requires audio processing setup.
+    Handle Twilio Media Stream WebSocket connection
+
+    flask-sock gives us a blocking socket, so receives run in a worker
+    thread and the event loop stays free for the response pipeline.
     """
-    print("🎙️ Media stream handler called (not fully implemented yet)")
-    print("   For now, use /voice/incoming endpoint")
-    print("   Full streaming requires additional audio processing setup")
-    
-    # Close the WebSocket gracefully
-    await ws.close()
\ No newline at end of file
+    log.info("🎙️ Media stream connected")
+
+    session = None
+
+    try:
+        while True:
+            message = await asyncio.to_thread(ws.receive)
+
+            if message is None:
+                break
+
+            data = json.loads(message)
+            event = data.get('event')
+
+            # ===== STREAM START =====
+            if event == 'start':
+                start = data['start']
+                params = start.get('customParameters', {})
+                caller = params.get('phone', 'unknown')
+
+                session = StreamingSession(start['streamSid'], caller, params.get('call_sid'))
+                active_sessions[session.stream_sid] = session
+
+                log.info("📞 Stream started", stream_sid=session.stream_sid, caller=caller)
+
+                # Lookup is a blocking HTTP call - keep it off the event loop
+                session.customer = await asyncio.to_thread(get_customer_info, caller)
+                session.set_language(session.customer.get('language', 'EN'))
+                log.debug("   🎚️ VAD endpoint silence", silence_ms=session.vad.endpoint_silence_ms,
+                          language=session.vad.language)
+
+                # Greeting is a fixed prompt, normally straight from the audio cache
+                # (looked up in the language it was rendered in)
+                language = session.customer.get('language', 'EN')
+                if session.customer.get('is_new_customer'):
+                    greeting, language = NEW_CUSTOMER_GREETING, NEW_CUSTOMER_GREETING_LANGUAGE
+                else:
+                    language = language if language in FALLBACK_GREETINGS else 'EN'
+                    greeting = fallback_greeting(language)
+                log.verbose("💬 Greeting", text=greeting, language=language)
+                await send_ulaw(ws, session, await synthesize(greeting, language), 'greeting')
+
+            # ===== AUDIO FROM CALLER =====
+            elif event == 'media':
+                if not session:
+                    continue
+
+                # Base64 encoded 8kHz μ-law, one 20ms frame per message
+                audio_chunk = base64.b64decode(data['media']['payload'])
+
+                # Decoded straight into the ring; the VAD reads the same memory
+                frame = session.audio.write_ulaw(audio_chunk)
+
+                t0 = time.perf_counter()
+                vad_events = session.vad.process_pcm(frame)
+                session.vad_seconds += time.perf_counter() - t0
+                session.frames += 1
+
+                for vad_event in vad_events:
+                    if vad_event.kind == UTTERANCE_START:
+                        await on_utterance_start(ws, session, vad_event)
+                    elif vad_event.kind == UTTERANCE_END:
+                        await on_utterance_end(ws, session, vad_event)
+
+            # ===== MARK (Speech boundaries) =====
+            elif event == 'mark':
+                # Mark events help us know when TTS finished playing
+                mark_name = data.get('mark', {}).get('name')
+                log.debug("🔊 Mark received", mark=mark_name)
+                if session:
+                    session.pending_marks = max(0, session.pending_marks - 1)
+                    session.is_speaking = session.pending_marks > 0
+
+            # ===== STOP =====
+            elif event == 'stop':
+                log.info("📞 Stream ended", stream_sid=session.stream_sid if session else 'unknown')
+                break
+
+    except Exception as e:
+        log.exception("❌ Stream error", error=str(e))
+
+    finally:
+        if session:
+            if session.response_task and not session.response_task.done():
+                session.response_task.cancel()
+            active_sessions.pop(session.stream_sid, None)
+            if session.frames:
+                audio_seconds = session.frames * FRAME_MS / 1000
+                log.info("   🎚️ VAD cost", vad_ms=round(session.vad_seconds * 1000, 1),
+                         audio_s=round(audio_seconds, 1),
+                         cpu_pct=round(session.vad_seconds / audio_seconds * 100, 3))
+            session.audio.close()
+            stats = memory_stats()
+            log.info("   🧮 Audio buffers", kb=stats['bytes'] // 1024, live_calls=stats['buffers'],
+                     overflows=session.audio.overflows)
+            ttfa = [m['first_audio_ms'] for m in session.turn_metrics if m.get('first_audio_ms')]
+            if ttfa:
+                log.info("   ⏱️ Time-to-first-audio per turn", ttfa_ms=[round(t) for t in ttfa])
+        ws.close()
+
+
+async def on_utterance_start(ws, session, vad_event):
+    """Caller started talking - stop our own audio if it is playing (barge-in)"""
+    session.utterance_start_ms = vad_event.time_ms
+
+    # Keep the utterance (plus pre-roll) from being overwritten until we've used it
+    session.utterance_start_sample = max(0, vad_event.frame_index * FRAME_SAMPLES - PREROLL_SAMPLES)
+    session.audio.pin(session.utterance_start_sample)
+    log.debug("🗣️  Utterance start", at_ms=vad_event.time_ms)
+
+    if session.response_task and not session.response_task.done():
+        session.response_task.cancel()
+
+    if session.is_speaking:
+        log.debug("   ✋ Barge-in: clearing queued audio")
+        await session.send(ws, {
+            "event": "clear",
+            "streamSid": session.stream_sid
+        })
+        session.is_speaking = False
+        session.pending_marks = 0
+
+
+async def on_utterance_end(ws, session, vad_event):
+    """Caller finished their turn (endpoint silence elapsed) - answer it"""
+    start_ms = session.utterance_start_ms if session.utterance_start_ms is not None else vad_event.time_ms
+    log.debug("🤐 Utterance end", at_ms=vad_event.time_ms, spoke_s=round((vad_event.time_ms - start_ms) / 1000, 1))
+    session.utterance_start_ms = None
+
+    # Zero-copy slices of the ring go straight into the WAV container; build
+    # it now, before later frames can reuse that part of the ring
+    start_sample = session.utterance_start_sample or 0
+    end_sample = (vad_event.frame_index + 1) * FRAME_SAMPLES
+    audio = pcm_to_wav(session.audio.view(start_sample, end_sample))
+    session.audio.unpin()
+    session.utterance_start_sample = None
+
+    # Immediate acknowledgment while we transcribe and think - only if it is
+    # pre-rendered, synthesizing it live would arrive after the real answer
+    language = session.detected_language or session.vad.language
+    if language not in ACKNOWLEDGMENTS:
+        language = 'EN'
+    ack = ACKNOWLEDGMENTS[language]
+    ack_audio = prompt_cache.get(ack, OPENAI_TTS_VOICES.get(language, 'alloy'), language)
+    if ack_audio is not None:
+        await send_ulaw(ws, session, ack_audio, 'ack')
+
+    session.response_task = asyncio.create_task(
+        respond_to_utterance(ws, session, audio, time.perf_counter())
+    )
+
+
+async def send_ulaw(ws, session, ulaw, label):
+    """Queue μ-law audio (bytes or a cached memoryview) on the call, then a mark"""
+    for offset in range(0, len(ulaw), SEND_CHUNK_BYTES):
+        await session.send(ws, {
+            "event": "media",
+            "streamSid": session.stream_sid,
+            "media": {
+                "payload": base64.b64encode(ulaw[offset:offset + SEND_CHUNK_BYTES]).decode('utf-8')
+            }
+        })
+    # Mark to know when this audio finished playing
+    session.pending_marks += 1
+    session.is_speaking = True
+    await session.send(ws, {
+        "event": "mark",
+        "streamSid": session.stream_sid,
+        "mark": {
+            "name": f"{label}_{uuid.uuid4().hex[:8]}"
+        }
+    })
+
+
+def pcm_to_wav(segments):
+    """Wrap 8kHz 16-bit PCM segments (memoryviews from the ring) in a WAV file"""
+    wav_io = io.BytesIO()
+    with wave.open(wav_io, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        for segment in segments:
+            wav.writeframes(segment.cast('B'))
+    return wav_io.getvalue()
+
+
+async def transcribe_wav(wav_bytes, language=None):
+    """Transcribe a WAV utterance with Whisper"""
+    kwargs = {"language": language.lower()} if language else {}
+    result = await openai_client.audio.transcriptions.create(
+        model="whisper-1",
+        file=("utterance.wav", wav_bytes, "audio/wav"),
+        **kwargs
+    )
+    return result.text.strip()
+
+
+async def respond_to_utterance(ws, session, wav_bytes, turn_started):
+    """
+    One conversational turn: transcribe -> stream GPT -> pipelined TTS -> Twilio
+    """
+    try:
+        with trace('stream.turn', channel='voice_stream', trace_id=session.call_sid):
+            with span('stt'):
+                user_text = await transcribe_wav(wav_bytes)
+            log.verbose("📝 Transcript", text=user_text, stt_ms=round((time.perf_counter() - turn_started) * 1000))
+            if not user_text:
+                return
+
+            await stream_gpt_response(ws, session, user_text, turn_started)
+
+    except asyncio.CancelledError:
+        log.debug("   ✋ Response cancelled (caller barged in)")
+        raise
+    except Exception as e:
+        log.exception("❌ Turn error", error=str(e))
+
+
+async def stream_gpt_response(ws, session, user_text, turn_started=None):
+    """
+    Stream GPT response sentence by sentence through the TTS pipeline
+
+    Token generation never waits on audio: the pipeline's bounded queues
+    let the LLM, TTS workers and sender run concurrently.
+    """
+    log.verbose("🤖 Generating streaming response", text=user_text)
+
+    # Detect language from speech; only a confident detection switches the call
+    detected_lang, confidence = detect_language_from_speech(user_text)
+    if session.customer:
+        detected_lang = resolve_language(session.customer, detected_lang, confidence)
+        session.customer['language'] = detected_lang
+    session.detected_language = detected_lang
+    session.set_language(detected_lang)
+
+    # Build prompt
+    system_prompt = f"""You are a helpful Turkcell customer service AI.
+Customer: {session.customer.get('name', 'Customer')}
+Language: {detected_lang}
+
+Respond in {detected_lang}. Be concise. Max 3 sentences total."""
+
+    # Account data prefetched when the call arrived (only parts that are still fresh)
+    snapshot = get_snapshot(session.caller_number)
+    account = snapshot.as_context() if snapshot else {}
+    if account:
+        system_prompt += f"\nAccount data: {json.dumps(account, default=str)}"
+
+    messages = [{"role": "system", "content": system_prompt}]
+
+    # Add recent history
+    for msg in session.conversation_history[-4:]:
+        messages.append({
+            "role": msg["role"],
+            "content": msg["content"]
+        })
+
+    messages.append({"role": "user", "content": user_text})
+
+    # Model picked by intelligence/model_router.py; the latency it learns
+    # from here is time-to-first-token (the rest is paced by the TTS)
+    with routing(channel='voice'):
+        decision = model_router.choose('chat', messages)
+    log.debug("🧭 Model routed", route=decision.route, model=decision.model,
+              complexity=decision.complexity, reason=decision.reason)
+
+    async def tokens():
+        started = time.perf_counter()
+        recorded = False
+        try:
+            stream = await openai_client.chat.completions.create(
+                model=decision.model,
+                messages=messages,
+                stream=True,
+                temperature=0.7,
+                max_tokens=150
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if not recorded:
+                        model_router.record(decision, decision.model, time.perf_counter() - started, 'ok')
+                        recorded = True
+                    yield chunk.choices[0].delta.content
+        except Exception:
+            if not recorded:
+                model_router.record(decision, decision.model, time.perf_counter() - started, 'error')
+            raise
+        if not recorded:
+            model_router.record(decision, decision.model, time.perf_counter() - started, 'empty')
+
+    async def send_audio(ulaw, index, sentence):
+        log.verbose("📢 Sentence", index=index, text=sentence)
+        await send_ulaw(ws, session, ulaw, f"sentence_{index}")
+
+    pipeline = TTSPipeline(
+        synthesize=synthesize,
+        send_audio=send_audio,
+        language=detected_lang
+    )
+    try:
+        full_response = await pipeline.run(tokens(), started_at=turn_started)
+    finally:
+        session.turn_metrics.append(pipeline.metrics)
+
+    m = pipeline.metrics
+    for stage in ('first_token', 'first_audio'):
+        if m[f'{stage}_ms'] is not None:
+            observe(stage, m[f'{stage}_ms'] / 1000)
+    if m['first_audio_ms'] is not None:
+        log.info("⏱️ Time-to-first-audio", first_audio_ms=round(m['first_audio_ms']),
+                 first_token_ms=round(m['first_token_ms']), first_sentence_ms=round(m['first_sentence_ms']),
+                 sentences=m['sentences'])
+
+    log.verbose("✅ Complete response", text=full_response)
+
+    # Update conversation history
+    session.add_message("user", user_text)
+    session.add_message("assistant", full_response)
+
+    # Log to database
+    if session.customer.get('customer_id'):
+        try:
+            await asyncio.to_thread(
+                log_interaction,
+                session.customer['customer_id'],
+                'VOICE_STREAM',
+                user_text,
+                full_response,
+                session_id=session.session_id
+            )
+        except Exception:
+            pass
@@ -0,0 +1,292 @@
+"""
+Per-turn latency tracing
+
+One trace per turn (WhatsApp message, voice webhook, streaming utterance),
+with nested spans for every stage: customer lookup, intent router, MCP
+spawn, each LLM round, each tool call, every backend HTTP call, TTS.
+
+    with trace('voice.process', channel='voice', trace_id=call_sid):
+        with span('lookup'):
+            ...
+
+The current span lives in a contextvar, so it follows asyncio tasks and
+asyncio.run()/to_thread() without being passed around. Every finished span
+feeds a latency histogram labelled by stage and channel, rendered by
+render_prometheus() for /metrics. Turns slower than TRACE_SLOW_TURN_SECONDS
+print their span tree.
+
+With TRACING_ENABLED=false, span()/trace() return a shared no-op object:
+one boolean check, no allocation, no clock reads.
+"""
+import contextvars
+import functools
+import inspect
+import threading
+import time
+import uuid
+
+from app.config import Config
+
+_enabled = Config.TRACING_ENABLED
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+# Seconds; covers a 5ms cache hit up to a 30s cold backend
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+MAX_SPANS_PER_TRACE = 200
+MAX_SLOW_TREE_LINES = 40
+
+
+def set_enabled(enabled):
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def is_enabled():
+    return _enabled
+
+
+# ---------- Histograms ----------
+
+class Histogram:
+    """Prometheus-style cumulative histogram keyed by label tuples"""
+
+    def __init__(self, name, help_text, label_names, buckets=BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}   # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            base = ','.join(f'{k}="{_escape(v)}"' for k, v in zip(self.label_names, labels))
+            for bound, count in zip(self.buckets, values):
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {values[-1]}')
+            lines.append(f'{self.name}_sum{{{base}}} {values[-2]:.6f}')
+            lines.append(f'{self.name}_count{{{base}}} {values[-1]}')
+        return '\n'.join(lines)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+stage_seconds = Histogram(
+    'turkcell_stage_duration_seconds',
+    'Latency of each traced stage (lookup, LLM rounds, tools, backend HTTP, TTS)',
+    ('stage', 'channel'),
+)
+turn_seconds = Histogram(
+    'turkcell_turn_duration_seconds',
+    'End-to-end latency of a traced turn',
+    ('turn', 'channel'),
+)
+
+
+# ---------- Spans ----------
+
+class Span:
+    __slots__ = ('name', 'trace', 'parent', 'attrs', 'start', 'duration', 'error', '_token', 'depth')
+
+    def __init__(self, name, trace, parent, attrs):
+        self.name = name
+        self.trace = trace
+        self.parent = parent
+        self.attrs = attrs
+        self.depth = parent.depth + 1 if parent else 0
+        self.start = time.perf_counter()
+        self.duration = None
+        self.error = None
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and exc_type is not GeneratorExit:
+            self.error = exc_type.__name__
+        self.end()
+        if self._token is not None:
+            _current_span.reset(self._token)
+            self._token = None
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def end(self):
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self.start
+        trace = self.trace
+        if trace is not None:
+            trace.finish_span(self)
+        else:
+            # Warm-up pings, background pools: no turn to attribute it to
+            stage_seconds.observe((self.name, 'background'), self.duration)
+
+
+class _NoopSpan:
+    """Returned by span()/trace() when tracing is disabled"""
+
+    __slots__ = ()
+    name = None
+    trace_id = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+    def end(self):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace(Span):
+    """Root span of one turn; collects its finished child spans"""
+
+    __slots__ = ('trace_id', 'channel', 'spans')
+
+    def __init__(self, name, channel, trace_id, attrs):
+        self.trace_id = trace_id or uuid.uuid4().hex[:16]
+        self.channel = channel
+        self.spans = []
+        super().__init__(name, self, None, attrs)
+
+    def finish_span(self, span):
+        if span is self:
+            turn_seconds.observe((self.name, self.channel), self.duration)
+            stage_seconds.observe((self.name, self.channel), self.duration)
+            if self.duration >= Config.TRACE_SLOW_TURN_SECONDS:
+                # Imported here: app.logger reads the trace id from this module
+                from app.logger import get_logger
+                get_logger(__name__).warning(self.format())
+            return
+        stage_seconds.observe((span.name, self.channel), span.duration)
+        if len(self.spans) < MAX_SPANS_PER_TRACE:
+            self.spans.append(span)
+
+    def format(self):
+        """Span tree of a (slow) turn, in start order"""
+        lines = [f"🐢 Slow turn {self.name} [{self.channel}] {self.trace_id}: {self.duration * 1000:.0f}ms"]
+        spans = sorted(self.spans, key=lambda s: s.start)
+        for span in spans[:MAX_SLOW_TREE_LINES]:
+            offset = (span.start - self.start) * 1000
+            error = f" ❌ {span.error}" if span.error else ""
+            lines.append(f"   {'  ' * span.depth}├─ {span.name}: {span.duration * 1000:.0f}ms "
+                         f"(+{offset:.0f}ms){error}")
+        if len(spans) > MAX_SLOW_TREE_LINES:
+            lines.append(f"   ... {len(spans) - MAX_SLOW_TREE_LINES} more spans")
+        return '\n'.join(lines)
+
+
+def trace(name, channel='unknown', trace_id=None, **attrs):
+    """Root span for one turn (nested inside another trace it is just a span)"""
+    if not _enabled:
+        return NOOP_SPAN
+    parent = _current_span.get()
+    if parent is not None:
+        return Span(name, parent.trace, parent, attrs)
+    return Trace(name, channel, trace_id, attrs)
+
+
+def span(name, **attrs):
+    """Child span of whatever is current (a detached span if no trace is active)"""
+    if not _enabled:
+        return NOOP_SPAN
+    parent = _current_span.get()
+    return Span(name, parent.trace if parent else None, parent, attrs)
+
+
+def start_span(name, **attrs):
+    """Span that is timed but not made current; call .end() yourself"""
+    if not _enabled:
+        return NOOP_SPAN
+    parent = _current_span.get()
+    return Span(name, parent.trace if parent else None, parent, attrs)
+
+
+def current_trace_id():
+    current = _current_span.get()
+    return current.trace.trace_id if current is not None and current.trace is not None else None
+
+
+def current_channel():
+    current = _current_span.get()
+    return current.trace.channel if current is not None and current.trace is not None else None
+
+
+def traced(name, channel=None, trace_id_param=None):
+    """
+    Decorator: run the function inside span(name), or inside a new
+    trace(name, channel) when `channel` is given (request handlers).
+    Works for sync and async functions.
+    """
+    def decorate(fn):
+        def open_span():
+            if channel is None:
+                return span(name)
+            trace_id = None
+            if trace_id_param:
+                # Flask handlers: correlate with Twilio's CallSid / MessageSid
+                from flask import request, has_request_context
+                if has_request_context():
+                    trace_id = request.values.get(trace_id_param)
+            return trace(name, channel=channel, trace_id=trace_id)
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await fn(*args, **kwargs)
+                with open_span():
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with open_span():
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def observe(stage, seconds):
+    """Record a measured duration (e.g. time-to-first-audio) as a stage of the current turn"""
+    if not _enabled:
+        return
+    channel = current_channel() or 'background'
+    stage_seconds.observe((stage, channel), seconds)
+
+
+def render_prometheus():
+    """Text exposition format for /metrics"""
+    return '\n'.join([turn_seconds.render(), stage_seconds.render()]) + '\n'
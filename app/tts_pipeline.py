@@ -0,0 +1,282 @@
+"""
+Sentence-pipelined TTS for the streaming voice path
+
+    LLM tokens ──> SentenceSegmenter ──> TTS workers ──> ordered sender ──> Twilio
+              token queue          sentence queue      audio queue (in order)
+
+Every hop is a bounded asyncio.Queue, so sentence N+1 is being synthesized
+while sentence N plays, and a slow stage applies back-pressure upstream
+instead of buffering the whole answer.
+"""
+import asyncio
+import re
+import time
+import numpy as np
+from openai import AsyncOpenAI
+
+from app.audio_codec import downsample_pcm, pcm_to_ulaw
+from app.config import Config
+from app.tracing import span
+from app.logger import get_logger
+
+log = get_logger(__name__)
+
+# Sentence terminators: Latin, Arabic question mark/full stop, ellipsis
+TERMINATORS = '.!?…؟۔'
+CLOSERS = '"\'»)]”’'
+
+# Words that end in a dot without ending the sentence (lowercase, without the dot)
+ABBREVIATIONS = {
+    'EN': {'mr', 'mrs', 'ms', 'dr', 'prof', 'st', 'no', 'vs', 'etc', 'e.g', 'i.e', 'approx', 'min', 'max', 'tel'},
+    'TR': {'dr', 'prof', 'doç', 'sn', 'vb', 'vs', 'örn', 'bkz', 'tel', 'no', 'ltd', 'şti', 'a.ş', 'mah', 'cad', 'sok', 'yy', 'ör'},
+    'DE': {'z.b', 'bzw', 'usw', 'nr', 'ca', 'd.h', 'str', 'inkl', 'ggf', 'evtl', 'tel', 'dr', 'prof'},
+    'RU': {'т.е', 'т.д', 'т.п', 'т.к', 'г', 'гг', 'ул', 'руб', 'коп', 'др', 'стр', 'им', 'тел', 'мин', 'макс', 'см'},
+    'AR': set(),
+}
+
+# Only abbreviations before a number ("No. 5", "Nr. 12"); "The answer is no." ends a sentence
+NUMBER_ABBREVIATIONS = {'no', 'nr'}
+_LAST_WORD = re.compile(r'(\S+)$')
+
+# OpenAI TTS voices per language (same mapping the original streaming prototype used)
+OPENAI_TTS_VOICES = {
+    'EN': 'alloy',
+    'TR': 'onyx',
+    'AR': 'shimmer',
+    'DE': 'echo',
+    'RU': 'fable'
+}
+
+OPENAI_TTS_SAMPLE_RATE = 24000  # response_format="pcm" is 24kHz 16-bit mono
+
+
+class SentenceSegmenter:
+    """
+    Incrementally split a token stream into speakable sentences
+
+    Handles decimals ("5.2 GB"), ordinals ("1. gün"), abbreviations in
+    EN/TR/DE/RU, Arabic punctuation and newlines. A terminator is only
+    accepted once we have seen the character after it, so a boundary is
+    never guessed from half a token.
+    """
+
+    def __init__(self, language='EN', min_chars=8):
+        self.language = language
+        self.min_chars = min_chars
+        # The reply's own language only: Turkish "no." must not hold back an English split
+        self.abbreviations = ABBREVIATIONS.get(language, ABBREVIATIONS['EN'])
+        self._buffer = ''
+
+    def feed(self, text):
+        """Add a chunk of text, return any sentences that are now complete"""
+        self._buffer += text
+        sentences = []
+
+        while True:
+            cut = self._find_boundary()
+            if cut is None:
+                break
+            sentence = self._buffer[:cut].strip()
+            self._buffer = self._buffer[cut:]
+            if sentence:
+                sentences.append(sentence)
+
+        return sentences
+
+    def flush(self):
+        """End of stream: whatever is left is the last sentence"""
+        rest = self._buffer.strip()
+        self._buffer = ''
+        return [rest] if rest else []
+
+    def _find_boundary(self):
+        buf = self._buffer
+        start = 0
+        while True:
+            idx = self._next_terminator(buf, start)
+            if idx is None:
+                return None
+
+            if buf[idx] == '\n':
+                if len(buf[:idx].strip()) >= 1:
+                    return idx + 1
+                start = idx + 1
+                continue
+
+            # Swallow repeated terminators and closing quotes ("?!", "...", '."')
+            end = idx + 1
+            while end < len(buf) and (buf[end] in TERMINATORS or buf[end] in CLOSERS):
+                end += 1
+
+            if end >= len(buf):
+                return None  # Need the next character to decide
+
+            if self._is_boundary(buf, idx, end) and len(buf[:end].strip()) >= self.min_chars:
+                return end
+            start = end
+
+    @staticmethod
+    def _next_terminator(buf, start):
+        for i in range(start, len(buf)):
+            if buf[i] in TERMINATORS or buf[i] == '\n':
+                return i
+        return None
+
+    def _is_boundary(self, buf, idx, end):
+        following = buf[end]
+        if not following.isspace():
+            return False  # "5.2", "e.g.x", "turkcell.com.tr"
+
+        if buf[idx] != '.':
+            return True  # ! ? … ؟ are unambiguous
+
+        match = _LAST_WORD.search(buf[:idx])
+        word = match.group(1).lower() if match else ''
+        next_text = buf[end:].lstrip()
+        abbreviation = word.strip(CLOSERS + '(')
+        if abbreviation in self.abbreviations:
+            if abbreviation not in NUMBER_ABBREVIATIONS or next_text[:1].isdigit():
+                return False
+
+        # "1. gün", "3. Straße": a number then a lowercase word is an ordinal
+        if word.isdigit() and next_text and next_text[0].islower():
+            return False
+
+        # Single letters ("A. Yılmaz", "J. Smith") are initials
+        if len(word) == 1 and word.isalpha():
+            return False
+
+        return True
+
+
+async def openai_tts_ulaw(client, sentence, language='EN'):
+    """Synthesize one sentence with OpenAI TTS, return 8kHz μ-law bytes"""
+    response = await client.audio.speech.create(
+        model="tts-1",  # Fast model
+        voice=OPENAI_TTS_VOICES.get(language, 'alloy'),
+        input=sentence,
+        response_format="pcm"  # Raw 24kHz PCM, we transcode to Twilio's format
+    )
+    pcm = np.frombuffer(response.content, dtype='<i2')
+    return pcm_to_ulaw(downsample_pcm(pcm, OPENAI_TTS_SAMPLE_RATE))
+
+
+class TTSPipeline:
+    """
+    One assistant turn: tokens in, ordered μ-law audio out
+
+    synthesize(sentence, language) -> bytes   (async, μ-law 8kHz)
+    send_audio(ulaw_bytes, index, sentence)   (async, plays one sentence)
+    """
+
+    _DONE = object()
+
+    def __init__(self, synthesize=None, send_audio=None, language='EN', workers=2, queue_size=4):
+        self.language = language
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.send_audio = send_audio
+        if synthesize is None:
+            client = AsyncOpenAI(api_key=Config.OPENAI_API_KEY)
+            synthesize = lambda sentence, lang: openai_tts_ulaw(client, sentence, lang)
+        self.synthesize = synthesize
+
+        # Per-turn metrics (all times relative to run() start)
+        self.metrics = {}
+
+    async def run(self, tokens, started_at=None):
+        """
+        Drive the whole pipeline for one turn
+
+        tokens: async iterator of text deltas from the LLM
+        started_at: perf_counter() of when the caller stopped talking, so
+                    time-to-first-audio includes transcription and the LLM
+        Returns the full response text.
+        """
+        started_at = started_at or time.perf_counter()
+        self.metrics = {
+            'first_token_ms': None,
+            'first_sentence_ms': None,
+            'first_audio_ms': None,
+            'sentences': 0,
+            'synth_ms': [],
+        }
+
+        sentence_queue = asyncio.Queue(maxsize=self.queue_size)
+        audio_queue = asyncio.Queue(maxsize=self.queue_size)
+        full_text = []
+
+        def elapsed_ms():
+            return (time.perf_counter() - started_at) * 1000
+
+        async def segment():
+            segmenter = SentenceSegmenter(self.language)
+            index = 0
+            try:
+                async for delta in tokens:
+                    if not delta:
+                        continue
+                    if self.metrics['first_token_ms'] is None:
+                        self.metrics['first_token_ms'] = elapsed_ms()
+                    full_text.append(delta)
+                    for sentence in segmenter.feed(delta):
+                        index = await emit(sentence, index)
+                for sentence in segmenter.flush():
+                    index = await emit(sentence, index)
+            finally:
+                for _ in range(self.workers):
+                    await sentence_queue.put(self._DONE)
+                await audio_queue.put(self._DONE)
+
+        async def emit(sentence, index):
+            if self.metrics['first_sentence_ms'] is None:
+                self.metrics['first_sentence_ms'] = elapsed_ms()
+            # The future holds the slot in playback order; a worker fills it in
+            slot = asyncio.get_running_loop().create_future()
+            await audio_queue.put((index, sentence, slot))
+            await sentence_queue.put((sentence, slot))
+            return index + 1
+
+        async def tts_worker():
+            while True:
+                item = await sentence_queue.get()
+                if item is self._DONE:
+                    return
+                sentence, slot = item
+                t0 = time.perf_counter()
+                try:
+                    with span('tts'):
+                        audio = await self.synthesize(sentence, self.language)
+                    self.metrics['synth_ms'].append((time.perf_counter() - t0) * 1000)
+                    if not slot.done():
+                        slot.set_result(audio)
+                except Exception as e:
+                    if not slot.done():
+                        slot.set_exception(e)
+
+        async def sender():
+            while True:
+                item = await audio_queue.get()
+                if item is self._DONE:
+                    return
+                index, sentence, slot = item
+                try:
+                    audio = await slot
+                except Exception as e:
+                    log.error("❌ TTS error", sentence=index, error=str(e))
+                    continue
+                if self.metrics['first_audio_ms'] is None:
+                    self.metrics['first_audio_ms'] = elapsed_ms()
+                await self.send_audio(audio, index, sentence)
+                self.metrics['sentences'] += 1
+
+        tasks = [asyncio.create_task(segment()), asyncio.create_task(sender())]
+        tasks += [asyncio.create_task(tts_worker()) for _ in range(self.workers)]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # Barge-in cancels run(); make sure no stage keeps going
+            for task in tasks:
+                task.cancel()
+
+        return ''.join(full_text)
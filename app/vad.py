@@ -0,0 +1,228 @@
+"""
+Frame-level Voice Activity Detection for Twilio Media Streams
+
+Works on the 20ms 8kHz frames that arrive in handle_media_stream so we can
+endpoint the caller ourselves instead of waiting on <Gather speech_timeout>.
+
+Features (computed for a whole batch of frames at once with numpy):
+- Log energy in dB, compared against an adaptive noise floor
+- Zero-crossing rate, to reject hiss/clicks that are loud but not voiced
+
+A small state machine on top adds onset confirmation, hangover and a
+per-language endpoint silence before emitting utterance events.
+"""
+from collections import namedtuple
+import numpy as np
+
+from app.audio_codec import FRAME_MS, FRAME_SAMPLES, ulaw_to_pcm
+from app.config import Config
+
+UTTERANCE_START = 'utterance_start'
+UTTERANCE_END = 'utterance_end'
+
+# (kind, time_ms, frame_index) - time is measured from the start of the stream
+VadEvent = namedtuple('VadEvent', ['kind', 'time_ms', 'frame_index'])
+
+# How long the caller must stay silent before we treat the turn as finished.
+# Turkish/Arabic/Russian speakers pause longer mid-sentence than English ones.
+ENDPOINT_SILENCE_MS = {
+    'EN': 700,
+    'DE': 750,
+    'TR': 800,
+    'RU': 800,
+    'AR': 900
+}
+
+DEFAULT_ENDPOINT_SILENCE_MS = 800
+
+
+def parse_endpoint_overrides(spec):
+    """'TR=900,AR=1000' -> {'TR': 900, 'AR': 1000}; malformed entries are skipped"""
+    overrides = {}
+    for item in filter(None, (spec or '').split(',')):
+        language, _, ms = item.partition('=')
+        try:
+            overrides[language.strip().upper()] = int(ms)
+        except ValueError:
+            continue
+    return overrides
+
+
+class VoiceActivityDetector:
+    """
+    Streaming VAD for a single call
+
+    Feed it μ-law bytes (process_ulaw) or int16 PCM (process_pcm) in any
+    chunk size; partial frames are carried over to the next call.
+    Both return a (possibly empty) list of VadEvent.
+    """
+
+    def __init__(
+        self,
+        language='EN',
+        endpoint_silence_ms=None,
+        threshold_db=9.0,         # Speech must be this far above the noise floor
+        onset_ms=60,              # Consecutive speech needed to open an utterance
+        hangover_ms=100,          # Short dips that don't break an onset run
+        min_utterance_ms=200,     # Shorter bursts are discarded as clicks/coughs
+        max_utterance_ms=30000,   # Force an endpoint on endless speech/noise
+        initial_noise_db=30.0,
+        calibration_ms=200,       # Learn the line noise before making decisions
+        noise_adapt_rate=0.05,    # EMA rate while silent
+        noise_rise_rate=0.002,    # Very slow upward drift so the floor can't lock low
+        max_zcr=0.45,             # Above this the frame is hiss, not voice
+    ):
+        # endpoint_silence_ms: one value for every language, or per-language
+        # overrides of ENDPOINT_SILENCE_MS (default: VAD_ENDPOINT_SILENCE_MS)
+        if endpoint_silence_ms is None:
+            endpoint_silence_ms = parse_endpoint_overrides(Config.VAD_ENDPOINT_SILENCE_MS)
+        self._fixed_endpoint_ms = None
+        self._endpoint_overrides = {}
+        if isinstance(endpoint_silence_ms, dict):
+            self._endpoint_overrides = dict(endpoint_silence_ms)
+        else:
+            self._fixed_endpoint_ms = int(endpoint_silence_ms)
+        self.set_language(language)
+
+        self.threshold_db = threshold_db
+        self.onset_frames = max(1, onset_ms // FRAME_MS)
+        self.hangover_frames = max(0, hangover_ms // FRAME_MS)
+        self.min_utterance_frames = max(1, min_utterance_ms // FRAME_MS)
+        self.max_utterance_frames = max(1, max_utterance_ms // FRAME_MS)
+        self.noise_adapt_rate = noise_adapt_rate
+        self.noise_rise_rate = noise_rise_rate
+        self.max_zcr = max_zcr
+
+        self.noise_floor_db = initial_noise_db
+        self.calibration_frames = max(0, calibration_ms // FRAME_MS)
+        self._calibration = []
+        self.frame_index = 0
+        self.in_utterance = False
+        self.utterance_start_frame = None
+        self._speech_run = 0
+        self._silence_run = 0
+        self._hangover = 0
+        self._pending = np.empty(0, dtype=np.int16)
+
+    # ---------- Public API ----------
+
+    def process_ulaw(self, payload):
+        """Process raw μ-law bytes from a Twilio 'media' event"""
+        return self.process_pcm(ulaw_to_pcm(payload))
+
+    def process_pcm(self, samples):
+        """Process int16 PCM samples (numpy array, bytes or memoryview)"""
+        if not isinstance(samples, np.ndarray):
+            samples = np.frombuffer(samples, dtype=np.int16)
+
+        if self._pending.size:
+            samples = np.concatenate((self._pending, samples))
+
+        n_frames = samples.size // FRAME_SAMPLES
+        usable = n_frames * FRAME_SAMPLES
+        self._pending = samples[usable:].copy()
+
+        if n_frames == 0:
+            return []
+
+        frames = samples[:usable].reshape(n_frames, FRAME_SAMPLES)
+        energy_db, zcr = frame_features(frames)
+        return self._update(energy_db, zcr)
+
+    def set_language(self, language):
+        """Switch endpoint silence when the caller's language becomes known"""
+        self.language = language
+        if self._fixed_endpoint_ms is not None:
+            self.endpoint_silence_ms = self._fixed_endpoint_ms
+        else:
+            self.endpoint_silence_ms = self._endpoint_overrides.get(
+                language,
+                ENDPOINT_SILENCE_MS.get(language, DEFAULT_ENDPOINT_SILENCE_MS)
+            )
+        self.endpoint_frames = max(1, self.endpoint_silence_ms // FRAME_MS)
+
+    def reset(self):
+        """Forget the current utterance but keep the learned noise floor"""
+        self.in_utterance = False
+        self.utterance_start_frame = None
+        self._speech_run = 0
+        self._silence_run = 0
+        self._hangover = 0
+
+    # ---------- State machine ----------
+
+    def _update(self, energy_db, zcr):
+        events = []
+        voiced = zcr < self.max_zcr
+
+        for i in range(energy_db.size):
+            if self.frame_index < self.calibration_frames:
+                self._calibrate(energy_db[i])
+                self.frame_index += 1
+                continue
+
+            # The floor adapts frame by frame, so the energy test stays in the loop
+            speech = bool(voiced[i]) and energy_db[i] > self.noise_floor_db + self.threshold_db
+
+            # Always track the floor (slowly upward during speech) so a new
+            # stationary noise source eventually stops counting as speech
+            self._adapt_noise_floor(energy_db[i])
+
+            if speech:
+                self._speech_run += 1
+                self._silence_run = 0
+                self._hangover = self.hangover_frames
+            else:
+                self._silence_run += 1
+                # Hangover bridges short dips so an onset in progress isn't lost
+                if self._hangover > 0:
+                    self._hangover -= 1
+                else:
+                    self._speech_run = 0
+
+            if not self.in_utterance:
+                if self._speech_run >= self.onset_frames:
+                    self.in_utterance = True
+                    # Backdate to the first frame of the onset run
+                    self.utterance_start_frame = self.frame_index - self.onset_frames + 1
+                    events.append(VadEvent(
+                        UTTERANCE_START,
+                        self.utterance_start_frame * FRAME_MS,
+                        self.utterance_start_frame
+                    ))
+            elif (self._silence_run >= self.endpoint_frames
+                  or self.frame_index - self.utterance_start_frame >= self.max_utterance_frames):
+                length = self.frame_index - self.utterance_start_frame
+                if length - self._silence_run >= self.min_utterance_frames:
+                    events.append(VadEvent(UTTERANCE_END, (self.frame_index + 1) * FRAME_MS, self.frame_index))
+                self.reset()
+
+            self.frame_index += 1
+
+        return events
+
+    def _calibrate(self, frame_db):
+        # Median of the first frames: robust to the caller saying "hello" right away
+        self._calibration.append(float(frame_db))
+        self.noise_floor_db = float(np.median(self._calibration))
+
+    def _adapt_noise_floor(self, frame_db):
+        if frame_db < self.noise_floor_db:
+            self.noise_floor_db += self.noise_adapt_rate * (frame_db - self.noise_floor_db)
+        else:
+            self.noise_floor_db += self.noise_rise_rate * (frame_db - self.noise_floor_db)
+
+
+def frame_features(frames):
+    """
+    Vectorized per-frame features for an (n_frames, FRAME_SAMPLES) int16 array
+
+    Returns (energy_db, zero_crossing_rate), each of shape (n_frames,)
+    """
+    x = frames.astype(np.float32)
+    energy = np.einsum('ij,ij->i', x, x) / frames.shape[1]
+    energy_db = 10.0 * np.log10(energy + 1.0)
+
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frames.shape[1] - 1)
+    return energy_db, zcr
@@ -2,27 +2,66 @@ from flask import request, Response
 from twilio.twiml.voice_response import VoiceResponse, Gather
 import json
 from app.config import Config
+from app.language_id import identify_language
+from app.prefetch import lookup_customer, get_snapshot
+from app.logger import get_logger, set_correlation_id
+from app.tracing import traced, span
 from app.database import (
-    get_customer_by_phone,
     log_interaction
 )
 from datetime import datetime
+import os
 import uuid
 import asyncio
+import threading
 import time
-import traceback
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from intelligence.intelligence_client import IntelligenceClient
+from intelligence.intent_router import intent_router, GOODBYE
+from intelligence.model_router import routing
+
+log = get_logger(__name__)
 
 # Initialize Intelligence Client
 ai_client = IntelligenceClient(
     openai_api_key=Config.OPENAI_API_KEY,
     mcp_server_path=Config.MCP_SERVER_PATH,
+    mcp_server_url=Config.MCP_SERVER_URL,
+    mcp_pool_size=Config.MCP_POOL_SIZE,
     primary="openai", 
 )
 
 # In-memory session storage
 conversation_memory = {}
 
+# Fixed phrases we speak on every call. Kept at module level so the streaming
+# path can pre-render them once (see app/audio_cache.py) instead of per call.
+ACKNOWLEDGMENTS = {
+    'EN': "Let me help you with that.",
+    'TR': "Size yardımcı olayım.",
+    'AR': "دعني أساعدك.",
+    'DE': "Ich helfe Ihnen gerne.",
+    'RU': "Позвольте мне помочь."
+}
+
+NEW_CUSTOMER_GREETING = "Hello! Merhaba! I'm Turkcell's AI assistant. How can I help you?"
+NEW_CUSTOMER_GREETING_LANGUAGE = 'EN'     # spoken (and pre-rendered) in this voice
+
+# {name} is filled in for known customers; the name-free form is what we pre-render
+FALLBACK_GREETINGS = {
+    'TR': "Merhaba{name}! Size nasıl yardımcı olabilirim?",
+    'AR': "مرحبا{name}! كيف يمكنني مساعدتك؟",
+    'DE': "Hallo{name}! Wie kann ich Ihnen helfen?",
+    'RU': "Здравствуйте{name}! Чем могу помочь?",
+    'EN': "Hello{name}! How can I help you today?"
+}
+
+
+def fallback_greeting(language, name=None):
+    """Fixed greeting for when the AI greeting is unavailable (or too slow)"""
+    template = FALLBACK_GREETINGS.get(language, FALLBACK_GREETINGS['EN'])
+    return template.format(name=f" {name}" if name else "")
+
 
 def get_polly_voice(language, gender='female'):
     """Get the best Amazon Polly neural voice for the given language"""
@@ -38,44 +77,40 @@ def get_polly_voice(language, gender='female'):
 
 def detect_language_from_speech(text):
     """
-    Detect language from the actual speech content
-    Uses simple keyword detection + character analysis
+    Detect language from the actual speech content: (language, confidence 0-1)
+    Unicode script + character n-gram profiles (see app/language_id.py)
     """
-    text_lower = text.lower()
-    
-    # Quick language detection by common words
-    language_indicators = {
-        'EN': ['hello', 'hi', 'help', 'internet', 'data', 'package', 'problem', 'my', 'the', 'is', 'not', 'working'],
-        'TR': ['merhaba', 'yardım', 'paket', 'internet', 'benim', 'için', 'var', 'yok', 'nasıl', 'ne'],
-        'AR': ['مرحبا', 'مساعدة', 'الإنترنت', 'بيانات', 'باقة'],
-        'DE': ['hallo', 'hilfe', 'internet', 'daten', 'paket', 'mein', 'nicht'],
-        'RU': ['привет', 'помощь', 'интернет', 'пакет', 'мой']
-    }
-    
-    # Count matches for each language
-    scores = {}
-    for lang, indicators in language_indicators.items():
-        score = sum(1 for word in indicators if word in text_lower)
-        if score > 0:
-            scores[lang] = score
-    
-    # Return language with highest score
-    if scores:
-        detected = max(scores, key=scores.get)
-        print(f"   🌍 Language detected from speech: {detected} (confidence: {scores[detected]} words)")
-        return detected
-    
-    # Fallback: ASCII ratio detection
-    ascii_ratio = sum(1 for c in text if ord(c) < 128) / len(text) if text else 0
-    
-    if ascii_ratio > 0.9:
-        print(f"   🌍 Language detected: EN (ASCII ratio: {ascii_ratio:.2f})")
-        return 'EN'
-    
-    print(f"   🌍 Language detection uncertain, defaulting to EN")
-    return 'EN'
+    detected, confidence = identify_language(text)
+
+    if confidence == 0.0:
+        log.debug("   🌍 Language detection uncertain, using default", language=detected)
+    else:
+        log.debug("   🌍 Language detected from speech", language=detected, confidence=round(confidence, 2))
+    return detected, confidence
+
+
+def resolve_language(customer, detected, confidence):
+    """
+    Language to answer in: the customer's current one unless the detection
+    differs from it confidently enough (a higher bar for known customers,
+    whose preferred_language is on record)
+    """
+    current = customer.get('language', 'EN')
+    if detected == current:
+        return current
+
+    threshold = (Config.LANGUAGE_SWITCH_CONFIDENCE if customer.get('is_new_customer')
+                 else Config.LANGUAGE_SWITCH_CONFIDENCE_KNOWN)
+    if confidence < threshold:
+        log.debug("   🌍 Keeping customer language", language=current, detected=detected,
+                  confidence=round(confidence, 2), threshold=threshold)
+        return current
+
+    log.debug("   🔄 Overriding customer language", was=current, now=detected, confidence=round(confidence, 2))
+    return detected
 
 
+@traced('lookup')
 def get_customer_info(phone_number):
     """
     Lookup customer from Database (Optimized for Speed)
@@ -85,14 +120,15 @@ def get_customer_info(phone_number):
     # CRITICAL FIX: Clean the number before lookup
     clean_number = phone_number.replace('whatsapp:', '').strip()
     
-    print(f"🔍 Looking up customer: {clean_number}")
+    log.debug("🔍 Looking up customer", phone=clean_number)
     
-    # FAST PATH: Get essential customer data
-    customer = get_customer_by_phone(clean_number)
+    # FAST PATH: Get essential customer data (balance, subscriptions and
+    # device context are prefetched alongside it, see app/prefetch.py)
+    customer = lookup_customer(clean_number)
     
     if customer and customer.get('customer_id'):
         elapsed = time.time() - start_time
-        print(f"✅ Customer found in {elapsed:.2f}s: {customer.get('full_name', 'Unknown')}")
+        log.info("✅ Customer found", customer_id=customer['customer_id'], elapsed_ms=round(elapsed * 1000))
         
         return {
             "customer_id": str(customer['customer_id']),
@@ -104,7 +140,7 @@ def get_customer_info(phone_number):
         }
     else:
         # Unknown customer - detect language from country code
-        print(f"⚠️  Customer not found - using default context")
+        log.info("⚠️  Customer not found - using default context")
         
         language = 'EN'
         if clean_number.startswith('+90'):
@@ -116,7 +152,7 @@ def get_customer_info(phone_number):
         elif clean_number.startswith('+966') or clean_number.startswith('+971'):
             language = 'AR'
         
-        print(f"   Detected language from country code: {language}")
+        log.debug("   Detected language from country code", language=language)
         
         return {
             "customer_id": None,
@@ -137,11 +173,7 @@ def handle_incoming_call():
         caller = request.values.get('From', '')
         call_sid = request.values.get('CallSid', 'N/A')
         
-        print("="*60)
-        print(f"📞 INCOMING CALL START")
-        print(f"   From: {caller}")
-        print(f"   CallSid: {call_sid}")
-        print("="*60)
+        log.info("📞 INCOMING CALL START", phone=caller, call_sid=call_sid)
         
         # 1. Get customer info (Fast Lookup)
         customer = get_customer_info(caller)
@@ -160,7 +192,7 @@ def handle_incoming_call():
         }
 
         # 4. AI-GENERATED PERSONALIZED GREETING
-        print("🧠 Generating AI personalized greeting...")
+        log.debug("🧠 Generating AI personalized greeting...")
         
         # Tell the AI to greet the customer
         trigger_message = f"[SYSTEM: Call connected. Greet the customer. Their name is {customer['name']}. Speak in {detected_lang} language. Be brief and welcoming.]"
@@ -174,28 +206,21 @@ def handle_incoming_call():
                 ai_client.ask(initial_history, customer_context=customer),
                 timeout=3.0  # 3 second timeout for greeting
             )
-            greeting_text = asyncio.run(greeting_text)
+            with routing('greeting', channel='voice'):
+                greeting_text = asyncio.run(greeting_text)
         except asyncio.TimeoutError:
-            print("⚠️  AI greeting timeout - using fallback")
+            log.warning("⚠️  AI greeting timeout - using fallback")
             # Fallback greeting
             if customer.get('is_new_customer'):
-                greeting_text = "Hello! Merhaba! I'm Turkcell's AI assistant. How can I help you?"
+                greeting_text = NEW_CUSTOMER_GREETING
             else:
-                greetings = {
-                    'TR': f"Merhaba {customer['name']}! Size nasıl yardımcı olabilirim?",
-                    'AR': f"مرحبا {customer['name']}! كيف يمكنني مساعدتك؟",
-                    'DE': f"Hallo {customer['name']}! Wie kann ich Ihnen helfen?",
-                    'RU': f"Здравствуйте {customer['name']}! Чем могу помочь?",
-                    'EN': f"Hello {customer['name']}! How can I help you today?"
-                }
-                greeting_text = greetings.get(detected_lang, greetings['EN'])
+                greeting_text = fallback_greeting(detected_lang, customer['name'])
         except Exception as ai_e:
-            print(f"❌ AI Greeting Failed: {ai_e}")
+            log.error("❌ AI Greeting Failed", error=str(ai_e))
             # Fallback
             greeting_text = f"Welcome to Turkcell. How can I help you?"
 
-        print(f"💬 Greeting: {greeting_text}")
-        print(f"🎤 Using voice: {voice}")
+        log.verbose("💬 Greeting", text=greeting_text, voice=voice)
         
         # 5. Update Memory with greeting
         conversation_memory[caller]['messages'].append({
@@ -219,15 +244,11 @@ def handle_incoming_call():
         # Fallback if no speech detected
         response.say("I didn't hear anything. Please call again if you need help. Goodbye!", voice=voice)
         
-        print("✅ Greeting sent successfully")
+        log.debug("✅ Greeting sent successfully")
         return Response(str(response), mimetype='text/xml')
         
     except Exception as e:
-        print("="*60)
-        print(f"❌ ERROR IN handle_incoming_call:")
-        print(f"   {e}")
-        print("="*60)
-        traceback.print_exc()
+        log.exception("❌ ERROR IN handle_incoming_call", error=str(e))
         
         # Fallback response
         r = VoiceResponse()
@@ -249,15 +270,12 @@ def process_speech():
         caller = request.values.get('From', '')
         speech_result = request.values.get('SpeechResult', '')
         
-        print("="*60)
-        print(f"🎤 Caller: {caller}")
-        print(f"🗣️  Speech: '{speech_result}'")
-        print(f"📊 Confidence: {request.values.get('Confidence', 'N/A')}")
-        print("="*60)
+        log.info("🎤 Caller speech", phone=caller, confidence=request.values.get('Confidence', 'N/A'))
+        log.verbose("🗣️  Speech", text=speech_result)
         
         # Check for empty speech
         if not speech_result or speech_result.strip() == '':
-            print("⚠️  Empty speech result")
+            log.info("⚠️  Empty speech result")
             
             customer = get_customer_info(caller)
             voice = get_polly_voice(customer['language'], gender='female')
@@ -278,27 +296,22 @@ def process_speech():
         # Get customer info
         customer = get_customer_info(caller)
         
-        # CRITICAL: Detect language from actual speech, not just phone number
-        detected_language = detect_language_from_speech(speech_result)
+        # Continue in the language this call is already using
+        if caller in conversation_memory:
+            customer['language'] = conversation_memory[caller].get('detected_language') or customer['language']
         
-        # Override customer language with detected language if different
-        if detected_language != customer['language']:
-            print(f"   🔄 Overriding customer language {customer['language']} → {detected_language}")
-            customer['language'] = detected_language
+        # CRITICAL: Detect language from actual speech, not just phone number -
+        # but only switch on a confident detection ("OK", "evet" are ambiguous)
+        with span('language_id'):
+            detected_language, confidence = detect_language_from_speech(speech_result)
+        detected_language = resolve_language(customer, detected_language, confidence)
+        customer['language'] = detected_language
         
         voice = get_polly_voice(customer['language'], gender='female')
-        print(f"🎤 Using voice: {voice} for language: {customer['language']}")
+        log.debug("🎤 Using voice", voice=voice, language=customer['language'])
         
         # IMMEDIATE ACKNOWLEDGMENT (plays while AI thinks)
-        acknowledgments = {
-            'EN': "Let me help you with that.",
-            'TR': "Size yardımcı olayım.",
-            'AR': "دعني أساعدك.",
-            'DE': "Ich helfe Ihnen gerne.",
-            'RU': "Позвольте мне помочь."
-        }
-        
-        response.say(acknowledgments.get(customer['language'], acknowledgments['EN']), voice=voice)
+        response.say(ACKNOWLEDGMENTS.get(customer['language'], ACKNOWLEDGMENTS['EN']), voice=voice)
         
         # Get conversation history
         if caller not in conversation_memory:
@@ -317,38 +330,81 @@ def process_speech():
         messages = conversation_memory[caller]["messages"]
         messages.append({"role": "user", "content": speech_result})
         
-        # Generate AI response
-        ai_start = time.time()
-        print("🧠 Sending to Intelligence Layer...")
+        should_end = is_end_of_call(speech_result)
         
-        try:
-            # Pass last 6 messages for context efficiency
+        # DEFERRED MODE: answer now with the acknowledgment only, compute the
+        # AI reply in the background and let Twilio poll /voice/result for it
+        call_sid = request.values.get('CallSid', '')
+        if Config.VOICE_DEFERRED_TURNS and call_sid:
+            start_deferred_turn(call_sid, caller, speech_result, customer, messages[-6:], voice, should_end)
+            response.redirect('/voice/result', method='POST')
+            log.info("⏩ Deferred turn started", elapsed_ms=round((time.time() - start_time) * 1000))
+            return Response(str(response), mimetype='text/xml')
+        
+        ai_response = run_ai_turn(caller, speech_result, customer, messages[-6:], start_time)
+        append_answer(response, ai_response, voice, should_end)
+        
+        log.debug("✅ Response completed successfully")
+        return Response(str(response), mimetype='text/xml')
+        
+    except Exception as e:
+        log.exception("❌ CRITICAL ERROR IN process_speech", error=str(e))
+        
+        r = VoiceResponse()
+        r.say("We're sorry, an error occurred. Please try again.", voice='Polly.Joanna')
+        return Response(str(r), mimetype='text/xml')
+
+
+def is_end_of_call(speech_result):
+    """Did the caller say goodbye? ("Thanks, what's my balance?" is not a goodbye)"""
+    match = intent_router.classify(speech_result)
+    return match is not None and match.intent == GOODBYE
+
+
+# Own trace when it runs on the deferred pool, a child span when inline
+@traced('voice.ai_turn', channel='voice')
+def run_ai_turn(caller, speech_result, customer, recent_messages, start_time=None):
+    """
+    Generate the AI reply for one voice turn, then update memory and log it
+    """
+    start_time = start_time or time.time()
+    ai_start = time.time()
+    log.debug("🧠 Sending to Intelligence Layer...")
+    
+    # Fresh prefetched balance/subscriptions/device save the LLM a tool round
+    snapshot = get_snapshot(customer.get('phone'))
+    customer_context = {**customer, **snapshot.as_context()} if snapshot else customer
+    
+    try:
+        # Pass last 6 messages for context efficiency
+        with span('ai'), routing(channel='voice'):
             ai_response = asyncio.run(
                 ai_client.ask(
-                    messages[-6:],
-                    customer_context=customer
+                    recent_messages,
+                    customer_context=customer_context
                 )
             )
-        except Exception as ai_e:
-            print(f"❌ AI Error: {ai_e}")
-            traceback.print_exc()
-            ai_response = "I'm having trouble connecting to the network right now. Please try again in a moment."
+    except Exception as ai_e:
+        log.exception("❌ AI Error", error=str(ai_e))
+        ai_response = "I'm having trouble connecting to the network right now. Please try again in a moment."
 
-        ai_elapsed = time.time() - ai_start
-        total_elapsed = time.time() - start_time
-        print(f"🤖 AI Response ({ai_elapsed:.2f}s, total: {total_elapsed:.2f}s): {ai_response}")
-        
-        # Update Memory
-        conversation_memory[caller]['messages'].append({"role": "user", "content": speech_result})
-        conversation_memory[caller]['messages'].append({"role": "assistant", "content": ai_response})
-        
-        # Keep only last 20 messages to save memory
-        if len(conversation_memory[caller]['messages']) > 20:
-            conversation_memory[caller]['messages'] = conversation_memory[caller]['messages'][-20:]
-        
-        # Log to API (fire and forget - don't block)
-        if customer.get('customer_id'):
-            try:
+    ai_elapsed = time.time() - ai_start
+    total_elapsed = time.time() - start_time
+    log.info("🤖 AI Response", ai_ms=round(ai_elapsed * 1000), total_ms=round(total_elapsed * 1000))
+    log.verbose("🤖 AI Response text", text=ai_response)
+    
+    # Update Memory
+    conversation_memory[caller]['messages'].append({"role": "user", "content": speech_result})
+    conversation_memory[caller]['messages'].append({"role": "assistant", "content": ai_response})
+    
+    # Keep only last 20 messages to save memory
+    if len(conversation_memory[caller]['messages']) > 20:
+        conversation_memory[caller]['messages'] = conversation_memory[caller]['messages'][-20:]
+    
+    # Log to API (fire and forget - don't block)
+    if customer.get('customer_id'):
+        try:
+            with span('log_interaction'):
                 log_interaction(
                     customer['customer_id'],
                     'VOICE',
@@ -356,45 +412,154 @@ def process_speech():
                     ai_response,
                     session_id=conversation_memory[caller]['session_id']
                 )
-            except Exception as log_e:
-                print(f"⚠️  Log failed: {log_e}")
-        
-        # Check for end keywords
-        end_keywords = ['goodbye', 'bye', 'thank you', 'thanks', 'that\'s all', 
-                        'hoşçakal', 'teşekkürler', 'شكرا', 'وداعا', 'danke', 'спасибо']
-        
-        should_end = any(keyword in speech_result.lower() for keyword in end_keywords)
+        except Exception as log_e:
+            log.warning("⚠️  Log failed", error=str(log_e))
+    
+    return ai_response
+
+
+def append_answer(response, ai_response, voice, should_end):
+    """Speak the AI reply, then either hang up or listen for the next turn"""
+    if should_end:
+        response.say(ai_response, voice=voice)
+        response.say("Thank you for calling Turkcell. Goodbye!", voice=voice)
+        response.hangup()
+    else:
+        # Continue conversation
+        gather = Gather(
+            input='speech',
+            action='/voice/process',
+            language='auto',
+            speech_timeout='auto',
+            timeout=10
+        )
         
-        if should_end:
-            response.say(ai_response, voice=voice)
-            response.say("Thank you for calling Turkcell. Goodbye!", voice=voice)
-            response.hangup()
-        else:
-            # Continue conversation
-            gather = Gather(
-                input='speech',
-                action='/voice/process',
-                language='auto',
-                speech_timeout='auto',
-                timeout=10
-            )
-            
-            gather.say(ai_response, voice=voice)
-            response.append(gather)
-            
-            # Fallback if no response
-            response.say("I didn't hear your response. Goodbye!", voice=voice)
+        gather.say(ai_response, voice=voice)
+        response.append(gather)
         
-        print("✅ Response completed successfully")
+        # Fallback if no response
+        response.say("I didn't hear your response. Goodbye!", voice=voice)
+
+
+# ==========================================
+# ⏩ DEFERRED-ANSWER TURNS (redirect polling)
+# ==========================================
+# /voice/process returns the acknowledgment + <Redirect> immediately, so the
+# caller hears it right away and the webhook worker is released. The AI
+# answer is computed on a small thread pool keyed by CallSid and picked up
+# by /voice/result. State is per process, like conversation_memory: the
+# poll must reach the worker that took the turn, so run a single web worker
+# (add threads for concurrency) or route a CallSid to the same worker.
+
+deferred_executor = ThreadPoolExecutor(
+    max_workers=Config.DEFERRED_TURN_WORKERS,
+    thread_name_prefix='voice-turn'
+)
+deferred_turns = {}
+deferred_lock = threading.Lock()
+
+HOLD_PROMPTS = {
+    'EN': "One moment please.",
+    'TR': "Bir saniye lütfen.",
+    'AR': "لحظة من فضلك.",
+    'DE': "Einen Moment bitte.",
+    'RU': "Одну минуту, пожалуйста."
+}
+
+# Say the hold prompt on every Nth unanswered poll, stay silent otherwise
+HOLD_PROMPT_EVERY = 3
+# Give up on a turn (and drop it) after this long
+DEFERRED_TURN_MAX_SECONDS = 30
+
+
+def start_deferred_turn(call_sid, caller, speech_result, customer, recent_messages, voice, should_end):
+    """Kick off the AI turn in the background, keyed by CallSid"""
+    now = time.time()
+    def turn():
+        # Pool threads don't inherit the request's context: keep its log correlation
+        set_correlation_id(call_sid)
+        return run_ai_turn(caller, speech_result, customer, list(recent_messages), now)
+
+    future = deferred_executor.submit(turn)
+    
+    with deferred_lock:
+        # Drop turns from calls that hung up before collecting their answer
+        for sid in [s for s, t in deferred_turns.items() if now - t['started'] > DEFERRED_TURN_MAX_SECONDS * 2]:
+            deferred_turns.pop(sid, None)
+        
+        deferred_turns[call_sid] = {
+            'future': future,
+            'started': now,
+            'polls': 0,
+            'voice': voice,
+            'language': customer.get('language', 'EN'),
+            'should_end': should_end
+        }
+
+
+def fetch_deferred_answer():
+    """
+    Twilio polls here after a deferred /voice/process
+
+    Waits briefly (Config.DEFERRED_POLL_WAIT) so a ready answer is returned
+    without an extra round trip, otherwise plays a short hold prompt (or
+    nothing) and redirects back here.
+    """
+    response = VoiceResponse()
+    call_sid = request.values.get('CallSid', '')
+    
+    with deferred_lock:
+        turn = deferred_turns.get(call_sid)
+    
+    if not turn:
+        # Also what a poll routed to a different web worker sees
+        log.warning("⚠️  No deferred turn for this call", pid=os.getpid())
+        voice = get_polly_voice('EN', gender='female')
+        gather = Gather(
+            input='speech',
+            action='/voice/process',
+            language='auto',
+            speech_timeout='auto',
+            timeout=10
+        )
+        gather.say("Sorry, I lost track of that. Could you please repeat?", voice=voice)
+        response.append(gather)
         return Response(str(response), mimetype='text/xml')
-        
+    
+    future = turn['future']
+    waited = time.time() - turn['started']
+    
+    try:
+        ai_response = future.result(timeout=Config.DEFERRED_POLL_WAIT)
+    except FutureTimeoutError:
+        ai_response = None
     except Exception as e:
-        print("="*60)
-        print(f"❌ CRITICAL ERROR IN process_speech:")
-        print(f"   {e}")
-        print("="*60)
-        traceback.print_exc()
-        
-        r = VoiceResponse()
-        r.say("We're sorry, an error occurred. Please try again.", voice='Polly.Joanna')
-        return Response(str(r), mimetype='text/xml')
\ No newline at end of file
+        log.error("❌ Deferred turn failed", error=str(e))
+        ai_response = "I'm having trouble connecting to the network right now. Please try again in a moment."
+    
+    if ai_response is not None:
+        with deferred_lock:
+            deferred_turns.pop(call_sid, None)
+        log.info("✅ Deferred answer", waited_ms=round(waited * 1000), polls=turn['polls'])
+        append_answer(response, ai_response, turn['voice'], turn['should_end'])
+        return Response(str(response), mimetype='text/xml')
+    
+    if waited > DEFERRED_TURN_MAX_SECONDS:
+        with deferred_lock:
+            deferred_turns.pop(call_sid, None)
+        log.warning("⏳ Deferred turn gave up", waited_s=round(waited))
+        append_answer(
+            response,
+            "I'm sorry, this is taking longer than expected. Please try asking again.",
+            turn['voice'],
+            False
+        )
+        return Response(str(response), mimetype='text/xml')
+    
+    with deferred_lock:
+        turn['polls'] += 1
+        polls = turn['polls']
+    if polls % HOLD_PROMPT_EVERY == 0:
+        response.say(HOLD_PROMPTS.get(turn['language'], HOLD_PROMPTS['EN']), voice=turn['voice'])
+    response.redirect('/voice/result', method='POST')
+    return Response(str(response), mimetype='text/xml')
@@ -0,0 +1,216 @@
+"""
+Backend warm-keeping scheduler (runs inside the web process)
+
+The Render-hosted backend goes to sleep when idle and the first request
+after that takes many seconds, which used to land on a real caller (and
+time out). keep_alive.py woke it by hand; this does it continuously:
+
+- A daemon thread pings cheap endpoints of each dependency.
+- No pings while real traffic is keeping the backend warm (the latency
+  tracker in app/latency.py records every real request).
+- A ping much slower than the dependency's warm baseline is a cold start:
+  the dependency is marked cold and the interval shrinks; a run of warm
+  pings stretches it back out.
+- warmup_status() (in /health) reports warm / cold per dependency.
+"""
+import threading
+import time
+
+import requests
+
+from app.config import Config
+from app.database import API_BASE_URL, API_KEY
+from app.latency import backend_latency
+from app.logger import get_logger
+
+log = get_logger(__name__)
+
+WARM = 'warm'
+COLD = 'cold'
+UNKNOWN = 'unknown'
+
+# A cold backend can take ~30s to boot; pings must outlast that
+PING_TIMEOUT = 30
+
+
+class WarmTarget:
+    """One dependency to keep warm: a cheap GET and its latency baseline"""
+
+    def __init__(self, name, url, headers=None):
+        self.name = name
+        self.url = url
+        self.headers = headers or {}
+        self.state = UNKNOWN
+        self.baseline = None        # EWMA of warm ping latency (seconds)
+        self.last_latency = None
+        self.last_ping = None
+        self.pings = 0
+        self.failures = 0
+        self.cold_spikes = 0
+
+    def ping(self):
+        """Issue the warm-up request; returns latency in seconds (None on failure)"""
+        started = time.perf_counter()
+        try:
+            response = requests.get(self.url, headers=self.headers, timeout=PING_TIMEOUT)
+            latency = time.perf_counter() - started
+            ok = response.status_code < 500
+        except requests.exceptions.RequestException:
+            latency, ok = None, False
+
+        self.pings += 1
+        self.last_ping = time.time()
+        self.last_latency = latency
+        if not ok:
+            self.failures += 1
+            self.state = COLD
+            return None
+
+        self._classify(latency)
+        return latency
+
+    def _classify(self, latency):
+        cold_limit = Config.WARMUP_COLD_SECONDS
+        if self.baseline is not None:
+            cold_limit = max(cold_limit, self.baseline * Config.WARMUP_COLD_FACTOR)
+
+        if latency > cold_limit:
+            # Cold-start spike: don't let it pollute the warm baseline
+            self.cold_spikes += 1
+            self.state = COLD
+            return
+
+        self.state = WARM
+        self.baseline = latency if self.baseline is None else 0.8 * self.baseline + 0.2 * latency
+
+    def status(self):
+        return {
+            'state': self.state,
+            'last_ping_ms': None if self.last_latency is None else round(self.last_latency * 1000),
+            'baseline_ms': None if self.baseline is None else round(self.baseline * 1000),
+            'last_ping_age_s': None if self.last_ping is None else round(time.time() - self.last_ping),
+            'pings': self.pings,
+            'failures': self.failures,
+            'cold_spikes': self.cold_spikes,
+        }
+
+
+def default_targets():
+    """Backend health + a real (cheap) API read that touches the database, plus OpenAI"""
+    headers = {'X-API-Key': API_KEY} if API_KEY else {}
+    targets = [
+        WarmTarget('backend', f"{API_BASE_URL}/health", headers),
+        WarmTarget('backend_db', f"{API_BASE_URL}/api/v1/troubleshooting/network-status", headers),
+    ]
+    if Config.OPENAI_API_KEY:
+        targets.append(WarmTarget('openai', 'https://api.openai.com/v1/models',
+                                  {'Authorization': f"Bearer {Config.OPENAI_API_KEY}"}))
+    return targets
+
+
+class WarmupScheduler:
+    """
+    Adaptive keep-warm loop
+
+    interval starts at WARMUP_INTERVAL, halves (down to WARMUP_MIN_INTERVAL)
+    after a cold spike and grows 1.5x (up to WARMUP_MAX_INTERVAL) after
+    three warm rounds in a row.
+    """
+
+    def __init__(self, targets=None, tracker=backend_latency):
+        self.targets = targets if targets is not None else default_targets()
+        self.tracker = tracker
+        self.interval = Config.WARMUP_INTERVAL
+        self.rounds = 0
+        self.skipped_for_traffic = 0
+        self._warm_streak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        self._thread = threading.Thread(target=self._run, name='backend-warmup', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        # Warm everything at boot so the first caller doesn't pay for it
+        self.run_once(force=True)
+        while not self._stop.wait(self._next_wait()):
+            self.run_once()
+
+    def _next_wait(self):
+        """Sleep until `interval` after the later of our last ping or the last real request"""
+        last = max(filter(None, [self.tracker.last_activity] + [t.last_ping for t in self.targets]), default=0)
+        return max(1.0, last + self.interval - time.time())
+
+    def _recent_traffic(self):
+        last = self.tracker.last_activity
+        return last is not None and time.time() - last < self.interval
+
+    def run_once(self, force=False):
+        """One warm-up round (skipped for the backend while real traffic keeps it warm)"""
+        cold = False
+        for target in self.targets:
+            if not force and target.name.startswith('backend') and self._recent_traffic():
+                self.skipped_for_traffic += 1
+                continue
+
+            was = target.state
+            latency = target.ping()
+            if target.state == COLD:
+                cold = True
+                shown = f"{latency:.2f}s" if latency is not None else "failed"
+                log.warning("🥶 Warm-up: target is cold", target=target.name, latency=shown,
+                            baseline_ms=round((target.baseline or 0) * 1000))
+            elif was != WARM:
+                log.info("🔥 Warm-up: target warm", target=target.name, latency_ms=round(latency * 1000))
+
+        self.rounds += 1
+        self._adapt(cold)
+
+    def _adapt(self, cold):
+        if cold:
+            self._warm_streak = 0
+            self.interval = max(Config.WARMUP_MIN_INTERVAL, self.interval / 2)
+        else:
+            self._warm_streak += 1
+            if self._warm_streak >= 3:
+                self._warm_streak = 0
+                self.interval = min(Config.WARMUP_MAX_INTERVAL, self.interval * 1.5)
+
+    def status(self):
+        states = [t.state for t in self.targets]
+        overall = COLD if COLD in states else WARM if states and all(s == WARM for s in states) else UNKNOWN
+        last = self.tracker.last_activity
+        return {
+            'state': overall,
+            'interval_s': round(self.interval),
+            'rounds': self.rounds,
+            'skipped_for_traffic': self.skipped_for_traffic,
+            'last_real_request_age_s': None if last is None else round(time.time() - last),
+            'targets': {t.name: t.status() for t in self.targets},
+        }
+
+
+warmup_scheduler = None
+
+
+def start_warmup_scheduler():
+    """Start the per-process scheduler (idempotent)"""
+    global warmup_scheduler
+    if warmup_scheduler is None:
+        warmup_scheduler = WarmupScheduler()
+        log.info("🔥 Backend warm-up scheduler started", interval_s=round(warmup_scheduler.interval))
+    warmup_scheduler.start()
+    return warmup_scheduler
+
+
+def warmup_status():
+    if warmup_scheduler is None:
+        return {'state': UNKNOWN, 'enabled': False}
+    return warmup_scheduler.status()
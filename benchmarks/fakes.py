@@ -0,0 +1,448 @@
+"""
+Local stand-ins for the services the agent depends on
+
+- make_turkcell_app(): the Turkcell REST API, every endpoint used by
+  app/database.py and mcpsc/main.py, over a deterministic synthetic
+  customer base (phones +90555000NNNN).
+- make_openai_app(): an OpenAI-compatible /v1/chat/completions that
+  returns scripted tool calls when the request offers tools (keyword
+  match on the last user message) and a canned reply otherwise; supports
+  stream=True (text and tool-call deltas). Plus /v1/models for the warm-up pinger.
+- LatencyModel: per-request latency distribution, e.g. "fixed:50",
+  "uniform:20,120", "normal:300,80", "lognormal:700,0.4" (median ms, sigma).
+- FakeServer: serves a WSGI app on a local port from a daemon thread.
+
+Used by benchmarks/load_test.py; can also be started on its own:
+    python -m benchmarks.fakes --api-port 8001 --openai-port 8002
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+
+from flask import Flask, Response, jsonify, request
+from werkzeug.serving import make_server
+
+
+# ---------- Latency ----------
+
+class LatencyModel:
+    """Samples a delay (seconds) from a named distribution given in milliseconds"""
+
+    def __init__(self, kind='fixed', params=(0,), seed=None):
+        self.kind = kind
+        self.params = tuple(float(p) for p in params)
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec, seed=None):
+        kind, _, args = (spec or 'fixed:0').partition(':')
+        params = [p for p in args.split(',') if p] or ['0']
+        if kind not in ('fixed', 'uniform', 'normal', 'lognormal'):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+        return cls(kind, params, seed)
+
+    def sample(self):
+        p = self.params
+        with self._lock:
+            if self.kind == 'uniform':
+                ms = self.rng.uniform(p[0], p[1])
+            elif self.kind == 'normal':
+                ms = self.rng.gauss(p[0], p[1])
+            elif self.kind == 'lognormal':
+                ms = p[0] * math.exp(self.rng.gauss(0, p[1] if len(p) > 1 else 0.5))
+            else:
+                ms = p[0]
+        return max(0.0, ms) / 1000
+
+    def sleep(self):
+        delay = self.sample()
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    def __str__(self):
+        return f"{self.kind}:{','.join(f'{p:g}' for p in self.params)}"
+
+
+# ---------- Synthetic Turkcell data ----------
+
+LANGUAGES = ['EN', 'TR', 'DE', 'AR', 'RU']
+REGIONS = ['Istanbul', 'Ankara', 'Izmir', 'Antalya', 'Bodrum']
+
+
+def fake_phone(i):
+    return f"+90555{i:07d}"
+
+
+def _uuid(*parts):
+    return str(uuid.UUID(hashlib.md5('/'.join(map(str, parts)).encode()).hexdigest()))
+
+
+def _customer_index(phone):
+    digits = (phone or '').replace('whatsapp:', '').strip()
+    if digits.startswith('90555'):      # /balances/phone/{msisdn} drops the '+'
+        digits = '+' + digits
+    if not digits.startswith('+90555'):
+        return None
+    try:
+        return int(digits[6:])
+    except ValueError:
+        return None
+
+
+def _customer(i):
+    return {
+        'customer_id': _uuid('customer', i),
+        'full_name': f"Test Customer {i}",
+        'preferred_language': LANGUAGES[i % len(LANGUAGES)],
+        'whatsapp_number': fake_phone(i),
+        'nationality': 'DE',
+        'customer_type': 'TOURIST',
+        'package_name': 'Tourist Welcome 50GB',
+        'balance_try': 250.0,
+    }
+
+
+def _subscription(i):
+    return {
+        'subscription_id': _uuid('subscription', i),
+        'customer_id': _uuid('customer', i),
+        'package_id': 'TOURIST_WELCOME_50GB',
+        'msisdn': fake_phone(i),
+        'status': 'ACTIVE',
+    }
+
+
+def _balance(i):
+    return {
+        'balance_id': _uuid('balance', i),
+        'subscription_id': _uuid('subscription', i),
+        'data_remaining_mb': 51200 - (i * 37) % 40000,
+        'voice_remaining_min': 1000 - i % 500,
+        'sms_remaining': 100 - i % 80,
+    }
+
+
+PACKAGES = [
+    {'package_id': 'TOURIST_WELCOME_50GB', 'package_name': 'Tourist Welcome 50GB', 'price_try': 599,
+     'data_mb': 51200, 'voice_minutes': 1000, 'sms_count': 100, 'validity_days': 28, 'package_type': 'TOURIST'},
+    {'package_id': 'TOURIST_20GB', 'package_name': 'Tourist 20GB', 'price_try': 399,
+     'data_mb': 20480, 'voice_minutes': 200, 'sms_count': 50, 'validity_days': 14, 'package_type': 'TOURIST'},
+    {'package_id': 'PREPAID_10GB', 'package_name': 'Prepaid 10GB', 'price_try': 249,
+     'data_mb': 10240, 'voice_minutes': 500, 'sms_count': 250, 'validity_days': 30, 'package_type': 'PREPAID'},
+]
+
+
+def make_turkcell_app(latency=None, customers=10000):
+    """Fake Turkcell REST API; app.config['STATS'] counts requests per route"""
+    app = Flask('fake_turkcell_api')
+    latency = latency or LatencyModel()
+    stats = app.config['STATS'] = Counter()
+
+    def known(i):
+        return i is not None and 0 <= i < customers
+
+    @app.before_request
+    def delay():
+        stats[request.url_rule.rule if request.url_rule else request.path] += 1
+        if request.path != '/health':
+            latency.sleep()
+
+    @app.route('/health')
+    def health():
+        return jsonify({'status': 'healthy'})
+
+    @app.route('/api/v1/customers/lookup')
+    def customer_lookup():
+        i = _customer_index(request.args.get('phone'))
+        if not known(i):
+            return jsonify({'detail': 'Customer not found'}), 404
+        return jsonify(_customer(i))
+
+    @app.route('/api/v1/customers', methods=['POST'])
+    def customer_create():
+        return jsonify({**(request.get_json(silent=True) or {}), 'customer_id': str(uuid.uuid4())}), 201
+
+    @app.route('/api/v1/customers/<customer_id>', methods=['GET', 'PATCH', 'DELETE'])
+    def customer(customer_id):
+        if request.method == 'DELETE':
+            return jsonify({'deleted': True})
+        return jsonify({**_customer(0), 'customer_id': customer_id, **(request.get_json(silent=True) or {})})
+
+    @app.route('/api/v1/customers/<customer_id>/subscriptions')
+    def customer_subscriptions(customer_id):
+        subscription = {**_subscription(0), 'customer_id': customer_id,
+                        'subscription_id': _uuid('subscription', customer_id)}
+        return jsonify({'success': True, 'subscriptions': [subscription]})
+
+    @app.route('/api/v1/packages')
+    def packages():
+        return jsonify(PACKAGES)
+
+    @app.route('/api/v1/packages/type/<package_type>')
+    def packages_by_type(package_type):
+        return jsonify([p for p in PACKAGES if p['package_type'] == package_type.upper()])
+
+    @app.route('/api/v1/packages/search/recommend')
+    def packages_recommend():
+        budget = float(request.args.get('budget_try') or 10 ** 9)
+        matches = [p for p in PACKAGES if p['price_try'] <= budget] or PACKAGES[-1:]
+        return jsonify({'recommendations': matches, 'reason': 'Best data per lira within budget'})
+
+    @app.route('/api/v1/packages/compare/packages')
+    def packages_compare():
+        return jsonify({'packages': PACKAGES[:2]})
+
+    @app.route('/api/v1/packages/<package_id>')
+    def package(package_id):
+        match = next((p for p in PACKAGES if p['package_id'] == package_id), None)
+        return (jsonify(match), 200) if match else (jsonify({'detail': 'Not found'}), 404)
+
+    @app.route('/api/v1/balances/phone/<path:phone>')
+    def balance_by_phone(phone):
+        i = _customer_index(phone)
+        if not known(i):
+            return jsonify({'detail': 'Not found'}), 404
+        return jsonify({'data': _balance(i)})
+
+    @app.route('/api/v1/balances/subscription/<subscription_id>')
+    def balance_by_subscription(subscription_id):
+        return jsonify({**_balance(0), 'subscription_id': subscription_id})
+
+    @app.route('/api/v1/balances/subscription/<subscription_id>/usage-history')
+    def usage_history(subscription_id):
+        return jsonify({'subscription_id': subscription_id, 'usage': [
+            {'date': f"2024-06-{d:02d}", 'data_mb': 800 + d * 13, 'voice_min': d % 30} for d in range(1, 8)
+        ]})
+
+    @app.route('/api/v1/balances/<balance_id>', methods=['PATCH'])
+    def balance_update(balance_id):
+        return jsonify({'balance_id': balance_id, **(request.get_json(silent=True) or {})})
+
+    @app.route('/api/v1/balances/<balance_id>/recharge', methods=['POST'])
+    def balance_recharge(balance_id):
+        return jsonify({'balance_id': balance_id, 'recharged': True})
+
+    @app.route('/api/v1/balances/<balance_id>/summary')
+    def balance_summary(balance_id):
+        return jsonify({'balance_id': balance_id, 'data_remaining': 38.4, 'unit': 'GB',
+                        'voice_remaining_min': 855, 'sms_remaining': 77})
+
+    @app.route('/api/v1/troubleshooting/device/<subscription_id>', methods=['GET', 'POST'])
+    def device(subscription_id):
+        return jsonify({'subscription_id': subscription_id, 'device_model': 'OnePlus 11', 'os_type': 'ANDROID',
+                        'roaming_enabled': True, 'data_enabled': True, 'airplane_mode': False,
+                        'signal_strength_dbm': -68})
+
+    @app.route('/api/v1/troubleshooting/network-status')
+    def network_status():
+        return jsonify([{'region': 'Bodrum', 'status': 'DEGRADED', 'issue': '4G congestion'}])
+
+    @app.route('/api/v1/troubleshooting/network-status/region/<region>')
+    def network_status_region(region):
+        degraded = region.title() == 'Bodrum'
+        return jsonify({'region': region, 'status': 'DEGRADED' if degraded else 'OPERATIONAL'})
+
+    @app.route('/api/v1/troubleshooting/knowledge-base/search', methods=['POST'])
+    def knowledge_base():
+        query = request.args.get('query') or (request.get_json(silent=True) or {}).get('query', '')
+        return jsonify({'results': [
+            {'title': 'APN settings for tourists', 'content': 'Set APN to "internet" and enable data roaming.',
+             'category': 'CONNECTIVITY', 'query': query},
+        ]})
+
+    @app.route('/api/v1/troubleshooting/diagnose/<subscription_id>')
+    def diagnose(subscription_id):
+        return jsonify({'success': True, 'subscription_id': subscription_id,
+                        'network_status': 'OPERATIONAL', 'device_status': 'OK',
+                        'recommended_solutions': ['Restart the device', 'Enable data roaming']})
+
+    @app.route('/api/v1/troubleshooting/stores/nearby')
+    def stores():
+        return jsonify([{'name': 'Turkcell Taksim', 'distance_km': 0.8}])
+
+    @app.route('/api/v1/interactions', methods=['POST'])
+    def interactions():
+        return jsonify({'interaction_id': str(uuid.uuid4())}), 201
+
+    @app.route('/api/v1/support-tickets', methods=['POST'])
+    def support_tickets():
+        return jsonify({'data': {'ticket_id': str(uuid.uuid4())}}), 201
+
+    return app
+
+
+# ---------- Fake OpenAI ----------
+
+# keyword -> (tool name, argument builder(user_text, context phone))
+TOOL_SCRIPT = [
+    (('balance', 'bakiye', 'remaining', 'kalan', 'guthaben'),
+     'lookup_customer', lambda text, phone: {'phone': phone or fake_phone(1)}),
+    (('outage', 'network', 'signal', 'şebeke', 'netz'),
+     'get_network_status_per_region', lambda text, phone: {'region': 'Bodrum'}),
+    (('package', 'plan', 'paket', 'tarif', 'recommend'),
+     'recommend_package', lambda text, phone: {'budget_try': 500, 'duration_days': 14}),
+    (('internet', 'slow', 'not working', 'çalışmıyor'),
+     'get_customer_snapshot', lambda text, phone: {'phone': phone or fake_phone(1)}),
+    (('internet', 'apn', 'slow', 'not working', 'çalışmıyor'),
+     'search_knowledge_base', lambda text, phone: {'query': text[:80]}),
+]
+
+CANNED_REPLY = ("Thanks for contacting Turkcell. Your Tourist Welcome package is active "
+                "and everything looks fine on our side. Is there anything else I can help with?")
+
+
+def _tokens(text):
+    return max(1, int(len((text or '').split()) * 1.3))
+
+
+def _context_phone(messages):
+    for message in messages:
+        content = message.get('content') or ''
+        if message.get('role') == 'system' and '"phone"' in content:
+            try:
+                return json.loads(content.split(':', 1)[1]).get('phone')
+            except (ValueError, AttributeError):
+                return None
+    return None
+
+
+def scripted_tool_call(messages, tools):
+    """The tool call a real model would plausibly make, or None"""
+    offered = {t.get('function', {}).get('name') for t in tools or []}
+    if not offered or any(m.get('role') == 'tool' for m in messages):
+        return None
+    user = next((m.get('content') or '' for m in reversed(messages) if m.get('role') == 'user'), '')
+    lowered = user.lower()
+    for keywords, name, build_args in TOOL_SCRIPT:
+        if name in offered and any(k in lowered for k in keywords):
+            return {'id': f"call_{uuid.uuid4().hex[:12]}", 'type': 'function',
+                    'function': {'name': name, 'arguments': json.dumps(build_args(user, _context_phone(messages)))}}
+    return None
+
+
+def make_openai_app(latency=None, model='gpt-4o'):
+    """Fake OpenAI-compatible API; app.config['STATS'] counts calls and tokens"""
+    app = Flask('fake_openai')
+    latency = latency or LatencyModel()
+    stats = app.config['STATS'] = Counter()
+
+    @app.route('/v1/models')
+    def models():
+        return jsonify({'object': 'list', 'data': [{'id': model, 'object': 'model'}]})
+
+    @app.route('/v1/chat/completions', methods=['POST'])
+    def chat_completions():
+        body = request.get_json(force=True)
+        messages = body.get('messages', [])
+        tool_call = scripted_tool_call(messages, body.get('tools'))
+        prompt_tokens = sum(_tokens(m.get('content') if isinstance(m.get('content'), str) else '') for m in messages)
+        reply = None if tool_call else CANNED_REPLY
+        completion_tokens = _tokens(reply) if reply else 20
+
+        stats['requests'] += 1
+        stats['tool_calls'] += 1 if tool_call else 0
+        stats['prompt_tokens'] += prompt_tokens
+        stats['completion_tokens'] += completion_tokens
+
+        created = int(time.time())
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:16]}"
+        if body.get('stream'):
+            return Response(_stream(completion_id, created, body.get('model', model), reply or '', latency, tool_call),
+                            mimetype='text/event-stream')
+
+        latency.sleep()
+        message = {'role': 'assistant', 'content': reply}
+        if tool_call:
+            message['tool_calls'] = [tool_call]
+        return jsonify({
+            'id': completion_id, 'object': 'chat.completion', 'created': created,
+            'model': body.get('model', model),
+            'choices': [{'index': 0, 'message': message,
+                         'finish_reason': 'tool_calls' if tool_call else 'stop'}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                      'total_tokens': prompt_tokens + completion_tokens},
+        })
+
+    return app
+
+
+def _stream(completion_id, created, model, text, latency, tool_call=None):
+    """SSE chunks: the sampled latency is time-to-first-token, then ~20ms per word"""
+    def chunk(delta, finish_reason=None):
+        return {'id': completion_id, 'object': 'chat.completion.chunk', 'created': created, 'model': model,
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]}
+
+    latency.sleep()
+    if tool_call:
+        # Name first, then the arguments in pieces, like the real API
+        function = tool_call['function']
+        head = {'index': 0, 'id': tool_call['id'], 'type': 'function',
+                'function': {'name': function['name'], 'arguments': ''}}
+        yield f"data: {json.dumps(chunk({'role': 'assistant', 'tool_calls': [head]}))}\n\n"
+        arguments = function['arguments']
+        for start in range(0, len(arguments), 16):
+            piece = {'index': 0, 'function': {'arguments': arguments[start:start + 16]}}
+            yield f"data: {json.dumps(chunk({'tool_calls': [piece]}))}\n\n"
+        yield f"data: {json.dumps(chunk({}, 'tool_calls'))}\n\n"
+        yield "data: [DONE]\n\n"
+        return
+    for i, word in enumerate(text.split(' ')):
+        yield f"data: {json.dumps(chunk({'content': word if i == 0 else ' ' + word}))}\n\n"
+        time.sleep(0.02)
+    done = chunk({}, 'stop')
+    yield f"data: {json.dumps(done)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+# ---------- Serving ----------
+
+class FakeServer:
+    """Threaded WSGI server on 127.0.0.1 (port 0 = any free port)"""
+
+    def __init__(self, app, port=0, host='127.0.0.1'):
+        self.app = app
+        self.server = make_server(host, port, app, threaded=True)
+        self.url = f"http://{host}:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True,
+                                       name=f"fake-{app.name}")
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the fake Turkcell API and fake OpenAI locally")
+    parser.add_argument('--api-port', type=int, default=8001)
+    parser.add_argument('--openai-port', type=int, default=8002)
+    parser.add_argument('--api-latency', default='lognormal:80,0.5')
+    parser.add_argument('--llm-latency', default='lognormal:700,0.4')
+    parser.add_argument('--customers', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    api = FakeServer(make_turkcell_app(LatencyModel.parse(args.api_latency, args.seed), args.customers),
+                     args.api_port).start()
+    llm = FakeServer(make_openai_app(LatencyModel.parse(args.llm_latency, args.seed + 1)), args.openai_port).start()
+    print(f"🧪 Fake Turkcell API: {api.url}  (API_BASE_URL / TURKCELL_API_BASE, latency {args.api_latency})")
+    print(f"🧪 Fake OpenAI:       {llm.url}/v1  (OPENAI_BASE_URL, latency {args.llm_latency})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+Language identification benchmark: keyword scanning vs app.language_id
+
+Run from the project root:
+    python -m benchmarks.language_id_benchmark --repeat 2000
+
+The labelled phrases below are NOT part of the training text in
+app/language_id.py; they are the kind of thing callers actually say,
+including the short and ambiguous turns the keyword scanner got wrong.
+"""
+import argparse
+import time
+from collections import Counter, defaultdict
+
+from app.language_id import LanguageIdentifier
+
+LABELLED_PHRASES = [
+    ('EN', "Hello, my internet is not working"),
+    ('EN', "Hi, I need help with my data package"),
+    ('EN', "Can I buy another package for my trip"),
+    ('EN', "Nothing loads on my phone"),
+    ('EN', "Is the network down in Antalya"),
+    ('EN', "How many gigabytes are left"),
+    ('EN', "I think someone is using my line"),
+    ('EN', "Thanks, bye"),
+    ('EN', "Yes"),
+    ('EN', "What is the cheapest option"),
+    ('EN', "My daughter cannot send messages"),
+    ('EN', "Please cancel the roaming package"),
+    ('TR', "Merhaba, internetim çalışmıyor"),
+    ('TR', "Paketim hakkında bilgi almak istiyorum"),
+    ('TR', "Kalan internetimi öğrenebilir miyim"),
+    ('TR', "Telefonum şebeke bulmuyor"),
+    ('TR', "Ne kadar param kaldı"),
+    ('TR', "Yeni bir paket almak istiyorum"),
+    ('TR', "Teşekkürler, görüşürüz"),
+    ('TR', "Evet"),
+    ('TR', "Faturam neden bu kadar yüksek"),
+    ('TR', "İnternet çok yavaş"),
+    ('TR', "Birisi beni dolandırmaya çalışıyor"),
+    ('TR', "Hat kapandı mı"),
+    ('DE', "Hallo, mein Internet funktioniert nicht"),
+    ('DE', "Ich brauche ein neues Datenpaket"),
+    ('DE', "Wie viel Guthaben habe ich noch"),
+    ('DE', "Mein Handy hat keinen Empfang"),
+    ('DE', "Gibt es eine Störung in Istanbul"),
+    ('DE', "Danke, tschüss"),
+    ('DE', "Ja"),
+    ('DE', "Warum ist die Rechnung so hoch"),
+    ('DE', "Ich möchte das Paket kündigen"),
+    ('DE', "Meine Tochter kann keine Nachrichten schicken"),
+    ('DE', "Das Internet ist sehr langsam"),
+    ('DE', "Können Sie mir helfen"),
+    ('RU', "Привет, мой интернет не работает"),
+    ('RU', "Сколько у меня осталось гигабайт"),
+    ('RU', "Мне нужен новый пакет"),
+    ('RU', "Спасибо, до свидания"),
+    ('RU', "Да"),
+    ('RU', "Почему так дорого"),
+    ('AR', "مرحبا، الإنترنت لا يعمل"),
+    ('AR', "كم رصيدي المتبقي"),
+    ('AR', "أريد باقة جديدة"),
+    ('AR', "شكرا، مع السلامة"),
+    ('AR', "نعم"),
+    ('AR', "لماذا الفاتورة مرتفعة"),
+]
+
+
+def keyword_scan(text):
+    """The original detect_language_from_speech, minus the prints"""
+    text_lower = text.lower()
+    language_indicators = {
+        'EN': ['hello', 'hi', 'help', 'internet', 'data', 'package', 'problem', 'my', 'the', 'is', 'not', 'working'],
+        'TR': ['merhaba', 'yardım', 'paket', 'internet', 'benim', 'için', 'var', 'yok', 'nasıl', 'ne'],
+        'AR': ['مرحبا', 'مساعدة', 'الإنترنت', 'بيانات', 'باقة'],
+        'DE': ['hallo', 'hilfe', 'internet', 'daten', 'paket', 'mein', 'nicht'],
+        'RU': ['привет', 'помощь', 'интернет', 'пакет', 'мой']
+    }
+    scores = {}
+    for lang, indicators in language_indicators.items():
+        score = sum(1 for word in indicators if word in text_lower)
+        if score > 0:
+            scores[lang] = score
+    if scores:
+        return max(scores, key=scores.get)
+    return 'EN'
+
+
+def evaluate(label, detect):
+    per_language = defaultdict(lambda: [0, 0])
+    confusions = Counter()
+    for expected, text in LABELLED_PHRASES:
+        got = detect(text)
+        per_language[expected][1] += 1
+        if got == expected:
+            per_language[expected][0] += 1
+        else:
+            confusions[(expected, got)] += 1
+
+    correct = sum(c for c, _ in per_language.values())
+    print(f"\n{label}")
+    print(f"   Accuracy:  {correct}/{len(LABELLED_PHRASES)} ({correct / len(LABELLED_PHRASES):.1%})")
+    print("   Per language: " + ", ".join(
+        f"{lang} {c}/{n}" for lang, (c, n) in sorted(per_language.items())))
+    if confusions:
+        print("   Confusions:   " + ", ".join(
+            f"{e}→{g} ×{n}" for (e, g), n in confusions.most_common()))
+
+
+def throughput(label, detect, repeat):
+    texts = [text for _, text in LABELLED_PHRASES]
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            detect(text)
+    elapsed = time.perf_counter() - t0
+    n = repeat * len(texts)
+    print(f"   {label:<24} {n / elapsed:>10,.0f} phrases/s  ({elapsed / n * 1e6:.1f}µs each)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Language identification benchmark")
+    parser.add_argument('--repeat', type=int, default=2000, help="Passes over the phrase set for throughput")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    identifier = LanguageIdentifier()
+    print(f"🌍 Profiles compiled in {(time.perf_counter() - t0) * 1000:.1f}ms "
+          f"({sum(len(p) for p in identifier.profiles.values()):,} n-grams)")
+
+    evaluate("🔤 Keyword scan (old detect_language_from_speech)", keyword_scan)
+    evaluate("📊 Script + n-gram (app.language_id)", lambda text: identifier.identify(text)[0])
+
+    low = [(text, lang, conf) for _, text in LABELLED_PHRASES
+           for lang, conf in [identifier.identify(text)] if conf < 0.6]
+    if low:
+        print("   Low confidence (<0.6): " + ", ".join(f'"{t}" {l} {c:.2f}' for t, l, c in low))
+
+    print("\n⚡ Throughput")
+    throughput("Keyword scan", keyword_scan, args.repeat)
+    throughput("identify()", identifier.identify, args.repeat)
+
+    texts = [text for _, text in LABELLED_PHRASES] * args.repeat
+    t0 = time.perf_counter()
+    identifier.identify_batch(texts)
+    elapsed = time.perf_counter() - t0
+    print(f"   {'identify_batch()':<24} {len(texts) / elapsed:>10,.0f} phrases/s  (repeated transcripts scored once)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""
+Offline load test: the Flask app against local stand-ins
+
+Run from the project root:
+    python -m benchmarks.load_test --concurrency 20 --duration 30
+    python -m benchmarks.load_test --no-mcp --llm-latency fixed:0 --api-latency fixed:0
+
+Boots the fake Turkcell API and fake OpenAI (benchmarks/fakes.py), points
+the app at them (API_BASE_URL, TURKCELL_API_BASE for the MCP server,
+OPENAI_BASE_URL), serves main.app on a local threaded server and replays
+Twilio-style form posts from N concurrent clients:
+
+- WhatsApp: POST /webhook with Body/From/MessageSid
+- Voice:    POST /voice/incoming, then --turns x POST /voice/process on
+            the same CallSid (the deferred /voice/result polls too, if
+            VOICE_DEFERRED_TURNS=true)
+
+Reports throughput and p50/p95/p99 per route, plus how many backend and
+LLM calls the run caused. Nothing leaves the machine.
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+import requests
+
+from benchmarks.fakes import FakeServer, LatencyModel, fake_phone, make_openai_app, make_turkcell_app
+
+MESSAGES = [
+    "What is my balance?",
+    "Kalan bakiyem ne kadar?",
+    "My internet is not working",
+    "Is there a network outage in Bodrum?",
+    "Which package do you recommend for two weeks?",
+    "Hallo, mein Internet ist sehr langsam",
+    "Thanks, goodbye!",
+    "Can you help me with roaming?",
+]
+
+
+def percentile(samples, p):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+class Recorder:
+    """Per-route latencies and failures, shared by all client threads"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, route, seconds, ok):
+        with self._lock:
+            self.latencies[route].append(seconds)
+            if not ok:
+                self.errors[route] += 1
+
+
+def post(session, recorder, base_url, route, data, timeout):
+    started = time.perf_counter()
+    try:
+        response = session.post(f"{base_url}{route}", data=data, timeout=timeout)
+        ok = response.status_code == 200
+        body = response.text
+    except requests.exceptions.RequestException:
+        ok, body = False, ''
+    recorder.record(route, time.perf_counter() - started, ok)
+    return body
+
+
+def whatsapp_message(session, recorder, base_url, rng, args):
+    phone = fake_phone(rng.randrange(args.customers + args.customers // 10))  # ~10% unknown callers
+    post(session, recorder, base_url, '/webhook', {
+        'Body': rng.choice(MESSAGES),
+        'From': f"whatsapp:{phone}",
+        'MessageSid': f"SM{uuid.uuid4().hex}",
+    }, args.timeout)
+
+
+def voice_call(session, recorder, base_url, rng, args):
+    phone = fake_phone(rng.randrange(args.customers))
+    form = {'From': phone, 'CallSid': f"CA{uuid.uuid4().hex}"}
+    post(session, recorder, base_url, '/voice/incoming', form, args.timeout)
+    for _ in range(args.turns):
+        body = post(session, recorder, base_url, '/voice/process',
+                    {**form, 'SpeechResult': rng.choice(MESSAGES), 'Confidence': '0.92'}, args.timeout)
+        # Deferred turns: follow the <Redirect> like Twilio does
+        polls = 0
+        while '/voice/result' in body and polls < 30:
+            body = post(session, recorder, base_url, '/voice/result', form, args.timeout)
+            polls += 1
+
+
+def client(worker, base_url, recorder, deadline, args):
+    rng = random.Random(args.seed * 1000 + worker)
+    session = requests.Session()
+    while time.perf_counter() < deadline:
+        if rng.random() < args.whatsapp_share:
+            whatsapp_message(session, recorder, base_url, rng, args)
+        else:
+            voice_call(session, recorder, base_url, rng, args)
+
+
+def point_app_at_fakes(api_url, openai_url, use_mcp):
+    """Must run before anything imports app.config"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    os.environ.update({
+        'API_BASE_URL': api_url,
+        'TURKCELL_API_BASE': api_url,
+        'OPENAI_BASE_URL': f"{openai_url}/v1",
+        'OPENAI_API_KEY': 'sk-fake-load-test',
+        'MCP_SERVER_PATH': os.path.join(root, 'mcpsc', 'main.py') if use_mcp else '',
+        'WARMUP_ENABLED': 'false',
+        'PRERENDER_AUDIO_ON_STARTUP': 'false',
+    })
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ.setdefault('FASTMCP_LOG_LEVEL', 'WARNING')  # MCP server subprocess
+
+
+def report(recorder, elapsed, api_stats, llm_stats):
+    total = sum(len(v) for v in recorder.latencies.values())
+    print(f"\n{'route':<18}{'n':>7}{'err':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for route, samples in sorted(recorder.latencies.items()):
+        row = [percentile(samples, p) * 1000 for p in (50, 95, 99)] + [max(samples) * 1000]
+        print(f"{route:<18}{len(samples):>7}{recorder.errors[route]:>6}{len(samples) / elapsed:>9.1f}"
+              + ''.join(f"{v:>9.0f}" for v in row))
+    print(f"\nTotal: {total} requests in {elapsed:.1f}s = {total / elapsed:.1f} req/s, "
+          f"{sum(recorder.errors.values())} errors")
+    print(f"Backend calls: {sum(api_stats.values())} "
+          f"({', '.join(f'{k} x{v}' for k, v in api_stats.most_common(5))})")
+    print(f"LLM calls: {llm_stats['requests']} ({llm_stats['tool_calls']} tool calls, "
+          f"{llm_stats['prompt_tokens']} prompt + {llm_stats['completion_tokens']} completion tokens)")
+
+
+def stage_report(top=12):
+    """Where the time went, from the app's own trace histograms (app/tracing.py)"""
+    from app.tracing import stage_seconds
+    series = stage_seconds._series
+    if not series:
+        return
+    print(f"\n{'stage (channel)':<52}{'n':>7}{'mean ms':>10}{'total s':>10}")
+    for (stage, channel), values in sorted(series.items(), key=lambda kv: -kv[1][-2])[:top]:
+        total, count = values[-2], values[-1]
+        print(f"{f'{stage} ({channel})':<52}{count:>7}{total / count * 1000:>10.0f}{total:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test against fake Turkcell API / OpenAI")
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--duration', type=float, default=20, help="seconds of load")
+    parser.add_argument('--whatsapp-share', type=float, default=0.6, help="fraction of sessions that are WhatsApp")
+    parser.add_argument('--turns', type=int, default=2, help="/voice/process turns per call")
+    parser.add_argument('--api-latency', default='lognormal:80,0.5', help="fake Turkcell API latency (ms)")
+    parser.add_argument('--llm-latency', default='lognormal:700,0.4', help="fake OpenAI latency (ms)")
+    parser.add_argument('--customers', type=int, default=1000)
+    parser.add_argument('--no-mcp', action='store_true', help="skip the MCP tool server (no subprocess per turn)")
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--verbose', action='store_true', help="keep request/app logs")
+    args = parser.parse_args()
+
+    api = FakeServer(make_turkcell_app(LatencyModel.parse(args.api_latency, args.seed), args.customers)).start()
+    llm = FakeServer(make_openai_app(LatencyModel.parse(args.llm_latency, args.seed + 1))).start()
+    point_app_at_fakes(api.url, llm.url, use_mcp=not args.no_mcp)
+
+    sys.path.insert(0, os.getcwd())
+    import main as agent  # noqa: E402 - configured by the environment above
+
+    if not args.verbose:
+        for name in ('werkzeug', 'httpx', 'openai', 'intelligence', 'mcp'):
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+    app_server = FakeServer(agent.app).start()
+    print(f"🧪 App {app_server.url} | fake API {api.url} ({args.api_latency}) | "
+          f"fake OpenAI {llm.url} ({args.llm_latency}) | MCP {'off' if args.no_mcp else 'on'}")
+    print(f"🚀 {args.concurrency} clients for {args.duration:.0f}s "
+          f"({args.whatsapp_share:.0%} WhatsApp, {args.turns} turns per call)...")
+
+    recorder = Recorder()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    threads = [threading.Thread(target=client, args=(i, app_server.url, recorder, deadline, args), daemon=True)
+               for i in range(args.concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    report(recorder, elapsed, api.app.config['STATS'], llm.app.config['STATS'])
+    stage_report()
+
+    for server in (app_server, api, llm):
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
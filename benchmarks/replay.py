@@ -0,0 +1,204 @@
+"""
+Replay recorded conversations (app/cassette.py) against the current code
+
+Record first, in any environment (real or benchmarks/fakes.py):
+    CASSETTE_MODE=record CASSETTE_DIR=cassettes python main.py
+
+Then, from the project root:
+    python -m benchmarks.replay cassettes/                  # original timing
+    python -m benchmarks.replay cassettes/ --speed 0        # no sleeps: pure code-path cost
+    python -m benchmarks.replay cassettes/ --save before.json
+    python -m benchmarks.replay cassettes/ --baseline before.json
+
+Every recorded inbound turn (WhatsApp message, voice turn) is posted to
+main.app again in its original order, with the original think time between
+turns (scaled by --speed). Backend HTTP calls, LLM completions and MCP tool
+calls are answered from the cassette, sleeping their recorded duration x
+--speed, so the run is deterministic and nothing leaves the machine.
+
+Reports per-route latency, per-stage time (app/tracing.py), call counts,
+cassette misses (calls the recording doesn't have: the code under test
+asks for something new) and LLM prompt size now vs when recorded.
+--baseline prints the difference against an earlier --save.
+
+Deferred voice turns (/voice/result polls) are re-driven by following the
+<Redirect>s, not from the recorded polls. /voice/stream (websocket) turns
+are not replayed.
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+from benchmarks.load_test import Recorder, percentile
+
+UNROUTABLE = 'http://127.0.0.1:9'   # anything that escapes the cassette fails fast
+
+
+def load_cassettes(paths):
+    from app.cassette import Cassette
+    files = []
+    for path in paths:
+        files += sorted(glob.glob(os.path.join(path, '*.json'))) if os.path.isdir(path) else [path]
+    return [Cassette.load(f) for f in files]
+
+
+def replay_conversation(client, cassette, recorder, speed):
+    """Post the cassette's turns in order, keeping (scaled) think time between them"""
+    started = time.perf_counter()
+    for turn in cassette.turns:
+        if turn['route'] == '/voice/result':
+            continue
+        if speed:
+            wait = turn['offset_s'] * speed - (time.perf_counter() - started)
+            if wait > 0:
+                time.sleep(wait)
+        body = post(client, recorder, turn['route'], turn['form'])
+        polls = 0
+        while '/voice/result' in body and polls < 30:
+            body = post(client, recorder, '/voice/result', turn['form'])
+            polls += 1
+
+
+def post(client, recorder, route, form):
+    t = time.perf_counter()
+    response = client.post(route, data=form)
+    recorder.record(route, time.perf_counter() - t, response.status_code == 200)
+    return response.get_data(as_text=True)
+
+
+def summarize(recorder, stats, elapsed):
+    from app.tracing import stage_seconds
+    routes = {
+        route: {
+            'n': len(samples),
+            'errors': recorder.errors[route],
+            'p50_ms': percentile(samples, 50) * 1000,
+            'p95_ms': percentile(samples, 95) * 1000,
+            'max_ms': max(samples) * 1000,
+        }
+        for route, samples in sorted(recorder.latencies.items())
+    }
+    stages = {
+        f"{stage} ({channel})": {'n': values[-1], 'mean_ms': values[-2] / values[-1] * 1000}
+        for (stage, channel), values in stage_seconds._series.items() if values[-1]
+    }
+    return {'elapsed_s': elapsed, 'routes': routes, 'stages': stages, 'calls': dict(stats)}
+
+
+def print_summary(summary, baseline=None):
+    def delta(now, key, *path):
+        if baseline is None:
+            return ''
+        before = baseline
+        for p in path:
+            before = before.get(p, {})
+        before = before.get(key) if isinstance(before, dict) else None
+        if not before:
+            return f"{'new':>9}"
+        return f"{(now - before) / before:>+9.0%}"
+
+    print(f"\n{'route':<18}{'n':>6}{'err':>5}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}" + (f"{'Δp50':>9}" if baseline else ''))
+    for route, r in summary['routes'].items():
+        print(f"{route:<18}{r['n']:>6}{r['errors']:>5}{r['p50_ms']:>9.0f}{r['p95_ms']:>9.0f}{r['max_ms']:>9.0f}"
+              + delta(r['p50_ms'], 'p50_ms', 'routes', route))
+
+    print(f"\n{'stage (channel)':<52}{'n':>6}{'mean ms':>10}" + (f"{'Δmean':>9}" if baseline else ''))
+    for name, s in sorted(summary['stages'].items(), key=lambda kv: -kv[1]['n'] * kv[1]['mean_ms'])[:15]:
+        print(f"{name:<52}{s['n']:>6}{s['mean_ms']:>10.0f}" + delta(s['mean_ms'], 'mean_ms', 'stages', name))
+
+    calls = summary['calls']
+    print(f"\nCalls: " + ', '.join(f"{kind} {calls.get(f'{kind}_calls', 0)} ({calls.get(f'{kind}_misses', 0)} missed)"
+                                 for kind in ('http', 'llm', 'tool')))
+    print(f"LLM tokens: ~{calls.get('llm_prompt_tokens', 0)} prompt now vs "
+          f"~{calls.get('llm_recorded_prompt_tokens', 0)} recorded, "
+          f"{calls.get('llm_completion_tokens', 0)} completion (replayed)")
+    if baseline:
+        before = baseline['calls']
+        for key in ('http_calls', 'llm_calls', 'tool_calls', 'llm_prompt_tokens'):
+            if before.get(key) != calls.get(key):
+                print(f"   {key}: {before.get(key, 0)} -> {calls.get(key, 0)}")
+    print(f"\nReplayed in {summary['elapsed_s']:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded conversations against the current code")
+    parser.add_argument('paths', nargs='+', help="cassette files or directories")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="scale recorded think time and call durations (0 = don't wait)")
+    parser.add_argument('--concurrency', type=int, default=1, help="conversations replayed at once")
+    parser.add_argument('--no-mcp', action='store_true', help="replay through OpenAIProvider instead of MCPProvider")
+    parser.add_argument('--save', help="write the summary as JSON")
+    parser.add_argument('--baseline', help="compare with a summary written by --save")
+    parser.add_argument('--verbose', action='store_true', help="keep app logs")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    os.environ.update({
+        'API_BASE_URL': UNROUTABLE,
+        'TURKCELL_API_BASE': UNROUTABLE,
+        'OPENAI_BASE_URL': f"{UNROUTABLE}/v1",
+        'OPENAI_API_KEY': 'sk-replay',
+        'MCP_SERVER_PATH': '' if args.no_mcp else os.path.join(root, 'mcpsc', 'main.py'),
+        'CASSETTE_MODE': 'off',
+        'WARMUP_ENABLED': 'false',
+        'PRERENDER_AUDIO_ON_STARTUP': 'false',
+    })
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ.setdefault('FASTMCP_LOG_LEVEL', 'WARNING')
+
+    sys.path.insert(0, os.getcwd())
+    import main as agent  # noqa: E402 - configured by the environment above
+    from app.cassette import deck
+
+    if not args.verbose:
+        for name in ('werkzeug', 'httpx', 'openai', 'intelligence', 'mcp'):
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+    cassettes = load_cassettes(args.paths)
+    if not cassettes:
+        sys.exit("No cassettes found")
+    deck.start_replay(args.speed)
+    for cassette in cassettes:
+        deck.load(cassette)
+    print(f"📼 Replaying {len(cassettes)} conversations, "
+          f"{sum(len(c.turns) for c in cassettes)} recorded turns, speed x{args.speed:g}")
+
+    recorder = Recorder()
+    pending = list(cassettes)
+    lock = threading.Lock()
+
+    def worker():
+        client = agent.app.test_client()
+        while True:
+            with lock:
+                if not pending:
+                    return
+                cassette = pending.pop(0)
+            replay_conversation(client, cassette, recorder, args.speed)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, args.concurrency))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    summary = summarize(recorder, deck.stats, time.perf_counter() - started)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_summary(summary, baseline)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=1)
+        print(f"💾 Summary saved to {args.save}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Inbound call audio buffering benchmark: `bytes +=` vs AudioRingBuffer
+
+Run from the project root:
+    python -m benchmarks.ring_buffer_benchmark --calls 500 --seconds 120
+
+Simulates N concurrent calls the way handle_media_stream sees them: one
+20ms μ-law frame per call per tick, round-robin across calls. Each frame
+is decoded, buffered and run through the VAD; at every utterance end the
+utterance audio is handed over for transcription.
+"""
+import argparse
+import time
+import numpy as np
+
+from app.audio_codec import FRAME_SAMPLES, pcm_to_ulaw, ulaw_to_pcm
+from app.ring_buffer import AudioRingBuffer, memory_stats
+from app.vad import VoiceActivityDetector, UTTERANCE_START, UTTERANCE_END
+from benchmarks.vad_benchmark import synth_call
+
+
+class LegacySession:
+    """What the original StreamingSession did: audio_buffer += chunk"""
+
+    def __init__(self):
+        self.audio_buffer = b''
+        self.vad = VoiceActivityDetector()
+
+    def on_frame(self, payload):
+        pcm = ulaw_to_pcm(payload)
+        self.audio_buffer += pcm.tobytes()
+        events = self.vad.process_pcm(pcm)
+        for event in events:
+            if event.kind == UTTERANCE_END:
+                # Hand the whole accumulated buffer over (it is never trimmed)
+                _ = bytes(self.audio_buffer)
+        return events
+
+
+class RingSession:
+    """Current StreamingSession: decode into a ring, VAD on a memoryview"""
+
+    def __init__(self, seconds):
+        self.audio = AudioRingBuffer(seconds=seconds)
+        self.vad = VoiceActivityDetector()
+        self.start_sample = None
+
+    def on_frame(self, payload):
+        frame = self.audio.write_ulaw(payload)
+        events = self.vad.process_pcm(frame)
+        for event in events:
+            if event.kind == UTTERANCE_START:
+                self.start_sample = max(0, event.frame_index * FRAME_SAMPLES - 2400)
+                self.audio.pin(self.start_sample)
+            elif event.kind == UTTERANCE_END:
+                segments = self.audio.view(self.start_sample, (event.frame_index + 1) * FRAME_SAMPLES)
+                _ = sum(len(s) for s in segments)  # Transcription reads the views in place
+                self.audio.unpin()
+        return events
+
+
+def build_call_audio(n_calls, seconds, seed):
+    """A handful of distinct synthetic calls, reused round-robin (generation isn't what we measure)"""
+    rng = np.random.default_rng(seed)
+    templates = []
+    for _ in range(min(n_calls, 8)):
+        pcm, _ = synth_call(rng, max(1, int(seconds // 6)), 20)
+        n = int(seconds * 8000) // FRAME_SAMPLES * FRAME_SAMPLES
+        pcm = np.resize(pcm, n)
+        templates.append(pcm_to_ulaw(pcm))
+    return templates
+
+
+def run(label, make_session, buffered_bytes, templates, n_calls, seconds):
+    n_frames = int(seconds * 1000 / 20)
+    sessions = [make_session() for _ in range(n_calls)]
+    utterances = 0
+
+    t0 = time.perf_counter()
+    cpu0 = time.process_time()
+    for f in range(n_frames):
+        offset = f * FRAME_SAMPLES
+        for i, session in enumerate(sessions):
+            audio = templates[i % len(templates)]
+            for event in session.on_frame(audio[offset:offset + FRAME_SAMPLES]):
+                utterances += event.kind == UTTERANCE_END
+    cpu = time.process_time() - cpu0
+    wall = time.perf_counter() - t0
+
+    held = sum(buffered_bytes(s) for s in sessions)
+
+    frames = n_frames * n_calls
+    print(f"\n{label}")
+    print(f"   Frames processed:   {frames:,} ({n_calls} calls × {seconds:.0f}s)")
+    print(f"   Wall / CPU:         {wall:.2f}s / {cpu:.2f}s")
+    print(f"   CPU per frame:      {cpu / frames * 1e6:.1f}µs")
+    print(f"   CPU per call:       {cpu / (n_calls * seconds) * 100:.3f}% of one core")
+    print(f"   Utterances handed:  {utterances}")
+    print(f"   Audio held at end:  {held / 1e6:.1f}MB ({held / n_calls / 1024:.0f}KB per call)")
+    return sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Call audio buffering benchmark")
+    parser.add_argument('--calls', type=int, default=500)
+    parser.add_argument('--seconds', type=float, default=120, help="Simulated call length")
+    parser.add_argument('--ring-seconds', type=float, default=32)
+    parser.add_argument('--legacy-calls', type=int, default=50,
+                        help="Calls for the bytes += baseline (quadratic, keep it small)")
+    parser.add_argument('--seed', type=int, default=3)
+    args = parser.parse_args()
+
+    templates = build_call_audio(args.calls, args.seconds, args.seed)
+
+    sessions = run(f"🔁 AudioRingBuffer ({args.ring_seconds:.0f}s per call)",
+                   lambda: RingSession(args.ring_seconds), lambda s: s.audio.nbytes,
+                   templates, args.calls, args.seconds)
+    stats = memory_stats()
+    print(f"   Accounted buffers:  {stats['buffers']} live, {stats['bytes'] / 1e6:.1f}MB "
+          f"({stats['bytes'] / stats['buffers'] / 1024:.0f}KB each, fixed for the whole call)")
+    print(f"   Overflows:          {sum(s.audio.overflows for s in sessions)}")
+    for s in sessions:
+        s.audio.close()
+    del sessions
+
+    if args.legacy_calls:
+        run("🐌 Legacy bytes += (grows for the whole call)",
+            LegacySession, lambda s: len(s.audio_buffer),
+            templates, args.legacy_calls, args.seconds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""
+VAD accuracy + throughput benchmark on synthetic phone audio
+
+Run from the project root:
+    python -m benchmarks.vad_benchmark
+
+Builds calls from voiced-speech-like bursts (harmonics + syllable envelope,
+with short intra-sentence pauses) separated by silence, adds noise at several
+SNRs, pushes everything through μ-law like Twilio does, then feeds it to the
+VAD frame by frame exactly as handle_media_stream would.
+"""
+import argparse
+import time
+import numpy as np
+
+from app.audio_codec import SAMPLE_RATE, FRAME_SAMPLES, FRAME_MS, pcm_to_ulaw
+from app.vad import VoiceActivityDetector, UTTERANCE_START
+
+
+def synth_utterance(rng, duration_s, level):
+    """Voiced speech-like signal: harmonic stack, pitch drift, syllable envelope, pauses"""
+    n = int(duration_s * SAMPLE_RATE)
+    t = np.arange(n) / SAMPLE_RATE
+
+    f0 = rng.uniform(100, 240) * (1 + 0.08 * np.sin(2 * np.pi * rng.uniform(0.5, 2) * t))
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    signal = sum(np.sin(k * phase) / k for k in range(1, 12))
+
+    syllable_rate = rng.uniform(3.5, 5.5)
+    envelope = np.clip(np.sin(2 * np.pi * syllable_rate * t), 0, None) ** 0.6
+
+    # One or two short word gaps (150-300ms) that must NOT end the utterance
+    for _ in range(rng.integers(0, 3)):
+        gap_start = int(rng.uniform(0.2, 0.8) * n)
+        gap_len = int(rng.uniform(0.15, 0.3) * SAMPLE_RATE)
+        envelope[gap_start:gap_start + gap_len] = 0
+
+    signal = signal * envelope
+    return level * signal / (np.sqrt(np.mean(signal ** 2)) + 1e-9)
+
+
+def synth_call(rng, n_utterances, snr_db, speech_rms=2500.0):
+    """Return (pcm int16, [(start_ms, end_ms), ...]) for one simulated call"""
+    pieces = []
+    truth = []
+    cursor = 0
+
+    def silence(seconds):
+        return np.zeros(int(seconds * SAMPLE_RATE))
+
+    lead = silence(rng.uniform(0.5, 1.5))
+    pieces.append(lead)
+    cursor += lead.size
+
+    for _ in range(n_utterances):
+        utt = synth_utterance(rng, rng.uniform(0.8, 4.0), speech_rms)
+        truth.append((cursor * 1000 // SAMPLE_RATE, (cursor + utt.size) * 1000 // SAMPLE_RATE))
+        pieces.append(utt)
+        cursor += utt.size
+        gap = silence(rng.uniform(1.5, 3.0))
+        pieces.append(gap)
+        cursor += gap.size
+
+    clean = np.concatenate(pieces)
+
+    # Mix of white and low-passed noise, like a mobile line
+    noise_rms = speech_rms / (10 ** (snr_db / 20))
+    white = rng.standard_normal(clean.size)
+    brown = np.convolve(rng.standard_normal(clean.size), np.ones(8) / 8, mode='same')
+    noise = 0.5 * white + 0.5 * brown / (np.std(brown) + 1e-9)
+    noise *= noise_rms / (np.sqrt(np.mean(noise ** 2)) + 1e-9)
+
+    pcm = np.clip(clean + noise, -32768, 32767).astype(np.int16)
+    return pcm, truth
+
+
+def run_call(ulaw, language='EN'):
+    """Feed one call frame by frame, return (starts_ms, ends_ms)"""
+    vad = VoiceActivityDetector(language=language)
+    starts, ends = [], []
+    view = memoryview(ulaw)
+    for offset in range(0, len(ulaw) - FRAME_SAMPLES + 1, FRAME_SAMPLES):
+        for event in vad.process_ulaw(view[offset:offset + FRAME_SAMPLES]):
+            (starts if event.kind == UTTERANCE_START else ends).append(event.time_ms)
+    return starts, ends, vad.endpoint_silence_ms
+
+
+def score(truth, starts, ends, endpoint_ms, tolerance_ms=300):
+    """Match detected utterances to ground truth"""
+    hits = 0
+    start_errors = []
+    end_latencies = []
+    used = set()
+
+    for true_start, true_end in truth:
+        for i, start in enumerate(starts):
+            if i in used or abs(start - true_start) > tolerance_ms:
+                continue
+            end = ends[i] if i < len(ends) else None
+            if end is None or end < true_end:
+                continue  # Cut off mid-utterance
+            used.add(i)
+            hits += 1
+            start_errors.append(start - true_start)
+            end_latencies.append(end - true_end)
+            break
+
+    false_alarms = len(starts) - len(used)
+    return hits, false_alarms, start_errors, end_latencies
+
+
+def accuracy_benchmark(rng, calls_per_snr, utterances_per_call):
+    print("📊 Accuracy (synthetic speech, μ-law round trip)")
+    print(f"   {'SNR':>6} {'recall':>8} {'false+':>7} {'start err':>10} {'endpoint lat':>13}")
+
+    for snr_db in (30, 20, 15, 10, 5):
+        total = hits = false_alarms = 0
+        start_errors, end_latencies = [], []
+        for _ in range(calls_per_snr):
+            pcm, truth = synth_call(rng, utterances_per_call, snr_db)
+            starts, ends, endpoint_ms = run_call(pcm_to_ulaw(pcm))
+            h, fa, se, el = score(truth, starts, ends, endpoint_ms)
+            total += len(truth)
+            hits += h
+            false_alarms += fa
+            start_errors += se
+            end_latencies += el
+
+        recall = hits / total if total else 0
+        mean_start = np.mean(np.abs(start_errors)) if start_errors else float('nan')
+        mean_end = np.mean(end_latencies) if end_latencies else float('nan')
+        print(f"   {snr_db:>4}dB {recall:>8.1%} {false_alarms:>7} {mean_start:>8.0f}ms {mean_end:>11.0f}ms")
+
+
+def throughput_benchmark(rng, seconds):
+    print("\n⚡ Throughput (one 20ms frame per call, as in handle_media_stream)")
+    pcm, _ = synth_call(rng, max(1, int(seconds // 5)), 20)
+    ulaw = pcm_to_ulaw(pcm)
+    audio_seconds = len(ulaw) / SAMPLE_RATE
+    n_frames = len(ulaw) // FRAME_SAMPLES
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    run_call(ulaw)
+    cpu_elapsed = time.process_time() - cpu_start
+    wall_elapsed = time.perf_counter() - wall_start
+
+    per_frame_us = cpu_elapsed / n_frames * 1e6
+    cpu_percent = cpu_elapsed / audio_seconds * 100
+    print(f"   Audio processed:     {audio_seconds:.0f}s ({n_frames} frames)")
+    print(f"   Wall time:           {wall_elapsed:.3f}s")
+    print(f"   CPU per frame:       {per_frame_us:.1f}µs (frame budget {FRAME_MS * 1000}µs)")
+    print(f"   CPU per call:        {cpu_percent:.3f}% of one core")
+    print(f"   Calls per core:      ~{int(100 / cpu_percent) if cpu_percent else 'inf'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VAD accuracy and throughput benchmark")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--calls', type=int, default=20, help="Calls per SNR level")
+    parser.add_argument('--utterances', type=int, default=6, help="Utterances per call")
+    parser.add_argument('--seconds', type=float, default=600, help="Audio length for throughput")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    accuracy_benchmark(rng, args.calls, args.utterances)
+    throughput_benchmark(rng, args.seconds)
+
+
+if __name__ == '__main__':
+    main()
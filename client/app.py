@@ -1,16 +1,16 @@
 import streamlit as st
-import asyncio
 import json
+import time
 from openai import OpenAI
 import os
 from dotenv import load_dotenv
-from mcp.client.stdio import stdio_client, StdioServerParameters
-from mcp.client.session import ClientSession
+
+from mcp_session import MCPConnection
 
 # --- Configuration ---
 load_dotenv()  # Load environment variables from .env file
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-SERVER_PATH = "../mcpsc/main.py" 
+SERVER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "mcpsc", "main.py")
 
 st.set_page_config(page_title="Turkcell AI Support", page_icon="🇹🇷")
 st.title("🇹🇷 Turkcell AI Support Agent")
@@ -21,45 +21,79 @@ client = OpenAI(api_key=OPENAI_API_KEY)
 # Initialize Session State
 if "messages" not in st.session_state:
     st.session_state.messages = []
-if "tools" not in st.session_state:
-    st.session_state.tools = []
-
-# --- 1. Automated Tool Discovery ---
-async def fetch_mcp_tools():
-    """Queries the MCP server and returns tools in OpenAI format."""
-    server_params = StdioServerParameters(command="python", args=[SERVER_PATH])
-    async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
-            mcp_tools = await session.list_tools()
-            
-            # Convert MCP schema to OpenAI function schema
-            openai_formatted_tools = []
-            for tool in mcp_tools.tools:
-                openai_formatted_tools.append({
-                    "type": "function",
-                    "function": {
-                        "name": tool.name,
-                        "description": tool.description,
-                        "parameters": tool.inputSchema,
-                    }
-                })
-            return openai_formatted_tools
-
-# Fetch tools once and store in session state
-if not st.session_state.tools:
-    with st.spinner("Connecting to Turkcell MCP Server..."):
-        st.session_state.tools = asyncio.run(fetch_mcp_tools())
-        st.success(f"Connected! {len(st.session_state.tools)} tools discovered.")
-
-# --- 2. Tool Execution Logic ---
-async def call_mcp_tool(tool_name, tool_args):
-    server_params = StdioServerParameters(command="python", args=[SERVER_PATH])
-    async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
-            result = await session.call_tool(tool_name, tool_args)
-            return result.content[0].text
+if "timings" not in st.session_state:
+    st.session_state.timings = []
+
+# --- 1. One MCP server + tool schema for the whole process ---
+@st.cache_resource
+def get_mcp():
+    """Started once, shared by every browser session (see mcp_session.py)"""
+    return MCPConnection(SERVER_PATH).start()
+
+with st.spinner("Connecting to Turkcell MCP Server..."):
+    mcp = get_mcp()
+if not mcp.tools:
+    st.error(f"MCP server unavailable: {mcp.last_error}")
+    st.stop()
+
+# --- 2. Streaming completions ---
+def stream_completion(placeholder, **kwargs):
+    """
+    Stream one chat completion into `placeholder` as tokens arrive.
+
+    Returns (text, tool_calls, ttft): tool calls are reassembled from
+    their streamed fragments into plain message dicts; ttft is seconds to
+    the first content or tool-call delta.
+    """
+    started = time.perf_counter()
+    ttft = None
+    text = ""
+    tool_calls = {}
+    for chunk in client.chat.completions.create(stream=True, **kwargs):
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        if ttft is None and (delta.content or delta.tool_calls):
+            ttft = time.perf_counter() - started
+        if delta.content:
+            text += delta.content
+            placeholder.markdown(text + "▌")
+        for tc in delta.tool_calls or []:
+            call = tool_calls.setdefault(tc.index, {"id": None, "type": "function",
+                                                    "function": {"name": "", "arguments": ""}})
+            if tc.id:
+                call["id"] = tc.id
+            if tc.function and tc.function.name:
+                call["function"]["name"] += tc.function.name
+            if tc.function and tc.function.arguments:
+                call["function"]["arguments"] += tc.function.arguments
+    if text:
+        placeholder.markdown(text)
+    return text, [tool_calls[i] for i in sorted(tool_calls)], ttft
+
+
+def ms(seconds):
+    return f"{seconds * 1000:.0f} ms" if seconds is not None else "–"
+
+
+# --- 3. Debug panel: time-to-first-token per turn (drawn last so it includes this turn) ---
+def render_debug_panel():
+    with st.sidebar.expander("⏱️ Debug: latency", expanded=False):
+        if not st.session_state.timings:
+            st.caption("No turns yet.")
+            return
+        st.table([
+            {
+                "turn": i + 1,
+                "TTFT": ms(t["ttft"]),
+                "tools": ms(t.get("tools")),
+                "TTFT after tools": ms(t.get("ttft_final")),
+                "first visible token": ms(t["first_token"]),
+                "total": ms(t["total"]),
+            }
+            for i, t in enumerate(st.session_state.timings[-20:])
+        ])
+
 
 for message in st.session_state.messages:
     if message.get("role") in ["user", "assistant"] and message.get("content"):
@@ -72,39 +106,55 @@ if prompt := st.chat_input("How can I help you today?"):
         st.markdown(prompt)
 
     with st.chat_message("assistant"):
-        response = client.chat.completions.create(
+        turn_started = time.perf_counter()
+        timing = {}
+        placeholder = st.empty()
+        full_response, tool_calls, timing["ttft"] = stream_completion(
+            placeholder,
             model="gpt-4o",
             messages=st.session_state.messages,
-            tools=st.session_state.tools,
+            tools=mcp.tools,
         )
+        if full_response:
+            timing["first_token"] = timing["ttft"]
 
-        msg = response.choices[0].message
-        if msg.tool_calls:
-            st.session_state.messages.append(msg)
+        if tool_calls:
+            st.session_state.messages.append({"role": "assistant", "content": full_response or None,
+                                              "tool_calls": tool_calls})
+            
+            # --- 4. All tool calls of this turn run concurrently on the shared session ---
+            calls = [(tc["function"]["name"], json.loads(tc["function"]["arguments"] or "{}")) for tc in tool_calls]
+            names = ", ".join(name for name, _ in calls)
+            tools_started = time.perf_counter()
+            with st.status(f"Turkcell System: {names}...", expanded=False):
+                results = mcp.call_tools(calls)
+                st.write("Response received from backend.")
+            timing["tools"] = time.perf_counter() - tools_started
             
-            for tool_call in msg.tool_calls:
-                t_name = tool_call.function.name
-                t_args = json.loads(tool_call.function.arguments)
-                
-                with st.status(f"Turkcell System: {t_name}...", expanded=False):
-                    tool_result = asyncio.run(call_mcp_tool(t_name, t_args))
-                    st.write("Response received from backend.")
-                
+            for tool_call, (t_name, _), tool_result in zip(tool_calls, calls, results):
+                if isinstance(tool_result, Exception):
+                    tool_result = f"Error calling {t_name}: {tool_result}"
                 st.session_state.messages.append({
                     "role": "tool",
-                    "tool_call_id": tool_call.id,
+                    "tool_call_id": tool_call["id"],
                     "name": t_name,
                     "content": tool_result
                 })
             
-            # Final response after tool execution
-            final_res = client.chat.completions.create(
+            # Final response after tool execution, streamed into a fresh bubble area
+            final_started = time.perf_counter()
+            full_response, _, ttft_final = stream_completion(
+                st.empty(),
                 model="gpt-4o",
                 messages=st.session_state.messages
             )
-            full_response = final_res.choices[0].message.content
-        else:
-            full_response = msg.content
+            timing["ttft_final"] = ttft_final
+            if ttft_final is not None and "first_token" not in timing:
+                timing["first_token"] = final_started - turn_started + ttft_final
+
+        timing.setdefault("first_token", None)
+        timing["total"] = time.perf_counter() - turn_started
+        st.session_state.timings.append(timing)
+        st.session_state.messages.append({"role": "assistant", "content": full_response})
 
-        st.markdown(full_response)
-        st.session_state.messages.append({"role": "assistant", "content": full_response})
\ No newline at end of file
+render_debug_panel()
@@ -0,0 +1,179 @@
+"""
+One MCP session per Streamlit process, shared by every browser session
+
+Spawning `python mcpsc/main.py`, initializing it and tearing it down for
+every tool call (and listing tools for every new browser tab) meant a
+process start per call. Instead app.py creates one MCPConnection with
+st.cache_resource:
+
+- A daemon thread runs an asyncio loop with a supervisor task that owns
+  the stdio subprocess and the ClientSession (anyio contexts must be
+  entered and exited by the same task).
+- Streamlit script threads submit calls to that loop and block on the
+  result; one session serves concurrent calls (JSON-RPC request ids).
+- Tool schemas are listed once per connection and kept in OpenAI format.
+- A call that fails on the transport (server exited, pipe closed) marks
+  the session broken; the supervisor closes it and reconnects, and the
+  call is retried once. A timeout or a tool error (McpError, e.g. bad
+  arguments) fails only that call and leaves the session up.
+"""
+import asyncio
+import os
+import sys
+import threading
+
+import anyio
+from mcp.client.session import ClientSession
+from mcp.client.stdio import StdioServerParameters, stdio_client
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+
+CONNECT_TIMEOUT = 30
+CALL_TIMEOUT = 30
+RECONNECT_DELAY = 1.0
+
+# The session itself is gone (as opposed to one call failing)
+TRANSPORT_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream,
+                    ConnectionError, BrokenPipeError)
+
+
+def is_transport_error(error):
+    if isinstance(error, McpError):
+        return error.error.code == CONNECTION_CLOSED
+    return isinstance(error, TRANSPORT_ERRORS)
+
+
+def to_openai_tools(mcp_tools):
+    """MCP tool schemas -> OpenAI function tools"""
+    return [
+        {
+            "type": "function",
+            "function": {
+                "name": tool.name,
+                "description": tool.description,
+                "parameters": tool.inputSchema,
+            },
+        }
+        for tool in mcp_tools.tools
+    ]
+
+
+class MCPConnection:
+    """Long-lived MCP client session on a background event loop"""
+
+    def __init__(self, server_path, command=None):
+        self.params = StdioServerParameters(command=command or sys.executable, args=[server_path],
+                                            env=dict(os.environ))
+        self.tools = []
+        self.connects = 0
+        self.calls = 0
+        self.failures = 0
+        self.last_error = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='mcp-session', daemon=True)
+        self._session = None
+        self._ready = None
+        self._broken = None
+        self._supervisor = None
+
+    # --- lifecycle (runs on the loop) ---
+
+    def start(self):
+        self._thread.start()
+        self._submit(self._start_supervisor()).result()
+        self.wait_ready(CONNECT_TIMEOUT)
+        return self
+
+    async def _start_supervisor(self):
+        self._ready = asyncio.Event()
+        self._broken = asyncio.Event()
+        self._supervisor = asyncio.create_task(self._supervise())
+
+    async def _supervise(self):
+        """Keep one session open; reopen it whenever a caller marks it broken"""
+        while True:
+            try:
+                async with stdio_client(self.params) as (read, write):
+                    async with ClientSession(read, write) as session:
+                        await asyncio.wait_for(session.initialize(), CONNECT_TIMEOUT)
+                        self.tools = to_openai_tools(await session.list_tools())
+                        self._session = session
+                        self.connects += 1
+                        self._broken.clear()
+                        self._ready.set()
+                        await self._broken.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = repr(e)
+            finally:
+                self._ready.clear()
+                self._session = None
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    def close(self):
+        if self._supervisor is not None:
+            self._loop.call_soon_threadsafe(self._supervisor.cancel)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    # --- calls ---
+
+    def _submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def wait_ready(self, timeout=CONNECT_TIMEOUT):
+        """Block until the session is up (True) or timeout (False)"""
+        async def ready():
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+                return True
+            except asyncio.TimeoutError:
+                return False
+        return self._submit(ready()).result()
+
+    async def _call(self, name, args):
+        for attempt in range(2):
+            try:
+                await asyncio.wait_for(self._ready.wait(), CONNECT_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise ConnectionError(f"MCP server unavailable: {self.last_error}") from None
+            session = self._session
+            try:
+                result = await asyncio.wait_for(session.call_tool(name, args), CALL_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.failures += 1
+                self.last_error = f"{name} timed out after {CALL_TIMEOUT}s"
+                raise                   # only this call: the session keeps serving the others
+            except Exception as e:
+                self.failures += 1
+                self.last_error = repr(e)
+                if not is_transport_error(e):
+                    raise               # tool-level error: the session is fine
+                if self._session is session:
+                    self._broken.set()  # supervisor reconnects
+                    self._ready.clear()
+                if attempt:
+                    raise
+            else:
+                self.calls += 1
+                return result.content[0].text if result.content else ""
+
+    async def _call_many(self, calls):
+        return await asyncio.gather(*(self._call(name, args) for name, args in calls), return_exceptions=True)
+
+    def call_tool(self, name, args):
+        return self._submit(self._call(name, args)).result()
+
+    def call_tools(self, calls):
+        """Run [(name, args), ...] concurrently; each result is text or the exception it raised"""
+        return self._submit(self._call_many(calls)).result()
+
+    def stats(self):
+        return {
+            'connected': self._session is not None,
+            'connects': self.connects,
+            'calls': self.calls,
+            'failures': self.failures,
+            'tools': len(self.tools),
+            'last_error': self.last_error,
+        }
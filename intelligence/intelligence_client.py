@@ -1,8 +1,11 @@
 import asyncio
 import logging
+from .intent_router import intent_router as shared_intent_router
 from .openai_provider import OpenAIProvider
 from .mcp_provider import MCPProvider
 from .safe_provider import SafeProvider
+from app.config import Config
+from app.tracing import span
 
 # Set up logging to see what's happening in Railway logs
 logging.basicConfig(level=logging.INFO)
@@ -22,9 +25,12 @@ class IntelligenceClient:
         self,
         openai_api_key=None,
         mcp_server_path=None,
+        mcp_server_url=None,
+        mcp_pool_size=2,
         primary="mcp",  # Default to MCP so we use tools!
         timeout=10,     # Increased to 10s because tool calls take time
         retries=1,
+        intent_router=None,
     ):
         self.primary = primary
         self.timeout = timeout
@@ -33,15 +39,20 @@ class IntelligenceClient:
         # Initialize Providers
         self.openai = OpenAIProvider(openai_api_key) if openai_api_key else None
         
-        # Only initialize MCP if we have a path
-        if mcp_server_path:
-            self.mcp = MCPProvider(mcp_server_path)
+        # Only initialize MCP if we have a path (or a shared MCP service to connect to)
+        if mcp_server_path or mcp_server_url:
+            self.mcp = MCPProvider(mcp_server_path, mcp_server_url, mcp_pool_size)
         else:
             self.mcp = None
             logger.warning("⚠️ No MCP Path provided. Tools will be disabled.")
 
         self.safe = SafeProvider()
 
+        # Deterministic fast path for trivially recognizable intents
+        if intent_router is None and Config.INTENT_ROUTER_ENABLED:
+            intent_router = shared_intent_router
+        self.router = intent_router or None
+
     async def process_user_message(self, user_text, customer_context=None):
         """
         Helper to convert a simple string into the message format 
@@ -57,8 +68,15 @@ class IntelligenceClient:
 
     async def ask(self, messages, customer_context=None):
         """
-        The main logic loop: Try Primary -> Try Secondary -> Fallback
+        The main logic loop: Fast path -> Try Primary -> Try Secondary -> Fallback
         """
+        # 0. Obvious intents (goodbye, balance, outage, emergency, scam) skip the LLM
+        if self.router:
+            with span('intent_router'):
+                routed = await self.router.route(messages, customer_context)
+            if routed:
+                return routed.answer
+
         providers = []
 
         # 1. Determine Order
@@ -78,10 +96,11 @@ class IntelligenceClient:
                     logger.info(f"🧠 Thinking with {provider.name} (Attempt {attempt+1})...")
 
                     # Run with timeout protection
-                    response = await asyncio.wait_for(
-                        provider.ask(messages, customer_context),
-                        timeout=self.timeout,
-                    )
+                    with span(f'provider.{provider.name}'):
+                        response = await asyncio.wait_for(
+                            provider.ask(messages, customer_context),
+                            timeout=self.timeout,
+                        )
                     
                     if response:
                         return response
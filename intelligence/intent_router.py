@@ -0,0 +1,516 @@
+"""
+Deterministic fast-path intent router
+
+Some turns don't need an LLM to understand them: "bye", "what's my
+balance", "is there an outage", emergencies and scam reports. The router
+matches every multilingual trigger phrase in one pass (Aho-Corasick
+automaton compiled once per process). A confident single intent is
+answered straight from a tool call or a template, skipping the GPT-4o
+tool-selection round entirely. Anything else falls through to the LLM.
+
+Every intent needs the turn to be mostly trigger/filler words, and a
+negated trigger ("not an emergency", "acil değil") doesn't count. Tune
+with Config.INTENT_ROUTER_THRESHOLD (0-1, default 0.75); disable with
+INTENT_ROUTER_ENABLED=false.
+"""
+import asyncio
+import re
+from collections import Counter, deque, namedtuple
+
+from app.config import Config
+from app.logger import get_logger
+from app.tracing import span
+
+log = get_logger(__name__)
+
+GOODBYE = 'goodbye'
+BALANCE = 'balance'
+OUTAGE = 'outage'
+EMERGENCY = 'emergency'
+SCAM = 'scam'
+
+DEFAULT_THRESHOLD = Config.INTENT_ROUTER_THRESHOLD
+
+# Trigger phrases: (phrase, weight). Phrases match whole words; a trailing
+# '*' matches a word prefix, for Turkish/German/Russian inflections
+# ("bakiye*" covers bakiyem, bakiyemi, bakiyeniz).
+INTENT_PATTERNS = {
+    GOODBYE: {
+        'EN': [('goodbye', .95), ('bye', .95), ('bye bye', .95), ('thank you', .8), ('thanks', .8),
+               ('that s all', .9), ('that is all', .9), ('have a nice day', .9)],
+        'TR': [('hoşça kal*', .95), ('hoşçakal*', .95), ('görüşürüz', .95), ('güle güle', .95),
+               ('teşekkür*', .8), ('sağ ol*', .8), ('bu kadar', .85), ('iyi günler', .85)],
+        'DE': [('tschüss', .95), ('auf wiedersehen', .95), ('danke', .8), ('vielen dank', .85),
+               ('das war s', .9), ('das ist alles', .9)],
+        'RU': [('до свидания', .95), ('пока', .9), ('спасибо', .8), ('всего доброго', .95)],
+        'AR': [('وداعا', .95), ('مع السلامة', .95), ('شكرا', .8)],
+    },
+    BALANCE: {
+        'EN': [('balance', .75), ('my balance', .9), ('check my balance', .95), ('data left', .9),
+               ('how much data', .9), ('remaining data', .9), ('how many minutes', .85),
+               ('how many gigabytes', .9), ('gb left', .9)],
+        'TR': [('bakiye*', .9), ('kalan internet*', .9), ('ne kadar internet*', .9),
+               ('kaç gb', .9), ('kalan dakika*', .85), ('ne kadar kaldı', .8)],
+        'DE': [('guthaben', .9), ('restguthaben', .95), ('datenvolumen', .8), ('wie viel daten*', .9),
+               ('wie viele minuten', .85)],
+        'RU': [('баланс*', .9), ('сколько трафик*', .9), ('сколько осталось', .85), ('остаток', .85)],
+        'AR': [('رصيد*', .9), ('كم بقي', .85), ('الرصيد', .9)],
+    },
+    OUTAGE: {
+        'EN': [('outage', .9), ('network down', .9), ('network is down', .9), ('network problem', .85),
+               ('no signal', .85), ('no service', .85), ('network issue*', .85)],
+        'TR': [('arıza*', .85), ('şebeke yok', .9), ('çekmiyor', .85), ('şebeke sorun*', .9),
+               ('kesinti*', .9)],
+        'DE': [('störung*', .9), ('netzausfall', .95), ('kein netz', .9), ('kein empfang', .85),
+               ('netz ist weg', .9)],
+        'RU': [('авари*', .85), ('нет сети', .9), ('сеть не работает', .9), ('нет связи', .9)],
+        'AR': [('عطل', .85), ('لا توجد شبكة', .9), ('انقطاع', .9), ('لا يوجد إرسال', .85)],
+    },
+    EMERGENCY: {
+        'EN': [('emergency', .95), ('police', .95), ('ambulance', .95), ('fire brigade', .95),
+               ('i need a doctor', .95), ('help me please', .7)],
+        'TR': [('acil', .95), ('polis', .95), ('ambulans', .95), ('itfaiye', .95), ('imdat', .95)],
+        'DE': [('notfall', .95), ('polizei', .95), ('krankenwagen', .95), ('feuerwehr', .95), ('hilfe', .6)],
+        'RU': [('экстренн*', .95), ('полици*', .95), ('скорая', .95), ('скорую', .95), ('пожар*', .9)],
+        'AR': [('طوارئ', .95), ('الشرطة', .95), ('شرطة', .95), ('إسعاف', .95), ('الإسعاف', .95)],
+    },
+    SCAM: {
+        'EN': [('scam', .95), ('scammed', .95), ('ripped off', .95), ('fraud', .9)],
+        'TR': [('dolandır*', .95), ('kazık*', .9), ('sahte', .85)],
+        'DE': [('betrug', .95), ('betrogen', .95), ('abzocke', .95), ('abgezockt', .95)],
+        'RU': [('мошенн*', .95), ('обман*', .9), ('развод', .85)],
+        'AR': [('احتيال', .95), ('نصب', .9), ('خدعني', .9)],
+    },
+}
+
+# Words that don't change what the turn is about (count towards coverage)
+FILLER_WORDS = {
+    'EN': 'hi hello hey please can could you tell me i want to know the what s is my how much many '
+          'a an do have left there any right now ok okay yes so just check on in',
+    'TR': 'merhaba selam lütfen benim ne kadar var mı mi acaba bir öğrenmek istiyorum şu anda '
+          'evet tamam hocam abla abi bana söyler misiniz da de',
+    'DE': 'hallo bitte können sie mir sagen ich möchte wissen wie viel mein meine ist gibt es '
+          'habe noch ja gerade jetzt eine einen',
+    'RU': 'здравствуйте привет пожалуйста скажите мне мой моя у меня какой какая сейчас есть ли да',
+    'AR': 'مرحبا من فضلك ما هو هل يوجد أريد أن أعرف كم لي',
+}
+
+# A trigger right after one of these (articles skipped) or right before
+# NEGATE_AFTER is negated: "there is no emergency", "acil değil"
+NEGATE_BEFORE = {'not', 'no', 'never', 'isn', 'nicht', 'kein', 'keine', 'keinen', 'не', 'нет',
+                 'ليس', 'ليست', 'لا'}
+NEGATE_AFTER = {'değil', 'degil'}
+NEGATION_SKIP = {'a', 'an', 'the', 't', 's', 'really', 'ein', 'eine'}
+
+# Scam heuristic from the system prompt: >1000 TRY for a SIM card. Only
+# amounts next to a currency word count; 7+ digits is a phone number
+_SIM_WORDS = re.compile(r'\b(sims?|simkarte|hattı?|сим|شريحة)\b')
+_PRICE = re.compile(r'(?<![\d.,])(\d[\d.,]*)\s*(?:tl|try|lira\w*|лир\w*|ليرة)\b'
+                    r'|\btl\s*(\d[\d.,]*)')
+SCAM_PRICE_TRY = 1000
+MAX_PRICE_DIGITS = 6
+# Words of a "paid X for a SIM" sentence, covered when the price heuristic fires
+SCAM_PRICE_WORDS = {'sim', 'sims', 'simkarte', 'hat', 'hattı', 'сим', 'شريحة', 'tl', 'try', 'lira',
+                    'card', 'kart', 'karte', 'карта', 'карту', 'paid', 'pay', 'bought', 'for',
+                    'ödedim', 'aldım', 'için', 'bezahlt', 'gekauft', 'für', 'заплатил', 'купил',
+                    'за', 'دفعت', 'اشتريت'}
+
+# Places the outage answer can be narrowed to: normalized prefix -> API region
+REGIONS = {
+    'istanbul': 'Istanbul', 'стамбул': 'Istanbul', 'اسطنبول': 'Istanbul', 'إسطنبول': 'Istanbul',
+    'ankara': 'Ankara', 'анкар': 'Ankara', 'أنقرة': 'Ankara',
+    'izmir': 'Izmir', 'измир': 'Izmir', 'إزمير': 'Izmir',
+    'antalya': 'Antalya', 'анталь': 'Antalya', 'أنطاليا': 'Antalya',
+    'bodrum': 'Bodrum', 'бодрум': 'Bodrum', 'بودروم': 'Bodrum',
+    'alanya': 'Alanya', 'аланья': 'Alanya',
+    'fethiye': 'Fethiye', 'marmaris': 'Marmaris', 'kemer': 'Kemer', 'bursa': 'Bursa',
+    'trabzon': 'Trabzon', 'kapadokya': 'Cappadocia', 'cappadocia': 'Cappadocia',
+    'kappadokien': 'Cappadocia', 'каппадоки': 'Cappadocia',
+}
+# A place we don't know ("in Kaş", "Sochi'de", "в Сочи"): leave it to the LLM
+_OTHER_PLACE = re.compile(r"\b(?:in|at|near|im|bei|в|во)\s+[A-ZÇĞİÖŞÜÄА-ЯЁ]\w+"
+                          r"|\b[A-ZÇĞİÖŞÜ]\w+['’](?:da|de|ta|te)\b")
+OPERATIONAL = {'operational', 'ok', 'normal', 'up'}
+
+TEMPLATES = {
+    GOODBYE: {
+        'EN': "You're welcome! Have a wonderful day.",
+        'TR': "Rica ederim! İyi günler dilerim.",
+        'DE': "Gern geschehen! Einen schönen Tag noch.",
+        'RU': "Пожалуйста! Хорошего дня.",
+        'AR': "على الرحب والسعة! أتمنى لك يوما سعيدا.",
+    },
+    EMERGENCY: {
+        'EN': "If this is an emergency, please hang up and dial 112 immediately. 112 works from any phone, even without credit.",
+        'TR': "Acil bir durumsa lütfen hemen 112'yi arayın. 112 her telefondan, bakiyeniz olmasa bile ücretsizdir.",
+        'DE': "Wenn es ein Notfall ist, wählen Sie bitte sofort die 112. Die 112 funktioniert von jedem Telefon, auch ohne Guthaben.",
+        'RU': "Если это экстренная ситуация, немедленно звоните 112. Номер 112 работает с любого телефона, даже без баланса.",
+        'AR': "إذا كانت هذه حالة طوارئ، يرجى الاتصال فورا بالرقم 112. يعمل 112 من أي هاتف حتى بدون رصيد.",
+    },
+    SCAM: {
+        'EN': "That sounds like it may be a scam. Official Turkcell tourist SIMs cost around 400 to 600 TRY. Please buy only from official Turkcell stores, and keep your receipt.",
+        'TR': "Bu bir dolandırıcılık olabilir. Resmi Turkcell turist hatları yaklaşık 400-600 TL'dir. Lütfen yalnızca resmi Turkcell mağazalarından alın ve fişinizi saklayın.",
+        'DE': "Das klingt nach Betrug. Offizielle Turkcell-Touristen-SIMs kosten etwa 400 bis 600 TRY. Bitte kaufen Sie nur in offiziellen Turkcell-Shops und bewahren Sie den Beleg auf.",
+        'RU': "Похоже на мошенничество. Официальные туристические SIM-карты Turkcell стоят около 400–600 лир. Покупайте только в официальных магазинах Turkcell и сохраните чек.",
+        'AR': "يبدو أن هذا قد يكون احتيالا. تكلف شرائح Turkcell السياحية الرسمية حوالي 400 إلى 600 ليرة. يرجى الشراء فقط من متاجر Turkcell الرسمية والاحتفاظ بالإيصال.",
+    },
+    BALANCE: {
+        'EN': "You have {data} of data, {minutes} minutes and {sms} SMS left.",
+        'TR': "{data} internetiniz, {minutes} dakikanız ve {sms} SMS'iniz kaldı.",
+        'DE': "Sie haben noch {data} Daten, {minutes} Minuten und {sms} SMS.",
+        'RU': "У вас осталось {data} интернета, {minutes} минут и {sms} SMS.",
+        'AR': "لديك {data} من البيانات و{minutes} دقيقة و{sms} رسالة متبقية.",
+    },
+    'outage_none': {
+        'EN': "There are no reported network issues right now. If you still have no signal, please restart your phone and check that mobile data is on.",
+        'TR': "Şu anda bildirilen bir şebeke sorunu yok. Hâlâ çekmiyorsa lütfen telefonunuzu yeniden başlatın ve mobil verinin açık olduğunu kontrol edin.",
+        'DE': "Derzeit sind keine Netzstörungen gemeldet. Wenn Sie weiterhin keinen Empfang haben, starten Sie bitte Ihr Telefon neu und prüfen Sie, ob mobile Daten aktiviert sind.",
+        'RU': "Сейчас сбоев в сети не зафиксировано. Если связи по-прежнему нет, перезагрузите телефон и проверьте, что мобильные данные включены.",
+        'AR': "لا توجد أعطال معروفة في الشبكة حاليا. إذا استمرت المشكلة، يرجى إعادة تشغيل هاتفك والتأكد من تفعيل بيانات الجوال.",
+    },
+    'outage_known': {
+        'EN': "Yes, there is a known network issue in {regions}. Our teams are already working on it.",
+        'TR': "Evet, {regions} bölgesinde bilinen bir şebeke sorunu var. Ekiplerimiz üzerinde çalışıyor.",
+        'DE': "Ja, es gibt eine bekannte Netzstörung in {regions}. Unsere Teams arbeiten bereits daran.",
+        'RU': "Да, в регионе {regions} известны проблемы с сетью. Наши специалисты уже работают над этим.",
+        'AR': "نعم، هناك عطل معروف في الشبكة في {regions}. فرقنا تعمل على إصلاحه.",
+    },
+    'outage_region_none': {
+        'EN': "There are no reported network issues in {region} right now. If you still have no signal, please restart your phone and check that mobile data is on.",
+        'TR': "Şu anda {region} bölgesinde bildirilen bir şebeke sorunu yok. Hâlâ çekmiyorsa lütfen telefonunuzu yeniden başlatın ve mobil verinin açık olduğunu kontrol edin.",
+        'DE': "Derzeit sind in {region} keine Netzstörungen gemeldet. Wenn Sie weiterhin keinen Empfang haben, starten Sie bitte Ihr Telefon neu und prüfen Sie, ob mobile Daten aktiviert sind.",
+        'RU': "Сейчас сбоев в сети в регионе {region} не зафиксировано. Если связи по-прежнему нет, перезагрузите телефон и проверьте, что мобильные данные включены.",
+        'AR': "لا توجد أعطال معروفة في الشبكة في {region} حاليا. إذا استمرت المشكلة، يرجى إعادة تشغيل هاتفك والتأكد من تفعيل بيانات الجوال.",
+    },
+}
+
+RoutedAnswer = namedtuple('RoutedAnswer', ['intent', 'confidence', 'language', 'answer', 'tool'])
+IntentMatch = namedtuple('IntentMatch', ['intent', 'confidence', 'language'])
+
+
+def normalize(text):
+    """Lowercase, fold Turkish İ, turn punctuation into spaces, pad with spaces"""
+    text = text.replace('İ', 'i').lower()
+    text = re.sub(r"[^\w]+", ' ', text)
+    return f" {' '.join(text.split())} "
+
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher: every pattern found in one left-to-right pass
+
+    add(pattern, payload) then build(); search(text) yields (end_index, payload).
+    """
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+    def add(self, pattern, payload):
+        node = 0
+        for char in pattern:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(payload)
+
+    def build(self):
+        """Breadth-first failure links (outputs are merged along them)"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def search(self, text):
+        node = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for i, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for payload in out[node]:
+                yield i, payload
+
+
+class IntentRouter:
+    """
+    Route a turn to a tool or template when one intent is unambiguous
+
+    classify(text)                     -> IntentMatch or None (no side effects)
+    route(messages, customer_context)  -> RoutedAnswer or None (fall through to the LLM)
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, patterns=None, tools=None):
+        self.threshold = threshold
+        self.tools = tools
+        self.stats = Counter()
+        self._compile(patterns or INTENT_PATTERNS)
+
+    def _compile(self, patterns):
+        self._matcher = AhoCorasick()
+        for intent, by_language in patterns.items():
+            for language, phrases in by_language.items():
+                for phrase, weight in phrases:
+                    prefix = phrase.endswith('*')
+                    words = normalize(phrase.rstrip('*')).strip()
+                    # Whole words are matched by padding with spaces; prefixes only on the left
+                    key = f" {words}" if prefix else f" {words} "
+                    self._matcher.add(key, (intent, language, weight, len(key)))
+        self._matcher.build()
+        self._filler = {w for words in FILLER_WORDS.values() for w in normalize(words).split()}
+
+    # ---------- Matching ----------
+
+    def classify(self, text):
+        """Best confident intent for one utterance, or None"""
+        if not text:
+            return None
+
+        normalized = normalize(text)
+        spans = [(m.start(), m.group()) for m in re.finditer(r'\S+', normalized)]
+        if not spans:
+            return None
+        words = [word for _, word in spans]
+        word_at = [-1] * len(normalized)        # character -> word index
+        for index, (start, word) in enumerate(spans):
+            word_at[start:start + len(word)] = [index] * len(word)
+
+        # Collect matches: per intent, combined weight and the words they cover
+        evidence = {}
+        covered = [False] * len(words)
+        for end, (intent, language, weight, length) in self._matcher.search(normalized):
+            first = word_at[end - length + 2]
+            last = word_at[end] if word_at[end] >= 0 else word_at[end - 1]
+            if _negated(words, first, last):
+                continue
+            covered[first:last + 1] = [True] * (last - first + 1)
+            combined, languages = evidence.get(intent, (0.0, Counter()))
+            evidence[intent] = (1 - (1 - combined) * (1 - weight), languages)
+            languages[language] += weight
+
+        scam_price = self._scam_price(text)
+        if scam_price:
+            combined, languages = evidence.get(SCAM, (0.0, Counter()))
+            evidence[SCAM] = (max(combined, .9), languages)
+
+        if not evidence:
+            return None
+
+        # Coverage: share of words that are either matched or filler. A
+        # long question that merely mentions "balance" (or "police") goes
+        # to the LLM.
+        explained = sum(
+            covered[i] or word in self._filler or word.isdigit()
+            or (scam_price and word in SCAM_PRICE_WORDS) or _region(word) is not None
+            for i, word in enumerate(words)
+        )
+        coverage = explained / len(words)
+
+        candidates = []
+        for intent, (combined, languages) in evidence.items():
+            factor = 0.5 + 0.5 * coverage
+            language = languages.most_common(1)[0][0] if languages else None
+            candidates.append(IntentMatch(intent, round(combined * factor, 3), language))
+
+        confident = [c for c in candidates if c.confidence >= self.threshold]
+        # "Call the police about a fraud" reports a scam, it is not a call for
+        # help: with both kinds of trigger, answer as a scam or leave it to the LLM
+        if EMERGENCY in evidence and SCAM in evidence:
+            return next((c for c in confident if c.intent == SCAM), None)
+        # Safety first: an emergency mention always wins
+        for match in confident:
+            if match.intent == EMERGENCY:
+                return match
+        # "Thanks, what's my balance?" is a balance question, not a goodbye
+        if len(confident) > 1:
+            confident = [c for c in confident if c.intent != GOODBYE]
+        if len(confident) == 1:
+            return confident[0]
+        return None
+
+    @staticmethod
+    def _scam_price(text):
+        """True when the turn mentions a SIM together with a price above SCAM_PRICE_TRY"""
+        text = text.replace('İ', 'i').lower().replace('₺', ' tl ')
+        if not _SIM_WORDS.search(text):
+            return False
+        for match in _PRICE.finditer(text):
+            amount = (match.group(1) or match.group(2)).rstrip('.,')
+            whole = re.split(r'[.,]\d{1,2}$', amount)[0]
+            digits = re.sub(r'\D', '', whole)
+            if not digits or len(digits) > MAX_PRICE_DIGITS:
+                continue
+            if int(digits) > SCAM_PRICE_TRY:
+                return True
+        return False
+
+    # ---------- Routing ----------
+
+    async def route(self, messages, customer_context=None):
+        """Answer the last user message directly, or None to use the LLM"""
+        text = _last_user_text(messages)
+        if not text or text.startswith('[SYSTEM'):
+            return None
+
+        self.stats['turns'] += 1
+        match = self.classify(text)
+        if match is None:
+            self.stats['fallthrough'] += 1
+            return None
+
+        context = customer_context or {}
+        language = match.language or context.get('language') or 'EN'
+
+        try:
+            answer, tool = await self._answer(match.intent, language, context, text)
+        except Exception as e:
+            log.warning("⚠️ Intent router tool failed", intent=match.intent, error=str(e))
+            answer, tool = None, None
+
+        if not answer:
+            self.stats['tool_fallthrough'] += 1
+            return None
+
+        self.stats['routed'] += 1
+        self.stats[f'intent:{match.intent}'] += 1
+        log.info("⚡ Intent router answered without LLM", intent=match.intent,
+                 confidence=round(match.confidence, 2), language=language, hit_rate=round(self.hit_rate(), 2))
+        return RoutedAnswer(match.intent, match.confidence, language, answer, tool)
+
+    async def _answer(self, intent, language, context, text=''):
+        """(answer text, tool name) for a confident intent; None answer = fall through"""
+        if intent in (GOODBYE, EMERGENCY, SCAM):
+            return _template(intent, language), None
+
+        tools = self._tools()
+        if intent == BALANCE:
+            phone = context.get('phone')
+            if not phone:
+                return None, None
+            with span('tool.get_balance_by_phone'):
+                balance = await asyncio.to_thread(tools['get_balance_by_phone'], phone)
+            return _format_balance(balance, language), 'get_balance_by_phone'
+
+        if intent == OUTAGE:
+            region = _region(text)
+            if region:
+                with span('tool.get_network_status_by_region'):
+                    status = await asyncio.to_thread(tools['get_network_status_by_region'], region)
+                if status is None:
+                    return None, None
+                issues = [i for i in status if isinstance(i, dict)
+                          and str(i.get('status', '')).lower() not in OPERATIONAL]
+                key = 'outage_known' if issues else 'outage_region_none'
+                return (_template(key, language).format(regions=region, region=region),
+                        'get_network_status_by_region')
+            if _OTHER_PLACE.search(text):
+                return None, None       # a place we can't look up: the LLM can
+            with span('tool.get_network_status'):
+                issues = await asyncio.to_thread(tools['get_network_status'])
+            if issues is None:
+                return None, None
+            regions = sorted({i.get('region') for i in issues if isinstance(i, dict) and i.get('region')})
+            if not issues:
+                return _template('outage_none', language), 'get_network_status'
+            if not regions:
+                return None, None
+            return _template('outage_known', language).format(regions=', '.join(regions[:3])), 'get_network_status'
+
+        return None, None
+
+    def _tools(self):
+        if self.tools is None:
+            # Imported lazily: the intelligence layer stays usable without the REST client
+            from app.database import get_balance_by_phone, get_network_status, get_network_status_by_region
+            from app.prefetch import BALANCE as PREFETCHED_BALANCE, prefetched
+            self.tools = {
+                # Served from the arrival-time snapshot while it is fresh
+                'get_balance_by_phone': lambda phone: prefetched(
+                    PREFETCHED_BALANCE, phone, get_balance_by_phone, phone, wait=2.0),
+                'get_network_status': get_network_status,
+                'get_network_status_by_region': get_network_status_by_region,
+            }
+        return self.tools
+
+    # ---------- Reporting ----------
+
+    def hit_rate(self):
+        turns = self.stats['turns']
+        return self.stats['routed'] / turns if turns else 0.0
+
+    def report(self):
+        """Counters for logs / dashboards"""
+        return {
+            'turns': self.stats['turns'],
+            'routed': self.stats['routed'],
+            'hit_rate': round(self.hit_rate(), 3),
+            'fallthrough': self.stats['fallthrough'],
+            'tool_fallthrough': self.stats['tool_fallthrough'],
+            'by_intent': {k.split(':', 1)[1]: v for k, v in self.stats.items() if k.startswith('intent:')},
+            'threshold': self.threshold,
+        }
+
+
+def _last_user_text(messages):
+    for message in reversed(messages or []):
+        if isinstance(message, dict) and message.get('role') == 'user':
+            return (message.get('content') or '').strip()
+    return None
+
+
+def _negated(words, first, last):
+    """Is the trigger spanning words[first..last] negated ("no emergency", "acil değil")?"""
+    before = [w for w in words[max(0, first - 4):first] if w not in NEGATION_SKIP][-2:]
+    if any(w in NEGATE_BEFORE for w in before):
+        return True
+    return last + 1 < len(words) and words[last + 1] in NEGATE_AFTER
+
+
+def _region(text):
+    """The known region the turn asks about, or None"""
+    for word in normalize(text).split():
+        for prefix, region in REGIONS.items():  # prefix: antalyada, анталье
+            if word.startswith(prefix):
+                return region
+    return None
+
+
+def _template(key, language):
+    templates = TEMPLATES[key]
+    return templates.get(language, templates['EN'])
+
+
+def _format_balance(balance, language):
+    """Spoken balance summary, or None if the API gave us nothing usable"""
+    if isinstance(balance, dict):
+        balance = balance.get('data') or balance
+    if isinstance(balance, list):
+        balance = balance[0] if balance else None
+    if not isinstance(balance, dict) or 'data_remaining_mb' not in balance:
+        return None
+
+    data_mb = balance.get('data_remaining_mb') or 0
+    data = f"{data_mb / 1024:.1f} GB" if data_mb >= 1024 else f"{data_mb:.0f} MB"
+    return _template(BALANCE, language).format(
+        data=data,
+        minutes=balance.get('voice_remaining_min', 0),
+        sms=balance.get('sms_remaining', 0),
+    )
+
+
+# Process-wide instance: the automaton is compiled once and hit-rate stats
+# accumulate across requests (main.py builds an IntelligenceClient per message)
+intent_router = IntentRouter()
@@ -0,0 +1,265 @@
+"""
+Pooled client for a shared, long-running mcpsc service (MCP_SERVER_URL)
+
+Over stdio, every turn of every gunicorn worker spawned its own mcpsc
+process: interpreter start, tool registration, a cold HTTP pool and an
+empty response cache each time. With mcpsc running as one network
+service (MCP_TRANSPORT=streamable-http), each worker keeps an MCPPool:
+
+- `size` MCP sessions to the service, owned by supervisor tasks on one
+  background event loop (anyio contexts must be entered and exited by
+  the same task; turns run under their own asyncio.run() loops).
+- Calls are spread round-robin; one session also multiplexes concurrent
+  calls (JSON-RPC request ids).
+- The tool list is fetched once per connection, already in OpenAI format.
+- A call that fails on the transport (connection closed, session
+  terminated by a service restart) marks its session broken; the
+  supervisor reconnects it and the call is retried once on it. Tool
+  errors are raised as-is. A call that times out is not retried, but the
+  session is pinged and reconnected if the service stopped answering.
+  While the service is down, calls fail with ConnectionError after
+  CONNECT_TIMEOUT instead of queueing on a dead session.
+
+IntelligenceClient is built per request, so pools are process-wide:
+get_pool() returns the one for a URL.
+"""
+import asyncio
+import itertools
+import threading
+
+import anyio
+import httpx
+from mcp.client.session import ClientSession
+from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+
+from app.logger import get_logger
+
+log = get_logger(__name__)
+
+CONNECT_TIMEOUT = 10
+CALL_TIMEOUT = 30
+RECONNECT_DELAY = 1.0
+
+TRANSPORT_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream,
+                    httpx.TransportError, ConnectionError, BrokenPipeError)
+
+
+def is_transport_error(error):
+    """True when the session itself is gone (reconnect), False for tool-level errors"""
+    if isinstance(error, McpError):
+        # A restarted service no longer knows our session id: the client
+        # reports "Session terminated" rather than CONNECTION_CLOSED
+        return error.error.code == CONNECTION_CLOSED or error.error.message == 'Session terminated'
+    return isinstance(error, TRANSPORT_ERRORS)
+
+
+def to_openai_tools(mcp_tools):
+    """MCP tool schemas -> OpenAI function tools"""
+    return [{
+        "type": "function",
+        "function": {
+            "name": tool.name,
+            "description": tool.description,
+            "parameters": tool.inputSchema
+        }
+    } for tool in mcp_tools.tools]
+
+
+class _Slot:
+    """One pooled session and its supervisor state"""
+
+    def __init__(self, index):
+        self.index = index
+        self.session = None
+        self.ready = asyncio.Event()
+        self.broken = asyncio.Event()
+
+
+class MCPPool:
+    """A few long-lived sessions to the MCP service, shared by every turn of this process"""
+
+    def __init__(self, url, size=2):
+        self.url = url
+        self.size = max(1, size)
+        self.tools = []
+        self.connects = 0
+        self.calls = 0
+        self.failures = 0
+        self.last_error = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = None
+        self._slots = []
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+
+    # --- lifecycle (runs on the pool loop) ---
+
+    def start(self):
+        """Start connecting in the background (idempotent, does not wait)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop.run_forever, name='mcp-pool', daemon=True)
+                self._thread.start()
+                asyncio.run_coroutine_threadsafe(self._start_slots(), self._loop).result()
+                log.info("🔌 MCP pool started", url=self.url, size=self.size)
+        return self
+
+    async def _start_slots(self):
+        self._slots = [_Slot(i) for i in range(self.size)]
+        for slot in self._slots:
+            asyncio.create_task(self._supervise(slot))
+
+    def _transport(self):
+        if self.url.rstrip('/').endswith('/sse'):
+            return sse_client(self.url)
+        return streamablehttp_client(self.url)
+
+    async def _supervise(self, slot):
+        """Keep the slot's session open; reopen it whenever a caller marks it broken"""
+        while True:
+            try:
+                async with self._transport() as streams:
+                    read, write = streams[0], streams[1]
+                    async with ClientSession(read, write) as session:
+                        await asyncio.wait_for(session.initialize(), CONNECT_TIMEOUT)
+                        self.tools = to_openai_tools(await session.list_tools())
+                        slot.session = session
+                        self.connects += 1
+                        slot.broken.clear()
+                        slot.ready.set()
+                        await slot.broken.wait()
+                        continue        # reconnect right away
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = repr(e)
+                log.warning("⚠️  MCP pool connection failed", slot=slot.index, error=repr(e))
+            finally:
+                slot.ready.clear()
+                slot.session = None
+                slot.broken.set()       # in-flight calls on the old session give up
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    # --- calls (run on the pool loop, awaited from any loop) ---
+
+    async def _ready_slot(self):
+        """Next slot round-robin, preferring one that is connected"""
+        start = next(self._next)
+        ordered = [self._slots[(start + i) % self.size] for i in range(self.size)]
+        for slot in ordered:
+            if slot.ready.is_set():
+                return slot
+        waiters = {asyncio.ensure_future(slot.ready.wait()): slot for slot in ordered}
+        done, pending = await asyncio.wait(waiters, timeout=CONNECT_TIMEOUT, return_when=asyncio.FIRST_COMPLETED)
+        for waiter in pending:
+            waiter.cancel()
+        if not done:
+            raise ConnectionError(f"MCP service unavailable: {self.last_error}")
+        return waiters[done.pop()]
+
+    def _mark_broken(self, slot, session):
+        """Hand the slot back to its supervisor, unless it already reconnected"""
+        if slot.session is session:
+            slot.ready.clear()
+            slot.broken.set()
+
+    async def _probe(self, slot, session):
+        """After a call timed out: reconnect if the session no longer answers a ping"""
+        try:
+            await asyncio.wait_for(session.send_ping(), CONNECT_TIMEOUT)
+        except Exception as e:
+            self.last_error = f"ping failed: {e!r}"
+            self._mark_broken(slot, session)
+
+    async def _call_on(self, slot, session, name, args):
+        """session.call_tool, abandoned as soon as the slot loses that session"""
+        call = asyncio.ensure_future(session.call_tool(name, args))
+        lost = asyncio.ensure_future(slot.broken.wait())
+        try:
+            done, _ = await asyncio.wait({call, lost}, timeout=CALL_TIMEOUT, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            call.cancel()
+            lost.cancel()
+        if call in done:
+            return call.result()
+        if lost in done:
+            raise ConnectionError(f"MCP session lost: {self.last_error}")
+        raise asyncio.TimeoutError()
+
+    async def _call(self, name, args):
+        slot = await self._ready_slot()
+        for attempt in range(2):
+            if attempt or slot.session is None:
+                # Retry on the session that just reconnected: when the service
+                # restarts, every other pooled session is stale as well
+                try:
+                    await asyncio.wait_for(slot.ready.wait(), CONNECT_TIMEOUT)
+                except asyncio.TimeoutError:
+                    raise ConnectionError(f"MCP service unavailable: {self.last_error}") from None
+            session = slot.session
+            try:
+                result = await self._call_on(slot, session, name, args)
+            except asyncio.TimeoutError:
+                self.failures += 1
+                self.last_error = f"{name} timed out after {CALL_TIMEOUT}s"
+                asyncio.create_task(self._probe(slot, session))
+                raise                   # only this call: the session keeps serving the others
+            except Exception as e:
+                self.failures += 1
+                self.last_error = repr(e)
+                if not is_transport_error(e):
+                    raise               # tool-level error: the session is fine
+                self._mark_broken(slot, session)    # supervisor reconnects
+                if attempt:
+                    raise
+            else:
+                self.calls += 1
+                return result
+
+    async def _list_tools(self):
+        await self._ready_slot()
+        return self.tools
+
+    async def _run(self, coroutine):
+        self.start()
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, self._loop))
+
+    async def call_tool(self, name, args):
+        """The tool's CallToolResult (same as ClientSession.call_tool)"""
+        return await self._run(self._call(name, args))
+
+    async def list_tools(self):
+        """Tool schemas in OpenAI format (cached per connection)"""
+        return self.tools or await self._run(self._list_tools())
+
+    def stats(self):
+        return {
+            'url': self.url,
+            'size': self.size,
+            'connected': sum(1 for slot in self._slots if slot.session is not None),
+            'connects': self.connects,
+            'calls': self.calls,
+            'failures': self.failures,
+            'last_error': self.last_error,
+        }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(url, size=2):
+    """The process-wide pool for `url` (created on first use)"""
+    with _pools_lock:
+        if url not in _pools:
+            _pools[url] = MCPPool(url, size)
+        return _pools[url]
+
+
+def pool_stats():
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools] or None
@@ -4,6 +4,14 @@ import json
 from mcp.client.stdio import stdio_client, StdioServerParameters
 from mcp.client.session import ClientSession
 from openai import OpenAI
+from app.cassette import exchange, exchange_async, llm_request, encode_completion, decode_completion
+from app.logger import get_logger
+from app.tracing import span, start_span
+from intelligence.mcp_pool import get_pool, to_openai_tools
+from intelligence.model_router import model_router
+from intelligence.tool_projection import compact_tool_result
+
+log = get_logger(__name__)
 
 # --- THE CRITICAL FIX: The "Personality" ---
 # This tells the MCP Brain that it works for Turkcell and MUST use tools.
@@ -16,6 +24,7 @@ Your goal is to solve customer problems efficiently using real-time data.
 2. **Don't Guess:** If the user asks for ANY information that might be in a database (balances, package details, network status, store locations, prices), you **MUST** use a tool.
 3. **Be Proactive:** If a tool requires a phone number and you have it in the context, use it automatically.
 4. **Tool Variety:** Do not limit yourself. If you have tools for network checks, selling packages, or troubleshooting, use them when appropriate.
+5. **One Round:** For troubleshooting or account questions, call `get_customer_snapshot` once (customer, subscriptions, balance, device, network) instead of chaining individual lookups.
 
 ### 🎧 DUAL-CHANNEL FORMATTING (Text & Voice)
 Your output effectively serves two purposes: it is sent as text on WhatsApp OR spoken aloud via Text-to-Speech (TTS).
@@ -37,13 +46,20 @@ Your output effectively serves two purposes: it is sent as text on WhatsApp OR s
 class MCPProvider:
     name = "mcp"
 
-    def __init__(self, server_path):
+    def __init__(self, server_path, server_url=None, pool_size=2):
         self.server_path = server_path
         # We use a separate OpenAI client here to drive the decision making
         self.openai = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+        # Shared mcpsc service: pooled sessions instead of a process per turn
+        self.pool = get_pool(server_url, pool_size) if server_url else None
 
     async def ask(self, messages, customer_context=None):
-        print(f"🔌 MCP Provider: Connecting to {self.server_path}")
+        if self.pool:
+            with span('mcp.list_tools'):
+                openai_tools = await self.pool.list_tools()
+            return await self._converse(openai_tools, self.pool.call_tool, messages, customer_context)
+
+        log.debug("🔌 MCP Provider: Connecting", server=self.server_path)
         
         # 1. Setup Connection to the Tool Server
         # We use sys.executable to ensure we use the same Python environment
@@ -53,82 +69,119 @@ class MCPProvider:
             env=os.environ.copy()
         )
 
+        # Spawning the server process + handshake is its own stage
+        spawn = start_span('mcp.spawn')
         async with stdio_client(server_params) as (read, write):
             async with ClientSession(read, write) as session:
                 await session.initialize()
+                spawn.end()
 
                 # 2. Get Tools (The "Hands")
-                mcp_tools = await session.list_tools()
-                print(f"🛠️  MCP Tools Found: {[t.name for t in mcp_tools.tools]}")
+                with span('mcp.list_tools'):
+                    mcp_tools = await session.list_tools()
+                log.debug("🛠️  MCP Tools Found", count=len(mcp_tools.tools))
                 
                 # Convert to OpenAI Format
-                openai_tools = [{
-                    "type": "function",
-                    "function": {
-                        "name": tool.name,
-                        "description": tool.description,
-                        "parameters": tool.inputSchema
-                    }
-                } for tool in mcp_tools.tools]
-
-                # 3. Prepare the Prompt (The "Brain")
-                # We inject the System Prompt at the very start!
-                current_messages = [{"role": "system", "content": MCP_SYSTEM_PROMPT}]
+                openai_tools = to_openai_tools(mcp_tools)
+                return await self._converse(openai_tools, session.call_tool, messages, customer_context)
+
+    async def _converse(self, openai_tools, call_tool, messages, customer_context):
+        """Round 1, the tool calls it asks for (via `call_tool`), round 2"""
+        # 3. Prepare the Prompt (The "Brain")
+        # We inject the System Prompt at the very start!
+        current_messages = [{"role": "system", "content": MCP_SYSTEM_PROMPT}]
+        
+        # Add context if we have it (e.g., Name, Language)
+        if customer_context:
+            context_str = f"Customer Context: {json.dumps(customer_context)}"
+            current_messages.append({"role": "system", "content": context_str})
+        
+        # Add the user's actual conversation history
+        current_messages += messages
+
+        # 4. Ask OpenAI (Round 1)
+        log.debug("🧠 MCP Brain: Thinking...")
+        # (the model is picked per call by intelligence/model_router.py)
+        request = dict(
+            messages=current_messages,
+            tools=openai_tools,
+            tool_choice="auto"  # The System Prompt forces this to happen
+        )
+        with span('llm.round1'):
+            response = model_router.complete('tool_selection', request,
+                                             lambda r: self._complete('mcp.round1', r))
+
+        msg = response.choices[0].message
+        
+        # 5. DID IT DECIDE TO USE A TOOL?
+        if msg.tool_calls:
+            log.info("🚨 TOOL DETECTED", tools=[c.function.name for c in msg.tool_calls])
+            current_messages.append(msg) # Add the "intent" to history
+            tool_outputs = []
+
+            for tool_call in msg.tool_calls:
+                t_name = tool_call.function.name
+                t_args = json.loads(tool_call.function.arguments)
                 
-                # Add context if we have it (e.g., Name, Language)
-                if customer_context:
-                    context_str = f"Customer Context: {json.dumps(customer_context)}"
-                    current_messages.append({"role": "system", "content": context_str})
+                log.info("🏃 Executing Tool", tool=t_name)
+                log.verbose("🏃 Tool args", tool=t_name, args=t_args)
                 
-                # Add the user's actual conversation history
-                current_messages += messages
-
-                # 4. Ask OpenAI (Round 1)
-                print("🧠 MCP Brain: Thinking...")
-                response = self.openai.chat.completions.create(
-                    model="gpt-4o",
-                    messages=current_messages,
-                    tools=openai_tools,
-                    tool_choice="auto"  # The System Prompt forces this to happen
+                # --- EXECUTE THE TOOL ---
+                # This runs the code in mcpsc/main.py
+                with span(f'tool.{t_name}'):
+                    tool_output = await exchange_async(
+                        'tool', f"{t_name} {json.dumps(t_args, sort_keys=True)}",
+                        {'name': t_name, 'arguments': t_args},
+                        lambda: self._call_tool(call_tool, t_name, t_args),
+                    )
+                log.verbose("✅ Tool Result", tool=t_name, output=tool_output[:100])
+
+                # Only the fields the model needs, compactly (see tool_projection.py)
+                tool_output = compact_tool_result(t_name, tool_output)
+                tool_outputs.append(tool_output)
+
+                # Add the result to history so AI can read it
+                current_messages.append({
+                    "role": "tool",
+                    "tool_call_id": tool_call.id,
+                    "name": t_name,
+                    "content": tool_output
+                })
+
+            # 6. Ask OpenAI (Round 2) - Interpret the Data
+            log.debug("🧠 MCP Brain: Finalizing answer with tool data...")
+            with span('llm.round2'):
+                final_response = model_router.complete(
+                    'final', dict(messages=current_messages),
+                    lambda r: self._complete('mcp.round2', r),
+                    tool_results=tool_outputs,
                 )
+            return final_response.choices[0].message.content
+        
+        else:
+            log.debug("🤷 MCP Brain: Decided NOT to use tools.")
+            return msg.content
 
-                msg = response.choices[0].message
-                
-                # 5. DID IT DECIDE TO USE A TOOL?
-                if msg.tool_calls:
-                    print(f"🚨 TOOL DETECTED: The AI wants to use {len(msg.tool_calls)} tools!")
-                    current_messages.append(msg) # Add the "intent" to history
-
-                    for tool_call in msg.tool_calls:
-                        t_name = tool_call.function.name
-                        t_args = json.loads(tool_call.function.arguments)
-                        
-                        print(f"🏃 Executing Tool: {t_name} with args {t_args}")
-                        
-                        # --- EXECUTE THE TOOL ---
-                        # This runs the code in mcpsc/main.py
-                        result = await session.call_tool(t_name, t_args)
-                        
-                        # Get the text result
-                        tool_output = result.content[0].text
-                        print(f"✅ Tool Result: {tool_output[:100]}...") # Print first 100 chars
-
-                        # Add the result to history so AI can read it
-                        current_messages.append({
-                            "role": "tool",
-                            "tool_call_id": tool_call.id,
-                            "name": t_name,
-                            "content": tool_output
-                        })
-
-                    # 6. Ask OpenAI (Round 2) - Interpret the Data
-                    print("🧠 MCP Brain: Finalizing answer with tool data...")
-                    final_response = self.openai.chat.completions.create(
-                        model="gpt-4o",
-                        messages=current_messages
-                    )
-                    return final_response.choices[0].message.content
-                
-                else:
-                    print("🤷 MCP Brain: Decided NOT to use tools.")
-                    return msg.content
\ No newline at end of file
+    def _complete(self, key, request):
+        """chat.completions.create, recorded / replayed by app/cassette.py when active"""
+        return exchange(
+            'llm', key, llm_request(**request),
+            lambda: self.openai.chat.completions.create(**request),
+            encode_completion, decode_completion,
+        )
+
+    @staticmethod
+    async def _call_tool(call_tool, name, args):
+        """Run the tool on the MCP server (session or pool) and return its text result
+
+        FastMCP sends a list result as one content item per element; they
+        are joined back into a JSON array instead of keeping only the first.
+        """
+        result = await call_tool(name, args)
+        texts = [item.text for item in result.content if getattr(item, 'text', None) is not None]
+        if len(texts) == 1:
+            return texts[0]
+        try:
+            return json.dumps([json.loads(text) for text in texts], ensure_ascii=False)
+        except ValueError:
+            return "\n".join(texts)
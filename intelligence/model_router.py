@@ -0,0 +1,235 @@
+"""
+Latency-aware model routing: a fast model for easy calls, the strong one when needed
+
+Every completion used to go to gpt-4o: choosing tools, rephrasing a small
+tool result, and generating "Hello Ayşe, welcome to Turkcell". Providers
+now ask the router, per call type:
+
+    greeting        call-connected greeting                   -> fast
+    tool_selection  MCP round 1: which tool, which arguments  -> strong unless trivial
+    final           MCP round 2: phrase the tool results      -> fast unless results are large / many
+    chat            OpenAIProvider direct answer              -> by complexity
+
+- Complexity is a cheap 0..1 estimate from the conversation (length,
+  turns, several questions in one message, complaint/dispute wording)
+  and, for `final`, the number and size of tool results.
+- Voice calls lean fast (lower latency budget, short answers).
+- Latency-aware: when the strong model's recent p95 for this route is
+  over the channel's target (MODEL_LATENCY_TARGET_VOICE_MS / _CHAT_MS),
+  borderline calls go to the fast model.
+- Fallback escalation: a fast-model call that errors or comes back empty
+  is retried once on the strong model.
+
+Call type and channel come from the caller via routing(): a contextvar,
+like the trace and correlation ids, so it follows asyncio.run(). Latency
+per route, decisions and escalations are reported in /health.
+"""
+import contextvars
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+
+from app.config import Config
+from app.logger import get_logger
+
+log = get_logger(__name__)
+
+LATENCY_TARGETS_MS = {
+    'voice': Config.MODEL_LATENCY_TARGET_VOICE_MS,
+    'chat': Config.MODEL_LATENCY_TARGET_CHAT_MS,
+}
+
+# Complexity at or above which the strong model is used; voice leans fast
+THRESHOLDS = {
+    'greeting': None,           # always fast
+    'tool_selection': Config.MODEL_THRESHOLD_TOOL_SELECTION,
+    'final': Config.MODEL_THRESHOLD_FINAL,
+    'chat': Config.MODEL_THRESHOLD_CHAT,
+}
+VOICE_BIAS = 0.15
+# Calls this close above the threshold may go fast when the strong model is slow
+BORDERLINE = 0.2
+
+LATENCY_WINDOW = 200
+MIN_SAMPLES = 10
+
+# Wording that usually means a harder conversation (EN, TR, DE, RU, AR)
+HARD_MARKERS = re.compile(
+    r"complain|refund|dispute|overcharg|wrong|cancel|escalat|manager|lawyer|"
+    r"şikayet|iade|itiraz|yanlış|iptal|"
+    r"beschwerde|erstattung|falsch|kündig|"
+    r"жалоб|возврат|неправильн|отмен|"
+    r"شكوى|استرداد|خطأ|إلغاء",
+    re.IGNORECASE,
+)
+
+_hint = contextvars.ContextVar('model_routing_hint', default=None)
+
+
+@contextmanager
+def routing(call_type=None, channel=None):
+    """Tag the LLM calls made inside this block (e.g. routing('greeting', channel='voice'))"""
+    current = _hint.get() or {}
+    token = _hint.set({**current, **{k: v for k, v in
+                                     {'call_type': call_type, 'channel': channel}.items() if v}})
+    try:
+        yield
+    finally:
+        _hint.reset(token)
+
+
+def _text(message):
+    if isinstance(message, dict):
+        return message.get('content') or ''
+    return getattr(message, 'content', None) or ''
+
+
+def _role(message):
+    return message.get('role') if isinstance(message, dict) else getattr(message, 'role', None)
+
+
+def estimate_complexity(messages, tool_results=None):
+    """Cheap 0..1 difficulty estimate of the conversation (and tool results)"""
+    conversation = [m for m in messages if _role(m) in ('user', 'assistant')]
+    user = next((_text(m) for m in reversed(conversation) if _role(m) == 'user'), '')
+
+    score = min(len(user) / 400, 1.0) * 0.35
+    score += min(max(len(conversation) - 1, 0) / 8, 1.0) * 0.2
+    score += min(user.count('?') + user.count('؟'), 3) / 3 * 0.2
+    if HARD_MARKERS.search(user):
+        score += 0.25
+    if tool_results:
+        size = sum(len(r) for r in tool_results)
+        score += min(len(tool_results) / 4, 1.0) * 0.25 + min(size / 4000, 1.0) * 0.25
+    return round(min(score, 1.0), 3)
+
+
+class Decision:
+    __slots__ = ('call_type', 'channel', 'model', 'complexity', 'reason')
+
+    def __init__(self, call_type, channel, model, complexity, reason):
+        self.call_type = call_type
+        self.channel = channel
+        self.model = model
+        self.complexity = complexity
+        self.reason = reason
+
+    @property
+    def route(self):
+        return f"{self.call_type}/{self.channel}"
+
+
+class ModelRouter:
+    """Per-call model choice plus per-route latency and escalation accounting"""
+
+    def __init__(self, fast=None, strong=None, enabled=None):
+        self.fast = fast or Config.MODEL_FAST
+        self.strong = strong or Config.MODEL_STRONG
+        self.enabled = Config.MODEL_ROUTING_ENABLED if enabled is None else enabled
+        self._latency = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))   # (route, model) -> seconds
+        self._stats = Counter()
+        self._lock = threading.Lock()
+
+    def _p95(self, route, model):
+        with self._lock:
+            samples = sorted(self._latency[(route, model)])
+        if len(samples) < MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+
+    def choose(self, call_type, messages, tool_results=None):
+        hint = _hint.get() or {}
+        if hint.get('call_type') == 'greeting':
+            call_type = 'greeting'
+        channel = hint.get('channel') or 'chat'
+
+        if not self.enabled:
+            return Decision(call_type, channel, self.strong, None, 'routing disabled')
+        threshold = THRESHOLDS.get(call_type)
+        if threshold is None:
+            return Decision(call_type, channel, self.fast, 0.0, 'fast call type')
+
+        complexity = estimate_complexity(messages, tool_results)
+        if channel == 'voice':
+            threshold += VOICE_BIAS
+        if complexity < threshold:
+            return Decision(call_type, channel, self.fast, complexity, 'below threshold')
+
+        route = f"{call_type}/{channel}"
+        p95 = self._p95(route, self.strong)
+        target = LATENCY_TARGETS_MS.get(channel, LATENCY_TARGETS_MS['chat']) / 1000
+        if p95 is not None and p95 > target and complexity < threshold + BORDERLINE:
+            return Decision(call_type, channel, self.fast, complexity, 'strong model over latency target')
+        return Decision(call_type, channel, self.strong, complexity, 'above threshold')
+
+    def record(self, decision, model, seconds, outcome):
+        with self._lock:
+            self._latency[(decision.route, model)].append(seconds)
+            self._stats[(decision.route, model, outcome)] += 1
+
+    @staticmethod
+    def _usable(response):
+        message = response.choices[0].message if response and response.choices else None
+        return bool(message and (message.content or message.tool_calls))
+
+    def complete(self, call_type, request, create, tool_results=None):
+        """
+        Run `create(request)` with the routed model; escalate to the strong
+        model once if the fast one fails or answers with nothing
+        """
+        decision = self.choose(call_type, request['messages'], tool_results)
+        log.debug("🧭 Model routed", route=decision.route, model=decision.model,
+                  complexity=decision.complexity, reason=decision.reason)
+
+        started = time.perf_counter()
+        try:
+            response = create({**request, 'model': decision.model})
+        except Exception as e:
+            self.record(decision, decision.model, time.perf_counter() - started, 'error')
+            if decision.model == self.strong:
+                raise
+            failure = repr(e)
+        else:
+            usable = self._usable(response)
+            self.record(decision, decision.model, time.perf_counter() - started, 'ok' if usable else 'empty')
+            if usable or decision.model == self.strong:
+                return response
+            failure = 'empty response'
+
+        log.warning("⤴️  Escalating to strong model", route=decision.route, fast=decision.model,
+                    strong=self.strong, reason=failure)
+        started = time.perf_counter()
+        try:
+            response = create({**request, 'model': self.strong})
+        except Exception:
+            self.record(decision, self.strong, time.perf_counter() - started, 'escalation_error')
+            raise
+        self.record(decision, self.strong, time.perf_counter() - started, 'escalated')
+        return response
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._stats)
+            latency = {key: sorted(samples) for key, samples in self._latency.items()}
+        routes = defaultdict(dict)
+        for (route, model), samples in latency.items():
+            outcomes = {outcome: n for (r, m, outcome), n in counts.items() if r == route and m == model}
+            routes[route][model] = {
+                'calls': sum(outcomes.values()),
+                **outcomes,
+                'p50_ms': round(samples[len(samples) // 2] * 1000, 1),
+                'p95_ms': round(samples[min(len(samples) - 1, int(0.95 * len(samples)))] * 1000, 1),
+            }
+        return {
+            'enabled': self.enabled,
+            'fast': self.fast,
+            'strong': self.strong,
+            'latency_targets_ms': LATENCY_TARGETS_MS,
+            'routes': dict(routes),
+        }
+
+
+# Shared by every provider in the process
+model_router = ModelRouter()
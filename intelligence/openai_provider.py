@@ -1,4 +1,7 @@
 from openai import OpenAI
+from app.cassette import exchange, llm_request, encode_completion, decode_completion
+from app.tracing import span
+from intelligence.model_router import model_router
 
 # --- THE BRAIN: System Instructions ---
 SYSTEM_PROMPT_TEMPLATE = """
@@ -40,15 +43,25 @@ class OpenAIProvider:
         final_messages += messages
 
         # 3. Call OpenAI with a slightly lower temperature for consistency
-        response = self.client.chat.completions.create(
-            model="gpt-4o",  # Use the smart model
+        # (the model is picked per call by intelligence/model_router.py)
+        request = dict(
             messages=final_messages,
             temperature=0.3, 
             max_tokens=150,  # Keep voice answers short!
         )
+        with span('llm.chat'):
+            response = model_router.complete('chat', request, self._create)
 
         return response.choices[0].message.content
 
+    def _create(self, request):
+        """chat.completions.create, recorded / replayed by app/cassette.py when active"""
+        return exchange(
+            'llm', 'openai.chat', llm_request(**request),
+            lambda: self.client.chat.completions.create(**request),
+            encode_completion, decode_completion,
+        )
+
     def _build_system(self, ctx):
         # Default values if context is missing
         if not ctx:
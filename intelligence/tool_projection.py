@@ -0,0 +1,192 @@
+"""
+Tool result projection: only what the model needs, compactly
+
+mcpsc tools hand back raw backend JSON (pretty-printed by FastMCP) or
+raw response text. Pasted as-is into the tool message, a diagnostic
+report or a page of KB hits costs hundreds of prompt tokens the second
+LLM round has to read. compact_tool_result() runs on every tool output
+in MCPProvider before it goes into the conversation:
+
+- Per-tool schema (TOOL_SCHEMAS): the fields worth keeping, found at any
+  depth; lists capped at max_items (with a "+N more" marker); strings cut
+  at a sentence or word boundary near max_text.
+- Nulls, empties and bookkeeping fields (timestamps, embeddings...) go.
+- A dict that shares no field with its schema is kept whole (generic
+  compaction only), so an API shape change degrades to "bigger", not
+  "missing data".
+- Compact JSON: no indentation, no spaces, UTF-8 kept as-is.
+
+Token counts before/after are logged per call and summed per tool in
+projection_stats() (tiktoken when installed, ~4 chars/token otherwise).
+Disable with TOOL_PROJECTION_ENABLED=false.
+"""
+import json
+import threading
+from collections import defaultdict
+
+from app.config import Config
+from app.logger import get_logger
+
+log = get_logger(__name__)
+
+DEFAULT_MAX_ITEMS = 10
+DEFAULT_MAX_TEXT = 400
+MAX_RAW_TEXT = 1500      # tool output that isn't JSON
+
+# Never useful to the model, whatever the tool
+NOISE_KEYS = {'created_at', 'updated_at', 'embedding', 'metadata', 'raw', 'debug', 'trace_id',
+              'request_id', 'query'}
+
+ERROR_KEYS = ['error', 'details', 'message']
+
+TOOL_SCHEMAS = {
+    'lookup_customer': {
+        'fields': ['customer_id', 'full_name', 'preferred_language', 'customer_type', 'nationality',
+                   'package_name', 'balance_try', 'subscription_id', 'status'],
+    },
+    'get_balance_summary': {
+        'fields': ['data_remaining', 'data_remaining_mb', 'voice_remaining_min', 'sms_remaining', 'unit',
+                   'expiry_date', 'days_remaining', 'package_name'],
+    },
+    'get_network_status_per_region': {
+        'fields': ['region', 'status', 'outages', 'issues', 'affected_services', 'description',
+                   'estimated_resolution'],
+        'max_items': 5,
+    },
+    'recommend_package': {
+        'fields': ['reason', 'recommendations', 'package_id', 'package_name', 'price_try', 'data_mb',
+                   'voice_minutes', 'sms_count', 'validity_days'],
+        'max_items': 3,
+    },
+    'search_knowledge_base': {
+        'fields': ['results', 'title', 'content', 'category'],
+        'max_items': 3,
+        'max_text': 600,
+    },
+    'get_active_subscriptions': {
+        'fields': ['subscription_id', 'package_id', 'package_name', 'status', 'msisdn', 'expiry_date'],
+        'max_items': 5,
+    },
+    'run_smart_diagnostic': {
+        'fields': ['device_status', 'network_status', 'recommended_solutions', 'issues_found', 'issues',
+                   'region', 'status', 'description', 'severity'],
+        'max_items': 5,
+    },
+    'get_device_technical_context': {
+        'fields': ['device_model', 'os_type', 'os_version', 'data_enabled', 'roaming_enabled',
+                   'airplane_mode', 'apn', 'signal_strength_dbm', 'network_type'],
+    },
+    'get_customer_snapshot': {
+        'fields': ['customer', 'subscriptions', 'balance', 'device', 'network', 'errors',
+                   'customer_id', 'full_name', 'preferred_language', 'customer_type', 'nationality',
+                   'package_name', 'balance_try', 'subscription_id', 'package_id', 'msisdn', 'status',
+                   'expiry_date', 'data_remaining_mb', 'voice_remaining_min', 'sms_remaining',
+                   'device_model', 'os_type', 'data_enabled', 'roaming_enabled', 'airplane_mode', 'apn',
+                   'signal_strength_dbm', 'network_type', 'region', 'issue', 'issues', 'description',
+                   'estimated_resolution'],
+        'max_items': 5,
+    },
+}
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding('o200k_base')   # gpt-4o
+except Exception:
+    _encoding = None
+
+
+def count_tokens(text):
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def truncate_text(text, limit):
+    """Cut near `limit` at a sentence end, else a word boundary"""
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    floor = int(limit * 0.6)
+    sentence = max(cut.rfind(mark) for mark in ('. ', '! ', '? ', '\n'))
+    if sentence >= floor:
+        return cut[:sentence + 1].rstrip() + ' …'
+    space = cut.rfind(' ')
+    return (cut[:space] if space >= floor else cut).rstrip() + '…'
+
+
+def _empty(value):
+    return value is None or value == '' or value == [] or value == {}
+
+
+def project(value, fields=None, max_items=DEFAULT_MAX_ITEMS, max_text=DEFAULT_MAX_TEXT):
+    """Keep `fields` (at any depth), drop noise, cap lists and strings"""
+    if isinstance(value, dict):
+        items = [(k, v) for k, v in value.items() if k not in NOISE_KEYS and not _empty(v)]
+        if fields is not None:
+            kept = [(k, v) for k, v in items if k in fields]
+            if kept or not items:
+                items = kept
+        out = {}
+        for k, v in items:
+            v = project(v, fields, max_items, max_text)
+            if not _empty(v):
+                out[k] = v
+        return out
+    if isinstance(value, list):
+        out = [p for p in (project(v, fields, max_items, max_text) for v in value[:max_items]) if not _empty(p)]
+        if len(value) > max_items:
+            out.append(f"+{len(value) - max_items} more")
+        return out
+    if isinstance(value, str):
+        return truncate_text(value, max_text)
+    if isinstance(value, float):
+        return round(value, 2)
+    return value
+
+
+def compact(tool_name, output):
+    """Projected, compactly serialized tool output (the text the model will see)"""
+    schema = TOOL_SCHEMAS.get(tool_name, {})
+    try:
+        data = json.loads(output)
+    except (TypeError, ValueError):
+        return truncate_text(output.strip(), MAX_RAW_TEXT)
+    fields = schema.get('fields')
+    if fields is not None:
+        fields = set(fields) | set(ERROR_KEYS)
+    projected = project(data, fields, schema.get('max_items', DEFAULT_MAX_ITEMS),
+                        schema.get('max_text', DEFAULT_MAX_TEXT))
+    return json.dumps(projected, ensure_ascii=False, separators=(',', ':'))
+
+
+_stats = defaultdict(lambda: {'calls': 0, 'tokens_before': 0, 'tokens_after': 0})
+_stats_lock = threading.Lock()
+
+
+def compact_tool_result(tool_name, output):
+    """compact() plus before/after token accounting; returns `output` untouched when disabled"""
+    if not Config.TOOL_PROJECTION_ENABLED or not isinstance(output, str):
+        return output
+    result = compact(tool_name, output)
+    before, after = count_tokens(output), count_tokens(result)
+    with _stats_lock:
+        entry = _stats[tool_name]
+        entry['calls'] += 1
+        entry['tokens_before'] += before
+        entry['tokens_after'] += after
+    log.info("✂️  Tool result compacted", tool=tool_name, tokens_before=before, tokens_after=after)
+    return result
+
+
+def projection_stats():
+    with _stats_lock:
+        tools = {name: dict(entry) for name, entry in _stats.items()}
+    before = sum(t['tokens_before'] for t in tools.values())
+    after = sum(t['tokens_after'] for t in tools.values())
+    return {
+        'enabled': Config.TOOL_PROJECTION_ENABLED,
+        'tokens_before': before,
+        'tokens_after': after,
+        'saved_pct': round((1 - after / before) * 100, 1) if before else None,
+        'tools': tools,
+    }
@@ -9,23 +9,57 @@ from twilio.twiml.voice_response import VoiceResponse, Connect
 # --- IMPORTS FROM YOUR MODULES ---
 from app.config import Config
 from app.database import (
-    get_customer_by_phone, 
+    backend_flight,
     log_interaction
 )
 # Import the Standard Voice functions we just built
-from app.voice_handler import handle_incoming_call, process_speech 
+from app.voice_handler import handle_incoming_call, process_speech, fetch_deferred_answer
+from app.audio_cache import warm_prompt_cache_in_background
+from app.latency import backend_latency
+from app.warmup import start_warmup_scheduler, warmup_status
+from app.prefetch import lookup_customer, get_snapshot, prefetch_stats
+from app.tracing import traced, span, render_prometheus
+from app.logger import get_logger, set_correlation_id, logging_stats
+from app.cassette import deck as cassette_deck
+from app.pg_backend import data_backend_stats
+from intelligence.tool_projection import projection_stats
+from intelligence.mcp_pool import pool_stats
+from intelligence.model_router import model_router, routing
 from intelligence.intelligence_client import IntelligenceClient
+from intelligence.intent_router import intent_router
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
+log = get_logger(__name__)
+
 # Initialize WebSocket for Streaming
 sock = Sock(app)
 
+# Pre-render fixed streaming prompts (greetings, acknowledgments) in the background
+if Config.PRERENDER_AUDIO_ON_STARTUP:
+    warm_prompt_cache_in_background()
+
+# Keep the (sleep-prone) backend warm so the first caller after idle isn't slow
+if Config.WARMUP_ENABLED:
+    start_warmup_scheduler()
+
 # ==========================================
 # 🏠 HOME & HEALTH
 # ==========================================
 
+@app.before_request
+def bind_correlation_id():
+    """Tag every log line of this request with Twilio's CallSid / MessageSid"""
+    set_correlation_id(request.values.get('CallSid') or request.values.get('MessageSid'))
+    cassette_deck.begin_turn(request.path, request.values)
+
+@app.after_request
+def flush_cassette(response):
+    """CASSETTE_MODE=record: write the conversation so far (app/cassette.py)"""
+    cassette_deck.end_turn(request.path, request.values)
+    return response
+
 @app.route('/')
 def home():
     return """
@@ -72,14 +106,30 @@ def health_check():
             "openai": "enabled",
             "mcp_tools": "enabled",
             "database": "connected"
-        }
+        },
+        "intent_router": intent_router.report(),
+        "prefetch": prefetch_stats(),
+        "singleflight": backend_flight.stats(),
+        "backend_latency": backend_latency.stats(),
+        "warmup": warmup_status(),
+        "logging": logging_stats(),
+        "data_backend": data_backend_stats(),
+        "tool_projection": projection_stats(),
+        "mcp_pool": pool_stats(),
+        "model_router": model_router.stats()
     })
 
+@app.route('/metrics')
+def metrics():
+    """Per-stage / per-channel latency histograms (Prometheus text format)"""
+    return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
+
 # ==========================================
 # 📱 WHATSAPP ROUTE (Intelligent)
 # ==========================================
 
 @app.route('/webhook', methods=['POST'])
+@traced('webhook', channel='whatsapp', trace_id_param='MessageSid')
 def webhook():
     """Handle incoming WhatsApp messages with Context Injection"""
     # 1. Get Data
@@ -89,18 +139,21 @@ def webhook():
     # 2. Clean Phone Number (Remove 'whatsapp:' prefix)
     clean_phone = raw_sender.replace('whatsapp:', '').strip()
     
-    print(f"\n📨 WHATSAPP from {clean_phone}: {incoming_msg}")
+    log.info("📨 WHATSAPP message", phone=clean_phone, length=len(incoming_msg))
+    log.verbose("📨 WHATSAPP body", body=incoming_msg)
     
     response = MessagingResponse()
     message = response.message()
     
-    # 3. Customer Lookup (The "Magic Handoff")
-    customer = get_customer_by_phone(clean_phone)
+    # 3. Customer Lookup (The "Magic Handoff") - also prefetches balance,
+    # subscriptions and device context in the background
+    with span('lookup'):
+        customer = lookup_customer(clean_phone)
     
     # Build Context
     customer_context = {}
     if customer:
-        print(f"   ✅ Identified: {customer.get('full_name')}")
+        log.info("   ✅ Identified", customer_id=customer.get('customer_id'))
         customer_context = {
             "name": customer.get('full_name'),
             "phone": clean_phone, # Critical for Tools
@@ -109,26 +162,34 @@ def webhook():
             "balance": customer.get('balance_try')
         }
     else:
-        print("   ⚠️ New User")
+        log.info("   ⚠️ New User")
         customer_context = {
             "name": "Visitor",
             "phone": clean_phone,
             "is_new_user": True
         }
 
+    # Fresh prefetched account data lets the AI answer without a tool round
+    snapshot = get_snapshot(clean_phone)
+    if snapshot:
+        customer_context.update(snapshot.as_context())
+
     # 4. Generate AI Response
     brain = IntelligenceClient(
         openai_api_key=Config.OPENAI_API_KEY,
-        mcp_server_path=Config.MCP_SERVER_PATH
+        mcp_server_path=Config.MCP_SERVER_PATH,
+        mcp_server_url=Config.MCP_SERVER_URL,
+        mcp_pool_size=Config.MCP_POOL_SIZE
     )
 
     try:
         # Run async AI in sync Flask
-        ai_reply = asyncio.run(
-            brain.process_user_message(incoming_msg, customer_context)
-        )
+        with span('ai'), routing(channel='chat'):
+            ai_reply = asyncio.run(
+                brain.process_user_message(incoming_msg, customer_context)
+            )
     except Exception as e:
-        print(f"❌ AI Error: {e}")
+        log.error("❌ AI Error", error=str(e))
         ai_reply = "I'm having trouble connecting to the network. Please try again."
 
     message.body(ai_reply)
@@ -140,22 +201,31 @@ def webhook():
 # These use the app/voice_handler.py logic we just built.
 
 @app.route('/voice/incoming', methods=['POST'])
+@traced('voice.incoming', channel='voice', trace_id_param='CallSid')
 def voice_incoming():
     """Entry point for Standard Voice Calls"""
     # This calls the function from app/voice_handler.py
     return handle_incoming_call()
 
 @app.route('/voice/process', methods=['POST'])
+@traced('voice.process', channel='voice', trace_id_param='CallSid')
 def voice_process():
     """Handles user speech input"""
     # This calls the function from app/voice_handler.py
     return process_speech()
 
+@app.route('/voice/result', methods=['POST'])
+@traced('voice.result', channel='voice', trace_id_param='CallSid')
+def voice_result():
+    """Polled by Twilio for the AI answer of a deferred voice turn"""
+    return fetch_deferred_answer()
+
 # ==========================================
 # ⚡ STREAMING VOICE ROUTES (Advanced)
 # ==========================================
 
 @app.route('/voice/streaming', methods=['POST'])
+@traced('voice.streaming', channel='voice', trace_id_param='CallSid')
 def voice_streaming():
     """
     Handle incoming call with STREAMING support.
@@ -168,10 +238,11 @@ def voice_streaming():
     call_sid = request.values.get('CallSid', '')
     caller_phone = raw_from.replace('client:', '').strip()
     
-    print(f"\n📞 STREAMING CALL from: {caller_phone}")
+    log.info("📞 STREAMING CALL", phone=caller_phone)
     
-    # 2. Lookup Customer
-    customer = get_customer_by_phone(caller_phone)
+    # 2. Lookup Customer (starts the snapshot prefetch the media stream will reuse)
+    with span('lookup'):
+        customer = lookup_customer(caller_phone)
     
     customer_name = "Visitor"
     package_name = "None"
@@ -179,7 +250,7 @@ def voice_streaming():
     if customer:
         customer_name = customer.get('full_name', 'Visitor')
         package_name = customer.get('package_name', 'None')
-        print(f"   ✅ Identified: {customer_name}")
+        log.info("   ✅ Identified", customer_id=customer.get('customer_id'))
     
     # 3. Connect to Media Stream
     connect = Connect()
@@ -189,7 +260,7 @@ def voice_streaming():
     protocol = 'wss' if request.is_secure else 'ws'
     ws_url = f"{protocol}://{host}/media-stream"
     
-    print(f"   🔌 WebSocket: {ws_url}")
+    log.debug("   🔌 WebSocket", url=ws_url)
     
     # 4. Pass Context to WebSocket
     stream = connect.stream(url=ws_url)
@@ -212,10 +283,10 @@ def media_stream_route(ws):
     # Lazy import to avoid circular dependencies if file missing
     try:
         from app.streaming_voice_handler import handle_media_stream
-        print("🎙️ Stream Connected")
+        log.info("🎙️ Stream Connected")
         asyncio.run(handle_media_stream(ws))
     except ImportError:
-        print("❌ app/streaming_voice_handler.py is missing!")
+        log.error("❌ app/streaming_voice_handler.py is missing!")
         ws.close()
 
 # ==========================================
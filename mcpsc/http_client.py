@@ -0,0 +1,227 @@
+"""
+Shared HTTP client for the MCP tools
+
+One pooled httpx.AsyncClient for the whole server (instead of a new
+client, TCP and TLS handshake per tool call), with singleflight
+coalescing: identical GETs in flight at the same moment share one
+upstream request and every waiter gets the same response.
+
+GETs also go through a bounded in-memory response cache:
+
+- 200 responses are stored for their Cache-Control max-age (minus Age)
+  or Expires, or for the caller's `ttl` override; `no-store` is always
+  honored, `no-cache` means "store, but revalidate every time".
+- A stale entry with an ETag / Last-Modified is revalidated with
+  If-None-Match / If-Modified-Since; a 304 refreshes it without a body.
+- LRU eviction keeps the cache under MCP_CACHE_MAX_ENTRIES entries and
+  MCP_CACHE_MAX_BYTES bytes of bodies.
+"""
+import asyncio
+import os
+import time
+from collections import Counter, OrderedDict
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+DEFAULT_TIMEOUT = 10.0
+
+CACHE_MAX_ENTRIES = int(os.getenv("MCP_CACHE_MAX_ENTRIES", "1024"))
+CACHE_MAX_BYTES = int(os.getenv("MCP_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+_client = None
+_in_flight = {}
+_stats = Counter()
+_cache = OrderedDict()      # flight key -> CacheEntry, least recently used first
+_cache_bytes = 0
+
+
+def get_client():
+    """The process-wide AsyncClient (created lazily inside the running loop)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=DEFAULT_TIMEOUT,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+    return _client
+
+
+def _flight_key(url, params, headers):
+    params = tuple(sorted((k, str(v)) for k, v in (params or {}).items()))
+    headers = tuple(sorted((headers or {}).items()))
+    return url, params, headers
+
+
+# --- response cache ---
+
+class CacheEntry:
+    """A stored 200 response plus what is needed to reuse or revalidate it"""
+
+    __slots__ = ('url', 'headers', 'content', 'expires_at', 'etag', 'last_modified', 'no_cache')
+
+    def __init__(self, url, response, ttl):
+        self.url = url
+        self.headers = dict(response.headers)
+        self.content = response.content
+        self.etag = response.headers.get('etag')
+        self.last_modified = response.headers.get('last-modified')
+        self.no_cache = False
+        self.refresh(response, ttl)
+
+    def refresh(self, response, ttl):
+        """(Re)compute freshness from `response` (the 200 or a 304)"""
+        directives = _cache_control(response.headers)
+        self.no_cache = 'no-cache' in directives
+        lifetime = ttl if ttl is not None else _lifetime(response.headers, directives)
+        self.expires_at = time.monotonic() + max(lifetime, 0)
+
+    @property
+    def fresh(self):
+        return not self.no_cache and time.monotonic() < self.expires_at
+
+    @property
+    def revalidatable(self):
+        return bool(self.etag or self.last_modified)
+
+    def response(self):
+        return httpx.Response(200, headers=self.headers, content=self.content,
+                              request=httpx.Request('GET', self.url))
+
+
+def _cache_control(headers):
+    directives = {}
+    for part in headers.get('cache-control', '').lower().split(','):
+        name, _, value = part.strip().partition('=')
+        if name:
+            directives[name] = value.strip('"')
+    return directives
+
+
+def _lifetime(headers, directives):
+    """Freshness lifetime in seconds from Cache-Control / Expires (0 = stale at once)"""
+    for name in ('s-maxage', 'max-age'):
+        if directives.get(name, '').isdigit():
+            age = headers.get('age', '0')
+            return int(directives[name]) - (int(age) if age.isdigit() else 0)
+    if 'expires' in headers:
+        try:
+            expires = parsedate_to_datetime(headers['expires'])
+            served = parsedate_to_datetime(headers['date']) if 'date' in headers else None
+            if served is not None:
+                return (expires - served).total_seconds()
+            return expires.timestamp() - time.time()
+        except (TypeError, ValueError):
+            return 0
+    return 0
+
+
+def _store(key, url, response, ttl):
+    global _cache_bytes
+    _evict(key)
+    if 'no-store' in _cache_control(response.headers):
+        return
+    entry = CacheEntry(url, response, ttl)
+    if not entry.fresh and not entry.revalidatable:
+        return      # nothing to gain from keeping it
+    if len(entry.content) > CACHE_MAX_BYTES:
+        return
+    _cache[key] = entry
+    _cache_bytes += len(entry.content)
+    _stats['cache_stores'] += 1
+    while len(_cache) > CACHE_MAX_ENTRIES or _cache_bytes > CACHE_MAX_BYTES:
+        _evict(next(iter(_cache)))
+        _stats['cache_evictions'] += 1
+
+
+def _evict(key):
+    global _cache_bytes
+    entry = _cache.pop(key, None)
+    if entry is not None:
+        _cache_bytes -= len(entry.content)
+
+
+async def _fetch(key, url, params, headers, timeout, ttl):
+    """Upstream GET for a cache miss: conditional when a stale entry can be revalidated"""
+    entry = _cache.get(key)
+    request_headers = dict(headers or {})
+    if entry is not None and entry.revalidatable:
+        if entry.etag:
+            request_headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            request_headers['If-Modified-Since'] = entry.last_modified
+
+    response = await get_client().get(url, params=params, headers=request_headers, timeout=timeout)
+
+    if response.status_code == 304 and entry is not None:
+        _stats['cache_revalidated'] += 1
+        entry.headers.update(response.headers)
+        entry.refresh(response, ttl)
+        _cache.move_to_end(key)
+        return entry.response()
+    if response.status_code == 200:
+        _store(key, str(response.request.url), response, ttl)
+    return response
+
+
+async def get(url, params=None, headers=None, timeout=DEFAULT_TIMEOUT, ttl=None):
+    """
+    Cached, coalesced GET: returns the httpx.Response (callers still raise_for_status)
+
+    `ttl` overrides the response's own freshness lifetime (seconds).
+    Followers await the leader's future; an exception is raised to all of them.
+    """
+    key = _flight_key(url, params, headers)
+
+    entry = _cache.get(key)
+    if entry is not None and entry.fresh:
+        _stats['cache_hits'] += 1
+        _cache.move_to_end(key)
+        return entry.response()
+    _stats['calls'] += 1
+
+    future = _in_flight.get(key)
+    if future is not None:
+        _stats['shared'] += 1
+        # shield: one follower being cancelled must not cancel the shared request
+        return await asyncio.shield(future)
+
+    future = asyncio.get_running_loop().create_future()
+    _in_flight[key] = future
+    _stats['executions'] += 1
+    try:
+        response = await _fetch(key, url, params, headers, timeout, ttl)
+        future.set_result(response)
+        return response
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Mark retrieved so asyncio doesn't warn when nobody else was waiting
+        future.exception()
+        raise
+    finally:
+        _in_flight.pop(key, None)
+
+
+async def post(url, json=None, headers=None, timeout=DEFAULT_TIMEOUT):
+    """Plain POST on the shared client (never coalesced: not idempotent)"""
+    return await get_client().post(url, json=json, headers=headers, timeout=timeout)
+
+
+def clear_cache():
+    global _cache_bytes
+    _cache.clear()
+    _cache_bytes = 0
+
+
+def stats():
+    """calls / executions is the collapse ratio (1.0 = nothing shared); cache hits are not calls"""
+    result = dict(_stats)
+    executions = result.get('executions', 0)
+    result['collapse_ratio'] = round(result.get('calls', 0) / executions, 3) if executions else 1.0
+    result['in_flight'] = len(_in_flight)
+    result['cache_entries'] = len(_cache)
+    result['cache_bytes'] = _cache_bytes
+    return result
@@ -1,18 +1,69 @@
 from mcp.server.fastmcp import FastMCP
+import asyncio
+import os
+import sys
+import time
 import httpx
+import http_client  # Shared pooled client with GET coalescing (mcpsc/http_client.py)
+import tool_stats   # Per-tool latency, served on /stats (mcpsc/tool_stats.py)
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 from typing import Optional
 from typing import List, Dict, Any
 
+# Transport: "stdio" (spawned per client, the default), or "streamable-http" / "sse"
+# to run as one shared network service for every web worker (see procfile)
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "stdio")
+
+
+class TurkcellMCP(FastMCP):
+    """FastMCP that times every tool call (reported on GET /stats)"""
+
+    async def call_tool(self, name, arguments):
+        tool_stats.begin(name)
+        started = time.perf_counter()
+        failed = False
+        try:
+            return await super().call_tool(name, arguments)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            tool_stats.end(name, time.perf_counter() - started, failed)
+
+
 # Create an MCP server
-mcp = FastMCP("Turkcell AI MCP Server")
+mcp = TurkcellMCP(
+    "Turkcell AI MCP Server",
+    host=os.getenv("MCP_HOST", "127.0.0.1"),
+    port=int(os.getenv("MCP_PORT", "8765")),
+)
 
 # Constants for API configuration
-TURKCELL_API_BASE = "https://turkcellaiapi.onrender.com"
+# Overridable so the server can run against a local stand-in (benchmarks/fakes.py)
+TURKCELL_API_BASE = os.getenv("TURKCELL_API_BASE", "https://turkcellaiapi.onrender.com")
 TURKCELL_HEADERS = {
     "X-API-KEY": "turkcell_key_12345*",
     "Content-Type": "application/json"
 }
 
+# Seconds a GET result is reused without asking the backend again (overrides its
+# Cache-Control; None = follow the response headers). Slow-changing data only.
+# Override with MCP_CACHE_TTLS="get_balance_summary=10,recommend_package=0"
+CACHE_TTLS = {
+    "get_balance_summary": 30,
+    "get_device_technical_context": 60,
+    "get_network_status_per_region": 60,
+    "recommend_package": 600,
+}
+for _item in filter(None, os.getenv("MCP_CACHE_TTLS", "").split(",")):
+    _tool, _, _seconds = _item.partition("=")
+    try:
+        CACHE_TTLS[_tool.strip()] = float(_seconds)
+    except ValueError:
+        # stderr: over stdio, stdout is the protocol stream
+        print(f"⚠️ Ignoring malformed MCP_CACHE_TTLS entry: {_item!r}", file=sys.stderr)
+
 @mcp.tool()
 async def lookup_customer(
     phone: Optional[str] = None, 
@@ -28,21 +79,20 @@ async def lookup_customer(
     url = f"{TURKCELL_API_BASE}/api/v1/customers/lookup"
     params = {k: v for k, v in {"phone": phone, "passport": passport}.items() if v}
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            # We pass the TURKCELL_HEADERS here
-            response = await client.get(
-                url, 
-                params=params, 
-                headers=TURKCELL_HEADERS
-            )
-            response.raise_for_status()
-            return response.json()
-            
-        except httpx.HTTPStatusError as e:
-            return {"error": f"Lookup failed: {e.response.status_code}", "details": e.response.text}
-        except httpx.RequestError as e:
-            return {"error": "Network error", "details": str(e)}
+    try:
+        # We pass the TURKCELL_HEADERS here
+        response = await http_client.get(
+            url, 
+            params=params, 
+            headers=TURKCELL_HEADERS
+        )
+        response.raise_for_status()
+        return response.json()
+        
+    except httpx.HTTPStatusError as e:
+        return {"error": f"Lookup failed: {e.response.status_code}", "details": e.response.text}
+    except httpx.RequestError as e:
+        return {"error": "Network error", "details": str(e)}
 
 @mcp.tool()
 async def get_balance_summary(balance_id: str) -> dict:
@@ -53,21 +103,21 @@ async def get_balance_summary(balance_id: str) -> dict:
     # Note: Using the balance_id specifically as required by the teammate's endpoint
     url = f"{TURKCELL_API_BASE}/api/v1/balances/{balance_id}/summary"
     
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            response = await client.get(
-                url, 
-                headers=TURKCELL_HEADERS
-            )
-            response.raise_for_status()
-            
-            # This will return fields like {"data_remaining": 5.2, "unit": "GB", ...}
-            return response.json()
-            
-        except httpx.HTTPStatusError as e:
-            return {"error": f"Balance retrieval failed: {e.response.status_code}"}
-        except httpx.RequestError as e:
-            return {"error": "Connection to balance service failed"}
+    try:
+        response = await http_client.get(
+            url, 
+            headers=TURKCELL_HEADERS,
+            ttl=CACHE_TTLS.get("get_balance_summary")
+        )
+        response.raise_for_status()
+        
+        # This will return fields like {"data_remaining": 5.2, "unit": "GB", ...}
+        return response.json()
+        
+    except httpx.HTTPStatusError as e:
+        return {"error": f"Balance retrieval failed: {e.response.status_code}"}
+    except httpx.RequestError as e:
+        return {"error": "Connection to balance service failed"}
 
 @mcp.tool()
 async def get_network_status_per_region(region: str) -> dict:
@@ -76,19 +126,19 @@ async def get_network_status_per_region(region: str) -> dict:
     """
     url = f"{TURKCELL_API_BASE}/api/v1/troubleshooting/network-status/region/{region}"
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            response = await client.get(
-                url,
-                headers=TURKCELL_HEADERS
-            )
-            response.raise_for_status()
-            return response.json()
+    try:
+        response = await http_client.get(
+            url,
+            headers=TURKCELL_HEADERS,
+            ttl=CACHE_TTLS.get("get_network_status_per_region")
+        )
+        response.raise_for_status()
+        return response.json()
 
-        except httpx.HTTPStatusError as e:
-            return {"error": f"Network status retrieval failed: {e.response.status_code}"}
-        except httpx.RequestError as e:
-            return {"error": "Connection to network status service failed"}
+    except httpx.HTTPStatusError as e:
+        return {"error": f"Network status retrieval failed: {e.response.status_code}"}
+    except httpx.RequestError as e:
+        return {"error": "Connection to network status service failed"}
 
 
 @mcp.tool()
@@ -122,22 +172,22 @@ async def recommend_package(
     if duration_days is not None:
         params["duration_days"] = duration_days
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            response = await client.get(
-                url, 
-                params=params, 
-                headers=TURKCELL_HEADERS
-            )
-            response.raise_for_status()
-            
-            # Returns a list of recommended packages with reasoning
-            return response.json()
-            
-        except httpx.HTTPStatusError as e:
-            return {"error": f"Recommendation failed: {e.response.status_code}", "details": e.response.text}
-        except httpx.RequestError as e:
-            return {"error": "Connection failed", "details": str(e)}
+    try:
+        response = await http_client.get(
+            url, 
+            params=params, 
+            headers=TURKCELL_HEADERS,
+            ttl=CACHE_TTLS.get("recommend_package")
+        )
+        response.raise_for_status()
+        
+        # Returns a list of recommended packages with reasoning
+        return response.json()
+        
+    except httpx.HTTPStatusError as e:
+        return {"error": f"Recommendation failed: {e.response.status_code}", "details": e.response.text}
+    except httpx.RequestError as e:
+        return {"error": "Connection failed", "details": str(e)}
 
 #   Not the most optimal tool yet
 @mcp.tool()
@@ -152,23 +202,22 @@ async def search_knowledge_base(query: str) -> str:
     # POST body containing the search query
     payload = {"query": query}
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            # We use client.post for this endpoint
-            response = await client.post(
-                url,
-                json=payload,
-                headers=TURKCELL_HEADERS
-            )
-            response.raise_for_status()
-            
-            # Returns the raw search results as a string for the AI to process
-            return response.text
-            
-        except httpx.HTTPStatusError as e:
-            return f"Search failed (Error {e.response.status_code}): {e.response.text}"
-        except httpx.RequestError as e:
-            return f"Knowledge base is currently unreachable: {str(e)}"
+    try:
+        # We use http_client.post for this endpoint
+        response = await http_client.post(
+            url,
+            json=payload,
+            headers=TURKCELL_HEADERS
+        )
+        response.raise_for_status()
+        
+        # Returns the raw search results as a string for the AI to process
+        return response.text
+        
+    except httpx.HTTPStatusError as e:
+        return f"Search failed (Error {e.response.status_code}): {e.response.text}"
+    except httpx.RequestError as e:
+        return f"Knowledge base is currently unreachable: {str(e)}"
 
 
 @mcp.tool()
@@ -184,27 +233,26 @@ async def get_active_subscriptions(customer_id: str) -> list[dict[str, Any]]:
     # Construct the full URL using the new base variable
     endpoint = f"{TURKCELL_API_BASE}/api/v1/customers/{customer_id}/subscriptions"
     
-    async with httpx.AsyncClient() as client:
-        try:
-            # 1. Make the request
-            response = await client.get(endpoint, timeout=10.0)
-            response.raise_for_status()
-            
-            # 2. Parse JSON
-            data = response.json()
-            
-            # 3. Extract the list from the "subscriptions" key
-            if "subscriptions" in data and isinstance(data["subscriptions"], list):
-                return data["subscriptions"]
-            
-            return []
-
-        except httpx.HTTPStatusError as e:
-            print(f"⚠️ API Error ({e.response.status_code}): {e}")
-            return []
-        except Exception as e:
-            print(f"⚠️ Unexpected Error: {e}")
-            return []
+    try:
+        # 1. Make the request
+        response = await http_client.get(endpoint, timeout=10.0)
+        response.raise_for_status()
+        
+        # 2. Parse JSON
+        data = response.json()
+        
+        # 3. Extract the list from the "subscriptions" key
+        if "subscriptions" in data and isinstance(data["subscriptions"], list):
+            return data["subscriptions"]
+        
+        return []
+
+    except httpx.HTTPStatusError as e:
+        print(f"⚠️ API Error ({e.response.status_code}): {e}")
+        return []
+    except Exception as e:
+        print(f"⚠️ Unexpected Error: {e}")
+        return []
 
 
 @mcp.tool()
@@ -234,28 +282,27 @@ async def run_smart_diagnostic(
     # We pass the default or overridden issue_type
     params = {"issue_type": issue_type}
     
-    async with httpx.AsyncClient() as client:
-        try:
-            # 10 second timeout for deep diagnosis
-            response = await client.get(endpoint, params=params, timeout=10.0)
-            response.raise_for_status()
-            
-            return response.json()
-
-        except httpx.HTTPStatusError as e:
-            print(f"⚠️ Diagnostic API Error ({e.response.status_code}): {e}")
-            return {
-                "success": False,
-                "error": f"Status {e.response.status_code}",
-                "message": "Diagnostic failed. Please escalate to human agent."
-            }
-        except Exception as e:
-            print(f"⚠️ Unexpected Error: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "message": "An unexpected error occurred during diagnostics."
-            }
+    try:
+        # 10 second timeout for deep diagnosis
+        response = await http_client.get(endpoint, params=params, timeout=10.0)
+        response.raise_for_status()
+        
+        return response.json()
+
+    except httpx.HTTPStatusError as e:
+        print(f"⚠️ Diagnostic API Error ({e.response.status_code}): {e}")
+        return {
+            "success": False,
+            "error": f"Status {e.response.status_code}",
+            "message": "Diagnostic failed. Please escalate to human agent."
+        }
+    except Exception as e:
+        print(f"⚠️ Unexpected Error: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "message": "An unexpected error occurred during diagnostics."
+        }
 
 
 
@@ -279,27 +326,128 @@ async def get_device_technical_context(subscription_id: str) -> Dict[str, Any]:
     """
     endpoint = f"{TURKCELL_API_BASE}/api/v1/troubleshooting/device/{subscription_id}"
     
-    async with httpx.AsyncClient() as client:
+    try:
+        # 10s timeout to ensure we get accurate real-time data
+        response = await http_client.get(endpoint, timeout=10.0,
+                                         ttl=CACHE_TTLS.get("get_device_technical_context"))
+        response.raise_for_status()
+        
+        return response.json()
+
+    except httpx.HTTPStatusError as e:
+        print(f"⚠️ Device Context API Error ({e.response.status_code}): {e}")
+        return {
+            "error": f"Status {e.response.status_code}",
+            "message": "Could not retrieve device details."
+        }
+    except Exception as e:
+        print(f"⚠️ Unexpected Error: {e}")
+        return {
+            "error": str(e),
+            "message": "An unexpected error occurred while fetching device context."
+        }
+
+
+# Per-part budget inside get_customer_snapshot: a slow part is reported, not waited for
+SNAPSHOT_PART_TIMEOUT = float(os.getenv("MCP_SNAPSHOT_PART_TIMEOUT", "6"))
+
+
+async def _get_json(url, params=None, ttl=None):
+    response = await http_client.get(url, params=params, headers=TURKCELL_HEADERS,
+                                     timeout=SNAPSHOT_PART_TIMEOUT, ttl=ttl)
+    response.raise_for_status()
+    return response.json()
+
+
+def _part_error(e):
+    if isinstance(e, httpx.HTTPStatusError):
+        return "Not found" if e.response.status_code == 404 else f"Status {e.response.status_code}"
+    if isinstance(e, (httpx.TimeoutException, asyncio.TimeoutError)):
+        return "Timed out"
+    if isinstance(e, httpx.RequestError):
+        return "Connection failed"
+    return str(e) or type(e).__name__
+
+
+@mcp.tool()
+async def get_customer_snapshot(phone: str, region: Optional[str] = None) -> Dict[str, Any]:
+    """
+    One-call overview of a customer: profile, active subscriptions, balance,
+    device settings and network status, fetched concurrently.
+
+    Use this FIRST for troubleshooting ("my internet is not working", "I can't
+    call") or account questions, instead of calling lookup_customer,
+    get_active_subscriptions, get_device_technical_context and
+    get_network_status_per_region one after another.
+
+    Args:
+        phone: The customer's WhatsApp/phone number.
+        region: Region/city to check network status for (omit for all reported issues).
+
+    Returns:
+        dict with 'customer', 'subscriptions', 'balance', 'device' and 'network'.
+        Parts that could not be fetched are missing and explained in 'errors';
+        the rest are still valid.
+    """
+    snapshot = {}
+    errors = {}
+
+    async def part(name, fetch):
         try:
-            # 10s timeout to ensure we get accurate real-time data
-            response = await client.get(endpoint, timeout=10.0)
-            response.raise_for_status()
-            
-            return response.json()
-
-        except httpx.HTTPStatusError as e:
-            print(f"⚠️ Device Context API Error ({e.response.status_code}): {e}")
-            return {
-                "error": f"Status {e.response.status_code}",
-                "message": "Could not retrieve device details."
-            }
+            snapshot[name] = await asyncio.wait_for(fetch(), SNAPSHOT_PART_TIMEOUT)
+            return snapshot[name]
         except Exception as e:
-            print(f"⚠️ Unexpected Error: {e}")
-            return {
-                "error": str(e),
-                "message": "An unexpected error occurred while fetching device context."
-            }
+            errors[name] = _part_error(e)
+            return None
+
+    # customer -> subscriptions -> device depend on each other; balance and
+    # network don't, so all three chains run side by side
+    async def customer_chain():
+        customer = await part("customer", lambda: _get_json(
+            f"{TURKCELL_API_BASE}/api/v1/customers/lookup", params={"phone": phone}))
+        if not customer or not customer.get("customer_id"):
+            return
+        subscriptions = await part("subscriptions", lambda: _get_json(
+            f"{TURKCELL_API_BASE}/api/v1/customers/{customer['customer_id']}/subscriptions"))
+        if isinstance(subscriptions, dict):
+            subscriptions = subscriptions.get("subscriptions") or subscriptions.get("data") or []
+            snapshot["subscriptions"] = subscriptions
+        active = [s for s in subscriptions or [] if isinstance(s, dict) and s.get("subscription_id")]
+        if active:
+            await part("device", lambda: _get_json(
+                f"{TURKCELL_API_BASE}/api/v1/troubleshooting/device/{active[0]['subscription_id']}",
+                ttl=CACHE_TTLS.get("get_device_technical_context")))
+
+    async def balance():
+        result = await _get_json(f"{TURKCELL_API_BASE}/api/v1/balances/phone/{phone.lstrip('+')}",
+                                 ttl=CACHE_TTLS.get("get_balance_summary"))
+        return result.get("data", result) if isinstance(result, dict) else result
+
+    async def network():
+        if region:
+            url = f"{TURKCELL_API_BASE}/api/v1/troubleshooting/network-status/region/{region}"
+        else:
+            url = f"{TURKCELL_API_BASE}/api/v1/troubleshooting/network-status"
+        return await _get_json(url, ttl=CACHE_TTLS.get("get_network_status_per_region"))
+
+    await asyncio.gather(customer_chain(), part("balance", balance), part("network", network))
+
+    if errors:
+        snapshot["errors"] = errors
+    return snapshot
+
+
+@mcp.resource("metrics://http-client")
+def http_client_metrics() -> dict:
+    """Request coalescing and response cache counters for the shared HTTP client"""
+    return http_client.stats()
+
+
+@mcp.custom_route("/stats", methods=["GET"])
+async def stats_route(request: Request) -> JSONResponse:
+    """Per-tool latency and HTTP client counters (network transports only)"""
+    return JSONResponse({"tools": tool_stats.snapshot(), "http_client": http_client.stats()})
 
 
 if __name__ == "__main__":
-    mcp.run()
\ No newline at end of file
+    mcp.run(transport=MCP_TRANSPORT)
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""
+Per-tool call latency for the MCP server
+
+As a shared network service (MCP_TRANSPORT=streamable-http / sse) the
+tool server is called by every web worker, so it reports its own view:
+calls, errors, in-flight calls and p50/p95/p99 over the last WINDOW calls
+of each tool. Served as JSON on GET /stats (see main.py).
+"""
+import time
+from collections import defaultdict, deque
+
+WINDOW = 1000
+
+_started = time.time()
+_durations = defaultdict(lambda: deque(maxlen=WINDOW))
+_calls = defaultdict(int)
+_errors = defaultdict(int)
+_in_flight = defaultdict(int)
+
+
+def begin(name):
+    _in_flight[name] += 1
+
+
+def end(name, seconds, failed=False):
+    _in_flight[name] -= 1
+    _calls[name] += 1
+    if failed:
+        _errors[name] += 1
+    _durations[name].append(seconds)
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def snapshot():
+    tools = {}
+    for name in sorted(_calls.keys() | _in_flight.keys()):
+        ordered = sorted(_durations[name])
+        tools[name] = {
+            'calls': _calls[name],
+            'errors': _errors[name],
+            'in_flight': _in_flight[name],
+        }
+        if ordered:
+            tools[name].update({
+                'p50_ms': round(_percentile(ordered, 0.50) * 1000, 1),
+                'p95_ms': round(_percentile(ordered, 0.95) * 1000, 1),
+                'p99_ms': round(_percentile(ordered, 0.99) * 1000, 1),
+                'max_ms': round(ordered[-1] * 1000, 1),
+            })
+    return {
+        'uptime_s': round(time.time() - _started),
+        'calls': sum(_calls.values()),
+        'in_flight': sum(_in_flight.values()),
+        'tools': tools,
+    }
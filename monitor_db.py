@@ -1,73 +1,261 @@
-import psycopg2
-from psycopg2.extras import RealDictCursor
+"""
+Watch interaction_history for new rows, in order, without missing any
+
+    python monitor_db.py                 # poll every 2s with a high-watermark query
+    python monitor_db.py --listen        # wake on NOTIFY instead (run --install once first)
+    python monitor_db.py --install       # create the (timestamp, interaction_id) index + NOTIFY trigger
+    python monitor_db.py --last 20       # print the 20 most recent rows first
+
+Each check asks only for rows after the last one printed,
+(timestamp, interaction_id) > watermark, which is an index range scan on
+idx_interaction_history_ts_id instead of COUNT(*) over the whole table.
+Every row arriving between two checks is printed, oldest first.
+
+Rows whose transaction commits after a newer row was already seen (their
+timestamp is older than the watermark) are still picked up if they land
+within --lookback seconds; they are marked "late".
+
+--listen: the trigger sends one NOTIFY per INSERT statement (bulk loads
+included) on commit, and the monitor sleeps on the connection socket until
+then, so any number of idle monitors cost the database nothing. It still
+re-checks every --idle-poll seconds in case a notification was lost while
+reconnecting.
+"""
+import argparse
 import os
-from dotenv import load_dotenv
+import select
 import time
+from datetime import timedelta
+
+import psycopg2
+from dotenv import load_dotenv
+from psycopg2.extras import RealDictCursor
 
 load_dotenv()
 
 DATABASE_URL = os.getenv('DATABASE_URL')
 
-def monitor_interactions():
-    """Monitor interaction_history table in real-time"""
+CHANNEL = 'interaction_history'
+
+# Most ids remembered for late-row detection; a bulk load inside the
+# lookback window shrinks the window instead of growing every query
+MAX_SEEN = 5000
+
+INSTALL_SQL = f"""
+CREATE INDEX IF NOT EXISTS idx_interaction_history_ts_id
+    ON interaction_history (timestamp, interaction_id);
+
+CREATE OR REPLACE FUNCTION notify_interaction_history() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('{CHANNEL}', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS interaction_history_notify ON interaction_history;
+CREATE TRIGGER interaction_history_notify
+    AFTER INSERT ON interaction_history
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_interaction_history();
+"""
+
+SELECT_COLUMNS = """
+    SELECT
+        ih.interaction_id,
+        ih.timestamp,
+        ih.channel,
+        ih.user_message,
+        ih.ai_response,
+        c.full_name,
+        c.preferred_language
+    FROM interaction_history ih
+    LEFT JOIN customers c ON ih.customer_id = c.customer_id
+"""
+
+# New rows after the watermark, plus stragglers inside the lookback window
+# we haven't printed yet (ids compared as text: works for uuid or serial keys).
+# floor <= watermark, so the outer range bounds the index scan for both.
+NEW_ROWS_SQL = SELECT_COLUMNS + """
+    WHERE ih.timestamp >= %(floor)s
+      AND ((ih.timestamp, ih.interaction_id::text) > (%(ts)s, %(id)s)
+           OR (ih.timestamp > %(floor)s AND NOT (ih.interaction_id::text = ANY(%(seen)s))))
+    ORDER BY ih.timestamp, ih.interaction_id::text
+    LIMIT %(batch)s
+"""
+
+LAST_ROWS_SQL = SELECT_COLUMNS + """
+    ORDER BY ih.timestamp DESC, ih.interaction_id::text DESC
+    LIMIT %s
+"""
+
+# Rows already in the lookback window when the monitor starts: not "late"
+WINDOW_IDS_SQL = """
+    SELECT interaction_id::text AS interaction_id, timestamp
+    FROM interaction_history
+    WHERE timestamp > %s AND (timestamp, interaction_id::text) <= (%s, %s)
+    ORDER BY timestamp DESC
+    LIMIT %s
+"""
+
+
+class Watermark:
+    """Last (timestamp, id) printed, plus the ids printed within the lookback window"""
+
+    def __init__(self, lookback):
+        self.lookback = timedelta(seconds=lookback)
+        self.ts = None
+        self.id = ''
+        self.floor = None
+        self.seen = {}   # id -> timestamp, only rows newer than floor
+
+    def advance(self, row):
+        """Record a printed row; returns True if it arrived behind the watermark"""
+        key = (row['timestamp'], str(row['interaction_id']))
+        late = self.ts is not None and key < (self.ts, self.id)
+        if not late:
+            self.ts, self.id = key
+        self.seen[key[1]] = key[0]
+        return late
+
+    def prune(self):
+        floor = self.ts - self.lookback
+        seen = {i: ts for i, ts in self.seen.items() if ts > floor}
+        if len(seen) > MAX_SEEN:
+            floor = sorted(seen.values())[-MAX_SEEN - 1]
+            seen = {i: ts for i, ts in seen.items() if ts > floor}
+        self.floor, self.seen = floor, seen
+
+    def params(self, batch):
+        return {'floor': self.floor, 'ts': self.ts, 'id': self.id,
+                'seen': list(self.seen), 'batch': batch}
+
+
+def connect():
     conn = psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
-    cursor = conn.cursor()
-    
-    print("👀 Monitoring database for new interactions...")
+    conn.autocommit = True   # no transaction held open between checks
+    return conn
+
+
+def install(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(INSTALL_SQL)
+    print("✅ Installed idx_interaction_history_ts_id and the interaction_history NOTIFY trigger")
+
+
+def print_interaction(row, late=False):
+    ai_response = row['ai_response'] or ''
+    print(f"\n🔔 NEW INTERACTION{' (late)' if late else ''}")
+    print(f"   Time: {row['timestamp']}")
+    print(f"   Channel: {row['channel']}")
+    print(f"   Customer: {row['full_name'] or 'Unknown'}")
+    print(f"   Language: {row['preferred_language'] or 'N/A'}")
+    print(f"   User: {row['user_message']}")
+    print(f"   AI: {ai_response[:100]}{'...' if len(ai_response) > 100 else ''}")
+    print("=" * 60)
+
+
+def start(cursor, watermark, last):
+    """Set the watermark at the newest row (printing the `last` most recent ones)"""
+    cursor.execute(LAST_ROWS_SQL, (max(last, 1),))
+    rows = cursor.fetchall()[::-1]
+    for row in rows[-last:] if last else []:
+        print_interaction(row)
+    for row in rows:
+        watermark.advance(row)
+    if watermark.ts is None:
+        cursor.execute("SELECT COALESCE(MAX(timestamp), now()) AS now FROM interaction_history")
+        watermark.ts = cursor.fetchone()['now']
+    cursor.execute(WINDOW_IDS_SQL, (watermark.ts - watermark.lookback, watermark.ts, watermark.id, MAX_SEEN))
+    for row in cursor.fetchall():
+        watermark.seen[row['interaction_id']] = row['timestamp']
+    watermark.prune()
+
+
+def drain(cursor, watermark, batch):
+    """Print everything after the watermark, oldest first, one page at a time"""
+    total = 0
+    while True:
+        cursor.execute(NEW_ROWS_SQL, watermark.params(batch))
+        rows = cursor.fetchall()
+        for row in rows:
+            print_interaction(row, late=watermark.advance(row))
+        watermark.prune()
+        total += len(rows)
+        if len(rows) < batch:
+            return total
+
+
+def wait_for_notify(conn, timeout):
+    """Block on the connection socket until a NOTIFY arrives (or timeout)"""
+    if select.select([conn], [], [], timeout) == ([], [], []):
+        return False
+    conn.poll()
+    conn.notifies.clear()   # one check covers however many notifications queued up
+    return True
+
+
+def monitor_interactions(args):
+    """Stream new interaction_history rows until Ctrl+C, reconnecting on errors"""
+    print(f"👀 Monitoring database for new interactions ({'LISTEN/NOTIFY' if args.listen else f'polling every {args.interval}s'})...")
     print("   (Press Ctrl+C to stop)")
-    print("="*60)
-    
-    last_count = 0
-    
+    print("=" * 60)
+
+    watermark = Watermark(args.lookback)
+    seen_total = 0
+    conn = None
     while True:
         try:
-            # Get total count
-            cursor.execute("SELECT COUNT(*) as count FROM interaction_history")
-            current_count = cursor.fetchone()['count']
-            
-            if current_count > last_count:
-                # New interaction(s) detected!
-                print(f"\n🔔 NEW INTERACTION DETECTED! Total: {current_count}")
-                
-                # Get the latest interaction
-                cursor.execute("""
-                    SELECT 
-                        ih.timestamp,
-                        ih.channel,
-                        ih.user_message,
-                        ih.ai_response,
-                        c.full_name,
-                        c.preferred_language
-                    FROM interaction_history ih
-                    LEFT JOIN customers c ON ih.customer_id = c.customer_id
-                    ORDER BY ih.timestamp DESC
-                    LIMIT 1
-                """)
-                
-                latest = cursor.fetchone()
-                
-                if latest:
-                    print(f"   Time: {latest['timestamp']}")
-                    print(f"   Channel: {latest['channel']}")
-                    print(f"   Customer: {latest['full_name'] or 'Unknown'}")
-                    print(f"   Language: {latest['preferred_language'] or 'N/A'}")
-                    print(f"   User: {latest['user_message']}")
-                    print(f"   AI: {latest['ai_response'][:100]}...")
-                    print("="*60)
-                
-                last_count = current_count
-            
-            time.sleep(2)  # Check every 2 seconds
-            
+            if conn is None or conn.closed:
+                conn = connect()
+                cursor = conn.cursor()
+                if watermark.ts is None:
+                    start(cursor, watermark, args.last)
+                if args.listen:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+                # Catch up on anything that arrived while (re)connecting
+                seen_total += drain(cursor, watermark, args.batch)
+
+            if args.listen:
+                wait_for_notify(conn, args.idle_poll)
+            else:
+                time.sleep(args.interval)
+            new = drain(cursor, watermark, args.batch)
+            if new:
+                seen_total += new
+                print(f"   ({seen_total} new this session)")
+
         except KeyboardInterrupt:
             print("\n👋 Monitoring stopped")
             break
-        except Exception as e:
+        except psycopg2.Error as e:
             print(f"❌ Error: {e}")
+            if conn is not None:
+                conn.close()
+            conn = None
             time.sleep(5)
-    
-    cursor.close()
-    conn.close()
+
+    if conn is not None:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream new interaction_history rows")
+    parser.add_argument('--listen', action='store_true', help="wait for NOTIFY instead of polling")
+    parser.add_argument('--install', action='store_true', help="create the index and NOTIFY trigger, then exit")
+    parser.add_argument('--interval', type=float, default=2, help="seconds between polls")
+    parser.add_argument('--idle-poll', type=float, default=30, help="--listen: re-check at least this often")
+    parser.add_argument('--lookback', type=float, default=10,
+                        help="seconds behind the watermark to look for late-committed rows")
+    parser.add_argument('--batch', type=int, default=500, help="rows fetched per query")
+    parser.add_argument('--last', type=int, default=0, help="print the N most recent rows on start")
+    args = parser.parse_args()
+
+    if args.install:
+        conn = connect()
+        install(conn)
+        conn.close()
+        return
+    monitor_interactions(args)
+
 
 if __name__ == '__main__':
-    monitor_interactions()
\ No newline at end of file
+    main()
@@ -0,0 +1,23 @@
+import asyncio
+from openai import AsyncOpenAI
+from app.config import Config
+from app.audio_cache import prompt_cache, prerender, fixed_prompts
+from app.tts_pipeline import openai_tts_ulaw
+
+
+async def main():
+    """Render every fixed streaming prompt into the shared audio cache"""
+    client = AsyncOpenAI(api_key=Config.OPENAI_API_KEY)
+    prompts = fixed_prompts()
+
+    print(f"🎵 Pre-rendering {len(prompts)} prompts into {prompt_cache.directory}/ ...")
+    rendered, cached = await prerender(
+        prompt_cache,
+        lambda text, lang: openai_tts_ulaw(client, text, lang),
+        prompts
+    )
+    print(f"\n✅ Done: {rendered} rendered, {cached} already cached")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,644 @@
+"""
+Bulk synthetic dataset for scale testing (customer lookups, KB search, monitor_db.py)
+
+    python seed_bulk.py --create-schema --customers 1000000
+    python seed_bulk.py --customers 200000 --method values --truncate
+    python seed_bulk.py --customers 100000 --dry-run        # generator speed only, no database
+
+Generates customers, subscriptions, balances, daily usage history,
+multilingual knowledge-base articles and interaction history with
+tourist-SIM shaped distributions:
+
+- nationality mix weighted towards Turkey's biggest tourist markets, with
+  preferred_language following nationality (EN/TR/AR/DE/RU)
+- ~8% of customers have a second, expired subscription
+- data usage grows with days since activation, with a lognormal tail of
+  heavy users
+- KB articles in every language per category/device, interactions spread
+  over the last --interaction-days days
+
+Every value is a function of (--seed, table, row number), so the same seed
+gives the same rows regardless of --batch or --method, and row N of one
+table can find row N of another (subscription -> customer) without a
+lookup.
+
+Rows are streamed straight into COPY FROM STDIN (default) or batched
+execute_values() INSERTs; nothing is held in memory. Prints rows/s and
+MB/s per table. --create-schema creates the tables on a plain local
+PostgreSQL (no Supabase/pgvector needed).
+"""
+import argparse
+import functools
+import io
+import math
+import os
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DATABASE_URL = os.getenv('DATABASE_URL')
+
+CHUNK = 10_000    # rows per deterministic RNG stream (independent of --batch)
+MASK64 = (1 << 64) - 1
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS packages (
+    package_id TEXT PRIMARY KEY,
+    package_name TEXT NOT NULL,
+    price_try NUMERIC(10, 2),
+    data_mb INTEGER,
+    voice_minutes INTEGER,
+    sms_count INTEGER,
+    validity_days INTEGER,
+    package_type TEXT,
+    status TEXT DEFAULT 'ACTIVE'
+);
+CREATE TABLE IF NOT EXISTS customers (
+    customer_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    passport_number TEXT,
+    full_name TEXT,
+    nationality TEXT,
+    preferred_language TEXT,
+    whatsapp_number TEXT UNIQUE,
+    customer_type TEXT,
+    created_at TIMESTAMPTZ DEFAULT now()
+);
+CREATE TABLE IF NOT EXISTS subscriptions (
+    subscription_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    customer_id UUID REFERENCES customers (customer_id),
+    package_id TEXT REFERENCES packages (package_id),
+    msisdn TEXT UNIQUE,
+    iccid TEXT,
+    status TEXT,
+    activation_date TIMESTAMPTZ,
+    expiry_date TIMESTAMPTZ
+);
+CREATE INDEX IF NOT EXISTS idx_subscriptions_customer_id ON subscriptions (customer_id);
+CREATE TABLE IF NOT EXISTS balances (
+    balance_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    subscription_id UUID REFERENCES subscriptions (subscription_id),
+    data_total_mb INTEGER,
+    data_used_mb INTEGER,
+    voice_total_min INTEGER,
+    voice_used_min INTEGER,
+    sms_total INTEGER,
+    sms_used INTEGER,
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS idx_balances_subscription_id ON balances (subscription_id);
+CREATE TABLE IF NOT EXISTS usage_history (
+    subscription_id UUID REFERENCES subscriptions (subscription_id),
+    usage_date DATE,
+    data_used_mb INTEGER,
+    voice_used_min INTEGER,
+    sms_used INTEGER,
+    PRIMARY KEY (subscription_id, usage_date)
+);
+CREATE TABLE IF NOT EXISTS knowledge_base (
+    kb_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    title TEXT,
+    content TEXT,
+    category TEXT,
+    language TEXT,
+    device_os TEXT,
+    keywords TEXT[]
+);
+CREATE INDEX IF NOT EXISTS idx_knowledge_base_language_category ON knowledge_base (language, category);
+CREATE TABLE IF NOT EXISTS interaction_history (
+    interaction_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    customer_id UUID,
+    channel TEXT,
+    user_message TEXT,
+    ai_response TEXT,
+    intent_detected TEXT,
+    session_id TEXT,
+    timestamp TIMESTAMPTZ DEFAULT now()
+);
+"""
+
+# Same package catalogue as seed_database.py, plus the common prepaid ones
+PACKAGES = [
+    ('TOURIST_WELCOME_50GB', 'Tourist Welcome Pack 50GB', 400, 51200, 1000, 100, 30, 'TOURIST', 'ACTIVE'),
+    ('TOURIST_STARTER_30GB', 'Tourist Starter 30GB', 300, 30720, 500, 50, 30, 'TOURIST', 'ACTIVE'),
+    ('TOURIST_WEEK_15GB', 'Tourist Week 15GB', 220, 15360, 100, 20, 7, 'TOURIST', 'ACTIVE'),
+    ('PREPAID_10GB', 'Prepaid 10GB', 249, 10240, 500, 250, 30, 'PREPAID', 'ACTIVE'),
+    ('PREPAID_20GB', 'Prepaid 20GB', 349, 20480, 1000, 1000, 30, 'PREPAID', 'ACTIVE'),
+]
+PACKAGE_WEIGHTS = [0.35, 0.25, 0.2, 0.12, 0.08]
+
+# (nationality, weight, phone country code, preferred language)
+NATIONALITIES = [
+    ('RU', 0.19, '7', 'RU'),
+    ('DE', 0.15, '49', 'DE'),
+    ('GB', 0.10, '44', 'EN'),
+    ('TR', 0.08, '90', 'TR'),
+    ('UA', 0.06, '380', 'RU'),
+    ('IR', 0.06, '98', 'EN'),
+    ('SA', 0.05, '966', 'AR'),
+    ('AE', 0.03, '971', 'AR'),
+    ('US', 0.07, '1', 'EN'),
+    ('NL', 0.05, '31', 'EN'),
+    ('PL', 0.05, '48', 'EN'),
+    ('FR', 0.04, '33', 'EN'),
+    ('AT', 0.03, '43', 'DE'),
+    ('IQ', 0.04, '964', 'AR'),
+]
+
+NAMES = {
+    'EN': (['James', 'Emma', 'Oliver', 'Sophie', 'Liam', 'Grace', 'Noah', 'Chloe', 'Jack', 'Mia'],
+           ['Smith', 'Jones', 'Taylor', 'Brown', 'Wilson', 'Evans', 'Walker', 'Wright', 'Green', 'Hall']),
+    'TR': (['Mehmet', 'Ayşe', 'Mustafa', 'Fatma', 'Ahmet', 'Zeynep', 'Emre', 'Elif', 'Can', 'Deniz'],
+           ['Yılmaz', 'Kaya', 'Demir', 'Şahin', 'Çelik', 'Yıldız', 'Aydın', 'Öztürk', 'Arslan', 'Doğan']),
+    'AR': (['Mohammed', 'Fatima', 'Ahmed', 'Aisha', 'Omar', 'Layla', 'Khalid', 'Noura', 'Yousef', 'Huda'],
+           ['Al-Saud', 'Haddad', 'Al-Farsi', 'Nasser', 'Khalil', 'Mansour', 'Saleh', 'Hamdan', 'Aziz', 'Karim']),
+    'DE': (['Lukas', 'Anna', 'Maximilian', 'Lena', 'Felix', 'Laura', 'Jonas', 'Julia', 'Paul', 'Marie'],
+           ['Müller', 'Schmidt', 'Schneider', 'Fischer', 'Weber', 'Meyer', 'Wagner', 'Becker', 'Hoffmann', 'Koch']),
+    'RU': (['Alexander', 'Anastasia', 'Dmitry', 'Maria', 'Sergey', 'Elena', 'Ivan', 'Olga', 'Mikhail', 'Tatiana'],
+           ['Ivanov', 'Smirnova', 'Kuznetsov', 'Popova', 'Sokolov', 'Lebedeva', 'Kozlov', 'Novikova', 'Morozov', 'Volkova']),
+}
+
+# Knowledge base: per category, per language: (title, steps, keywords)
+KB_TEMPLATES = {
+    'SIM_ACTIVATION': {
+        'EN': ('SIM Activation Guide', ['Insert the SIM into your phone', 'Restart your device',
+                                        'Wait 5-10 minutes for automatic activation', 'Check that Mobile Data is ON'],
+               ['sim', 'activation', 'not working', 'new card']),
+        'TR': ('SIM Kart Aktivasyonu', ['SIM kartı telefonunuza takın', 'Cihazınızı yeniden başlatın',
+                                        'Otomatik aktivasyon için 5-10 dakika bekleyin', 'Mobil Veri açık olmalı'],
+               ['sim', 'aktivasyon', 'çalışmıyor', 'yeni kart']),
+        'AR': ('دليل تفعيل الشريحة', ['أدخل الشريحة في هاتفك', 'أعد تشغيل الجهاز',
+                                      'انتظر 5-10 دقائق للتفعيل التلقائي', 'تأكد من تشغيل بيانات الجوال'],
+               ['شريحة', 'تفعيل', 'لا تعمل']),
+        'DE': ('SIM-Aktivierung', ['SIM-Karte einlegen', 'Gerät neu starten',
+                                   '5-10 Minuten auf die automatische Aktivierung warten', 'Mobile Daten einschalten'],
+               ['sim', 'aktivierung', 'funktioniert nicht', 'neue karte']),
+        'RU': ('Активация SIM-карты', ['Вставьте SIM-карту в телефон', 'Перезагрузите устройство',
+                                       'Подождите 5-10 минут автоматической активации', 'Включите мобильные данные'],
+               ['сим', 'активация', 'не работает', 'новая карта']),
+    },
+    'INTERNET_ISSUES': {
+        'EN': ('Internet Troubleshooting', ['Check Mobile Data is ON in Settings', 'Enable Data Roaming',
+                                            'Restart your phone', 'Check that you see the Turkcell network name'],
+               ['internet', 'data', 'slow', 'not connecting', '4g', '5g']),
+        'TR': ('İnternet Sorunları', ['Ayarlardan Mobil Veriyi açın', 'Veri Dolaşımını etkinleştirin',
+                                      'Telefonunuzu yeniden başlatın', 'Turkcell şebeke adını gördüğünüzden emin olun'],
+               ['internet', 'veri', 'yavaş', 'bağlanmıyor']),
+        'AR': ('حل مشاكل الإنترنت', ['تأكد من تشغيل بيانات الجوال', 'فعّل تجوال البيانات',
+                                     'أعد تشغيل الهاتف', 'تأكد من ظهور اسم شبكة Turkcell'],
+               ['إنترنت', 'بيانات', 'بطيء']),
+        'DE': ('Internet-Probleme', ['Mobile Daten in den Einstellungen einschalten', 'Daten-Roaming aktivieren',
+                                     'Telefon neu starten', 'Prüfen, ob das Turkcell-Netz angezeigt wird'],
+               ['internet', 'daten', 'langsam', 'keine verbindung']),
+        'RU': ('Проблемы с интернетом', ['Включите мобильные данные в настройках', 'Включите роуминг данных',
+                                         'Перезагрузите телефон', 'Проверьте, что видна сеть Turkcell'],
+               ['интернет', 'данные', 'медленно', 'нет соединения']),
+    },
+    'BALANCE': {
+        'EN': ('Checking Your Balance', ['Send a WhatsApp message asking for your balance',
+                                         'Or dial *123#', 'Remaining data, minutes and SMS are shown'],
+               ['balance', 'remaining', 'data left', 'credit']),
+        'TR': ('Bakiye Sorgulama', ['WhatsApp üzerinden bakiyenizi sorun', 'Veya *123# tuşlayın',
+                                    'Kalan internet, dakika ve SMS gösterilir'],
+               ['bakiye', 'kalan', 'kredi']),
+        'AR': ('الاستعلام عن الرصيد', ['أرسل رسالة واتساب تسأل عن رصيدك', 'أو اطلب *123#',
+                                       'يظهر المتبقي من البيانات والدقائق والرسائل'],
+               ['رصيد', 'المتبقي']),
+        'DE': ('Guthaben abfragen', ['Per WhatsApp nach dem Guthaben fragen', 'Oder *123# wählen',
+                                     'Verbleibende Daten, Minuten und SMS werden angezeigt'],
+               ['guthaben', 'restvolumen', 'kontostand']),
+        'RU': ('Проверка баланса', ['Спросите баланс в WhatsApp', 'Или наберите *123#',
+                                    'Показываются остаток интернета, минут и SMS'],
+               ['баланс', 'остаток', 'счёт']),
+    },
+    'ROAMING': {
+        'EN': ('Using Your Line Abroad', ['Enable Data Roaming', 'Select the partner network manually if needed',
+                                          'Roaming usage is billed separately'],
+               ['roaming', 'abroad', 'travel']),
+        'TR': ('Yurt Dışında Kullanım', ['Veri Dolaşımını açın', 'Gerekirse şebekeyi elle seçin',
+                                         'Dolaşım kullanımı ayrıca ücretlendirilir'],
+               ['dolaşım', 'yurt dışı', 'seyahat']),
+        'AR': ('استخدام الخط في الخارج', ['فعّل تجوال البيانات', 'اختر الشبكة يدوياً عند الحاجة',
+                                          'يتم احتساب التجوال بشكل منفصل'],
+               ['تجوال', 'سفر']),
+        'DE': ('Nutzung im Ausland', ['Daten-Roaming aktivieren', 'Bei Bedarf Netz manuell wählen',
+                                      'Roaming wird separat abgerechnet'],
+               ['roaming', 'ausland', 'reise']),
+        'RU': ('Использование за границей', ['Включите роуминг данных', 'При необходимости выберите сеть вручную',
+                                             'Роуминг оплачивается отдельно'],
+               ['роуминг', 'заграница', 'поездка']),
+    },
+    'PACKAGES': {
+        'EN': ('Choosing a Package', ['Tourist packs last 7 to 30 days', 'Prepaid packs renew monthly',
+                                      'Ask for a recommendation based on your stay'],
+               ['package', 'plan', 'recommend', 'tourist']),
+        'TR': ('Paket Seçimi', ['Turist paketleri 7-30 gün geçerlidir', 'Faturasız paketler aylık yenilenir',
+                                'Kalış sürenize göre öneri isteyin'],
+               ['paket', 'tarife', 'öneri']),
+        'AR': ('اختيار الباقة', ['باقات السياح صالحة من 7 إلى 30 يوماً', 'الباقات المسبقة تتجدد شهرياً',
+                                 'اطلب توصية حسب مدة إقامتك'],
+               ['باقة', 'توصية']),
+        'DE': ('Paket auswählen', ['Touristenpakete gelten 7 bis 30 Tage', 'Prepaid-Pakete verlängern sich monatlich',
+                                   'Empfehlung passend zur Aufenthaltsdauer anfragen'],
+               ['paket', 'tarif', 'empfehlung']),
+        'RU': ('Выбор пакета', ['Туристические пакеты действуют 7-30 дней', 'Предоплаченные пакеты продлеваются ежемесячно',
+                                'Запросите рекомендацию по сроку поездки'],
+               ['пакет', 'тариф', 'рекомендация']),
+    },
+    'CALLS_SMS': {
+        'EN': ('Calls and SMS Not Working', ['Check airplane mode is OFF', 'Make sure the number has the country code',
+                                             'Check you have minutes or SMS left'],
+               ['call', 'sms', 'cannot call']),
+        'TR': ('Arama ve SMS Sorunları', ['Uçak modunun kapalı olduğunu kontrol edin', 'Numarayı ülke koduyla yazın',
+                                          'Kalan dakika veya SMS olduğundan emin olun'],
+               ['arama', 'sms', 'arayamıyorum']),
+        'AR': ('مشاكل المكالمات والرسائل', ['تأكد من إيقاف وضع الطيران', 'أضف رمز الدولة للرقم',
+                                            'تأكد من وجود دقائق أو رسائل متبقية'],
+               ['مكالمة', 'رسائل']),
+        'DE': ('Anrufe und SMS funktionieren nicht', ['Flugmodus ausschalten', 'Nummer mit Ländervorwahl wählen',
+                                                      'Verbleibende Minuten oder SMS prüfen'],
+               ['anruf', 'sms', 'kann nicht telefonieren']),
+        'RU': ('Не работают звонки и SMS', ['Выключите режим полёта', 'Набирайте номер с кодом страны',
+                                            'Проверьте остаток минут и SMS'],
+               ['звонок', 'sms', 'не могу позвонить']),
+    },
+}
+DEVICE_OS = ['ALL', 'IOS', 'ANDROID']
+
+# (intent, channel-independent user message, AI reply) per language
+CONVERSATIONS = {
+    'EN': [('BALANCE', "What is my balance?", "You have 38.2 GB of data, 855 minutes and 77 SMS left."),
+           ('INTERNET_ISSUES', "My internet is not working", "Please check that Mobile Data and Data Roaming are ON, then restart your phone."),
+           ('PACKAGES', "Which package do you recommend for two weeks?", "The Tourist Starter 30GB pack covers up to 30 days.")],
+    'TR': [('BALANCE', "Kalan bakiyem ne kadar?", "38,2 GB internet, 855 dakika ve 77 SMS hakkınız kaldı."),
+           ('INTERNET_ISSUES', "İnternetim çalışmıyor", "Lütfen Mobil Veri ve Veri Dolaşımını açıp telefonunuzu yeniden başlatın.")],
+    'AR': [('BALANCE', "كم رصيدي المتبقي؟", "لديك 38.2 جيجابايت و855 دقيقة و77 رسالة متبقية."),
+           ('INTERNET_ISSUES', "الإنترنت لا يعمل", "يرجى تشغيل بيانات الجوال والتجوال ثم إعادة تشغيل الهاتف.")],
+    'DE': [('BALANCE', "Wie viel Guthaben habe ich noch?", "Sie haben noch 38,2 GB, 855 Minuten und 77 SMS."),
+           ('INTERNET_ISSUES', "Mein Internet ist sehr langsam", "Bitte schalten Sie Mobile Daten und Roaming ein und starten Sie das Telefon neu.")],
+    'RU': [('BALANCE', "Какой у меня баланс?", "У вас осталось 38,2 ГБ, 855 минут и 77 SMS."),
+           ('INTERNET_ISSUES', "Не работает интернет", "Включите мобильные данные и роуминг, затем перезагрузите телефон.")],
+}
+
+
+# ---------- Deterministic values ----------
+
+def splitmix64(x):
+    x = (x + 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+
+class Dataset:
+    """Row generators for one seed; row i of every table is reproducible on its own"""
+
+    def __init__(self, seed, customers, usage_days=7, kb_entries=3000, interactions=200_000,
+                 interaction_days=30, now=None):
+        self.seed = seed
+        self.customers = customers
+        self.usage_days = usage_days
+        self.kb_entries = kb_entries
+        self.interactions = interactions
+        self.interaction_days = interaction_days
+        self.now = (now or datetime.now(timezone.utc)).replace(microsecond=0)
+        self._nationality_cdf = _cdf([n[1] for n in NATIONALITIES])
+        self._package_cdf = _cdf(PACKAGE_WEIGHTS)
+
+    # --- shared per-row attributes (used by more than one table) ---
+
+    def _hash(self, salt, i):
+        return splitmix64(splitmix64(self.seed * 0x1000193 + hash_salt(salt)) ^ i)
+
+    def _unit(self, salt, i):
+        return self._hash(salt, i) / 2 ** 64
+
+    def uuid(self, kind, i):
+        high = self._hash(kind, i)
+        low = splitmix64(high ^ 0xD1B54A32D192ED03)
+        return str(uuid.UUID(int=(high << 64) | low, version=4))
+
+    def nationality(self, i):
+        return NATIONALITIES[_pick(self._nationality_cdf, self._unit('nationality', i))]
+
+    def subscription_count(self, i):
+        return 2 if self._unit('second_sim', i) < 0.08 else 1
+
+    def activation(self, i, k):
+        """Current SIM: activated in the last 30 days; an older one expired before that"""
+        days_ago = self._unit('activation', i) * 30 if k == 0 else 60 + self._unit('old_sim', i) * 300
+        return self.now - timedelta(days=days_ago)
+
+    def package(self, i, k):
+        return PACKAGES[_pick(self._package_cdf, self._unit(f'package{k}', i))]
+
+    def rng(self, table, chunk):
+        return random.Random(f"{self.seed}:{table}:{chunk}")
+
+    def _chunks(self, table, total):
+        for chunk in range(0, total, CHUNK):
+            yield self.rng(table, chunk // CHUNK), range(chunk, min(chunk + CHUNK, total))
+
+    # --- tables ---
+
+    def packages(self):
+        return iter(PACKAGES)
+
+    def customer_rows(self):
+        for rng, rows in self._chunks('customers', self.customers):
+            for i in rows:
+                nationality, _, country_code, language = self.nationality(i)
+                first, last = NAMES[language]
+                yield (
+                    self.uuid('customer', i),
+                    f"{nationality[0]}{i:08d}",
+                    f"{rng.choice(first)} {rng.choice(last)}",
+                    nationality,
+                    language if rng.random() < 0.9 else 'EN',
+                    f"+{country_code}{5 if country_code == '90' else 1}{i:09d}",
+                    'TOURIST' if rng.random() < 0.7 else 'RESIDENT',
+                    self.activation(i, 0) - timedelta(minutes=rng.randrange(60)),
+                )
+
+    def subscription_rows(self):
+        for i in range(self.customers):
+            for k in range(self.subscription_count(i)):
+                package = self.package(i, k)
+                activated = self.activation(i, k)
+                expiry = activated + timedelta(days=package[6])
+                status = 'ACTIVE' if expiry > self.now else 'EXPIRED'
+                if k == 0 and self._unit('suspended', i) < 0.01:
+                    status = 'SUSPENDED'
+                yield (
+                    self.uuid(f'subscription{k}', i),
+                    self.uuid('customer', i),
+                    package[0],
+                    f"+9053{k}{i:08d}",
+                    f"8990{k}{i:015d}",
+                    status,
+                    activated,
+                    expiry,
+                )
+
+    def balance_rows(self):
+        for rng, rows in self._chunks('balances', self.customers):
+            for i in rows:
+                for k in range(self.subscription_count(i)):
+                    package = self.package(i, k)
+                    elapsed = min(1.0, (self.now - self.activation(i, k)).days / package[6])
+                    heaviness = min(3.0, rng.lognormvariate(0, 0.6))   # long tail of heavy users
+                    used = lambda total: min(total, int(total * elapsed * heaviness * rng.uniform(0.3, 0.8)))
+                    yield (
+                        self.uuid(f'balance{k}', i),
+                        self.uuid(f'subscription{k}', i),
+                        package[3], used(package[3]),
+                        package[4], used(package[4]),
+                        package[5], used(package[5]),
+                    )
+
+    def usage_rows(self):
+        today = self.now.date()
+        for rng, rows in self._chunks('usage', self.customers):
+            for i in rows:
+                first_day = self.activation(i, 0).date()
+                days = min(self.usage_days, (today - first_day).days + 1)
+                subscription_id = self.uuid('subscription0', i)
+                median_mb = rng.lognormvariate(math.log(900), 0.7)
+                for d in range(days):
+                    yield (
+                        subscription_id,
+                        today - timedelta(days=d),
+                        int(rng.lognormvariate(math.log(median_mb), 0.5)),
+                        int(rng.expovariate(1 / 6)),
+                        int(rng.expovariate(1 / 2)),
+                    )
+
+    def kb_rows(self):
+        categories = list(KB_TEMPLATES)
+        languages = list(KB_TEMPLATES[categories[0]])
+        for rng, rows in self._chunks('knowledge_base', self.kb_entries):
+            for n in rows:
+                category = categories[n % len(categories)]
+                language = languages[(n // len(categories)) % len(languages)]
+                device_os = DEVICE_OS[(n // (len(categories) * len(languages))) % len(DEVICE_OS)]
+                title, steps, keywords = KB_TEMPLATES[category][language]
+                steps = rng.sample(steps, k=rng.randint(max(2, len(steps) - 1), len(steps)))
+                yield (
+                    self.uuid('kb', n),
+                    f"{title} ({device_os.title()}) #{n // (len(categories) * len(languages) * len(DEVICE_OS)) + 1}",
+                    ' '.join(f"{s + 1}) {step}" for s, step in enumerate(steps)),
+                    category,
+                    language,
+                    device_os,
+                    keywords,
+                )
+
+    def interaction_rows(self):
+        """Oldest first, like the real table fills up"""
+        span = timedelta(days=self.interaction_days).total_seconds()
+        for rng, rows in self._chunks('interactions', self.interactions):
+            for n in rows:
+                i = int(self._unit('interaction_customer', n) ** 1.5 * self.customers)   # some customers write a lot
+                language = self.nationality(i)[3]
+                intent, message, reply = rng.choice(CONVERSATIONS[language])
+                channel = 'whatsapp' if rng.random() < 0.7 else 'voice'
+                yield (
+                    self.uuid('interaction', n),
+                    self.uuid('customer', i),
+                    channel,
+                    message,
+                    reply,
+                    intent,
+                    f"{'SM' if channel == 'whatsapp' else 'CA'}{self.uuid('session', n).replace('-', '')}",
+                    self.now - timedelta(seconds=span * (1 - n / max(1, self.interactions)) + rng.random()),
+                )
+
+
+@functools.lru_cache(maxsize=None)
+def hash_salt(salt):
+    value = 0
+    for byte in salt.encode():
+        value = (value * 0x100000001B3 ^ byte) & MASK64
+    return value
+
+
+def _cdf(weights):
+    total, out = 0.0, []
+    for w in weights:
+        total += w
+        out.append(total)
+    return [c / total for c in out]
+
+
+def _pick(cdf, u):
+    for index, bound in enumerate(cdf):
+        if u < bound:
+            return index
+    return len(cdf) - 1
+
+
+# ---------- Loading ----------
+
+TABLES = [
+    # (table, columns, Dataset method)
+    ('customers', ['customer_id', 'passport_number', 'full_name', 'nationality', 'preferred_language',
+                   'whatsapp_number', 'customer_type', 'created_at'], 'customer_rows'),
+    ('subscriptions', ['subscription_id', 'customer_id', 'package_id', 'msisdn', 'iccid', 'status',
+                       'activation_date', 'expiry_date'], 'subscription_rows'),
+    ('balances', ['balance_id', 'subscription_id', 'data_total_mb', 'data_used_mb', 'voice_total_min',
+                  'voice_used_min', 'sms_total', 'sms_used'], 'balance_rows'),
+    ('usage_history', ['subscription_id', 'usage_date', 'data_used_mb', 'voice_used_min', 'sms_used'], 'usage_rows'),
+    ('knowledge_base', ['kb_id', 'title', 'content', 'category', 'language', 'device_os', 'keywords'], 'kb_rows'),
+    ('interaction_history', ['interaction_id', 'customer_id', 'channel', 'user_message', 'ai_response',
+                             'intent_detected', 'session_id', 'timestamp'], 'interaction_rows'),
+]
+
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def copy_value(value):
+    """One field in PostgreSQL COPY text format"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, list):
+        items = ('"' + str(v).replace('\\', '\\\\').replace('"', '\\"') + '"' for v in value)
+        return ('{' + ','.join(items) + '}').translate(_COPY_ESCAPES)
+    return str(value).translate(_COPY_ESCAPES)
+
+
+class CopyStream(io.RawIOBase):
+    """Readable file over a row generator, so COPY FROM STDIN streams without buffering the table"""
+
+    def __init__(self, rows):
+        self._rows = rows
+        self._pending = b''
+        self.rows = 0
+        self.bytes = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        parts, length = [self._pending], len(self._pending)
+        while size < 0 or length < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            line = ('\t'.join(map(copy_value, row)) + '\n').encode()
+            parts.append(line)
+            length += len(line)
+            self.rows += 1
+        data = b''.join(parts)
+        if size >= 0:
+            data, self._pending = data[:size], data[size:]
+        else:
+            self._pending = b''
+        self.bytes += len(data)
+        return data
+
+
+def load_copy(conn, table, columns, rows):
+    stream = CopyStream(rows)
+    with conn.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", stream, size=1 << 16)
+    conn.commit()
+    return stream.rows, stream.bytes
+
+
+def load_values(conn, table, columns, rows, batch):
+    from psycopg2.extras import execute_values
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s ON CONFLICT DO NOTHING"
+    count = 0
+    with conn.cursor() as cursor:
+        while True:
+            page = [row for _, row in zip(range(batch), rows)]
+            if not page:
+                break
+            execute_values(cursor, sql, page, page_size=batch)
+            conn.commit()
+            count += len(page)
+    return count, None
+
+
+def dry_run(rows):
+    stream = CopyStream(rows)
+    while stream.read(1 << 16):
+        pass
+    return stream.rows, stream.bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate and bulk-load a synthetic Turkcell dataset")
+    parser.add_argument('--customers', type=int, default=1_000_000)
+    parser.add_argument('--usage-days', type=int, default=7, help="days of usage_history per active SIM")
+    parser.add_argument('--kb-entries', type=int, default=3000)
+    parser.add_argument('--interactions', type=int, default=200_000)
+    parser.add_argument('--interaction-days', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--method', choices=('copy', 'values'), default='copy')
+    parser.add_argument('--batch', type=int, default=5000, help="rows per execute_values() page")
+    parser.add_argument('--tables', help="comma-separated subset, e.g. customers,subscriptions")
+    parser.add_argument('--create-schema', action='store_true', help="create the tables if they don't exist")
+    parser.add_argument('--truncate', action='store_true', help="empty the generated tables first")
+    parser.add_argument('--dry-run', action='store_true', help="generate only, no database")
+    args = parser.parse_args()
+
+    dataset = Dataset(args.seed, args.customers, args.usage_days, args.kb_entries,
+                      args.interactions, args.interaction_days)
+    wanted = set(args.tables.split(',')) if args.tables else None
+    tables = [t for t in TABLES if wanted is None or t[0] in wanted]
+
+    conn = None
+    if not args.dry_run:
+        import psycopg2
+        conn = psycopg2.connect(DATABASE_URL)
+        with conn.cursor() as cursor:
+            if args.create_schema:
+                print("🏗️  Creating schema...")
+                cursor.execute(SCHEMA_SQL)
+            if args.truncate:
+                print("🧹 Truncating generated tables...")
+                cursor.execute(f"TRUNCATE {', '.join(t[0] for t in TABLES)} CASCADE")
+            from psycopg2.extras import execute_values
+            execute_values(cursor, """
+                INSERT INTO packages (package_id, package_name, price_try, data_mb, voice_minutes,
+                                      sms_count, validity_days, package_type, status)
+                VALUES %s ON CONFLICT (package_id) DO NOTHING
+            """, PACKAGES)
+        conn.commit()
+
+    print(f"🌱 Generating {args.customers:,} customers (seed {args.seed}, "
+          f"{'dry run' if args.dry_run else args.method})...")
+    print(f"\n{'table':<22}{'rows':>12}{'seconds':>10}{'rows/s':>12}{'MB/s':>8}")
+    total_rows, started = 0, time.perf_counter()
+    for table, columns, method in tables:
+        rows = getattr(dataset, method)()
+        t = time.perf_counter()
+        if args.dry_run:
+            count, size = dry_run(rows)
+        elif args.method == 'copy':
+            count, size = load_copy(conn, table, columns, rows)
+        else:
+            count, size = load_values(conn, table, columns, rows, args.batch)
+        elapsed = time.perf_counter() - t
+        total_rows += count
+        mb_s = f"{size / elapsed / 1e6:>8.1f}" if size else f"{'-':>8}"
+        print(f"{table:<22}{count:>12,}{elapsed:>10.1f}{count / elapsed:>12,.0f}{mb_s}")
+
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ {total_rows:,} rows in {elapsed:.1f}s = {total_rows / elapsed:,.0f} rows/s")
+    if conn is not None:
+        with conn.cursor() as cursor:
+            cursor.execute(f"ANALYZE {', '.join(t[0] for t in tables)}")
+        conn.commit()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -123,5 +123,5 @@ print("🧪 Testing Language Detection\n")
 
 for phrase in test_phrases:
     print(f"Input: \"{phrase}\"")
-    detected = detect_language_from_speech(phrase)
-    print(f"Detected: {detected}\n")
\ No newline at end of file
+    detected, confidence = detect_language_from_speech(phrase)
+    print(f"Detected: {detected} ({confidence:.2f})\n")
\ No newline at end of file